@@ -0,0 +1,95 @@
+"""百度热搜正则回退中标题→URL提取的性能对比
+
+用法:
+    python benchmarks/bench_baidu_title_index.py [保存的百度热搜页面.html] [--synthetic] [--repeat N]
+
+默认使用仓库中保存的百度热搜页面benchmarks/pages/baidu.html；该文件不存在或指定--synthetic时，
+生成一个与百度热搜页面结构相近的合成页面（50条热搜，约500KB）。
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.baidu_crawler import index_title_urls
+
+DEFAULT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages", "baidu.html")
+
+HOT_PATTERN = r'热搜指数\s*</div>\s*<div[^>]*>\s*([0-9,]+)\s*</div>.*?<div[^>]*class="c-single-text-ellipsis"[^>]*>(.*?)</div>'
+
+def build_page(count=50, padding=20000):
+    """生成合成页面：每条热搜之间夹杂大量无关标签和脚本"""
+    rng = random.Random(42)
+    blocks = ['<html><head><script>var conf = {"a": 1};</script></head><body>']
+    for i in range(count):
+        title = f"热搜标题{i}号事件" + "".join(rng.choice("新闻热点发布会比赛") for _ in range(6))
+        blocks.append(
+            f'<div class="category-wrap_iQLoo"><div class="index_1Ew5p">{i + 1}</div>'
+            f'<div class="hot-index_1Bl1a">热搜指数</div><div class="num">{rng.randint(10000, 5000000):,}</div>'
+            f'<div class="content_1YWBm"><div class="c-single-text-ellipsis">{title}</div>'
+            f'<span class="desc">' + "无关内容" * (padding // 8) + '</span>'
+            f'<a class="title_dIF3B" href="https://www.baidu.com/s?wd=topic{i}">查看</a></div></div>'
+        )
+    blocks.append("</body></html>")
+    return "".join(blocks)
+
+def extract_titles(html_content):
+    matches = re.findall(HOT_PATTERN, html_content, re.DOTALL)
+    titles = [re.sub(r'<[^>]+>', '', title).strip() for _, title in matches]
+    return [title for title in titles if title]
+
+def legacy_title_urls(html_content, titles):
+    """原实现：每个标题对整页做一次惰性DOTALL搜索"""
+    urls = {}
+    for title in titles:
+        match = re.search(f'{re.escape(title)}.*?href="([^"]+)"', html_content, re.DOTALL)
+        if match:
+            urls.setdefault(title, match.group(1))
+    return urls
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="百度标题→URL提取性能对比")
+    parser.add_argument("html", nargs="?", default=DEFAULT_PAGE, help="保存的百度热搜页面")
+    parser.add_argument("--synthetic", action="store_true", help="使用合成页面")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    if not args.synthetic and os.path.exists(args.html):
+        print(f"页面: {args.html}")
+        with open(args.html, "r", encoding="utf-8") as f:
+            html_content = f.read()
+    else:
+        print("页面: 合成页面")
+        html_content = build_page()
+
+    titles = extract_titles(html_content)
+    print(f"页面大小: {len(html_content) / 1024:.0f} KB, 标题数: {len(titles)}")
+    if not titles:
+        print("页面中没有匹配到热搜标题")
+        return
+
+    legacy_time, legacy = timeit(lambda: legacy_title_urls(html_content, titles), args.repeat)
+    index_time, indexed = timeit(lambda: index_title_urls(html_content, titles), args.repeat)
+
+    if legacy != indexed:
+        print("结果不一致!")
+        sys.exit(1)
+
+    print(f"逐标题搜索: {legacy_time * 1000:.1f} ms")
+    print(f"单次索引:   {index_time * 1000:.1f} ms")
+    print(f"加速比:     {legacy_time / index_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""计数文本解析的正确性校验与性能对比
+
+用法:
+    python benchmarks/bench_count_parser.py [--count N] [--repeat N]
+
+先用tests/count_cases.py中各平台页面上出现过的写法校验utils.count_parser（任何一条不符都会以非零状态退出），
+再与各爬虫原来复制粘贴的"正则+手动乘10000"写法对比逐条和批量解析的耗时。
+"""
+import gc
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.count_parser import parse_count, parse_counts
+from tests.count_cases import GOLDEN_CASES
+
+def legacy_parse(text):
+    """各爬虫原来的写法：只认识"万"，千位分隔符和"亿"都会解析错"""
+    match = re.search(r"(\d+(?:\.\d+)?)(?:万)?", text)
+    if not match:
+        return 0
+    hot_num = float(match.group(1))
+    if "万" in text:
+        hot_num *= 10000
+    return int(hot_num)
+
+def check_golden():
+    failures = 0
+    for platform, cases in GOLDEN_CASES.items():
+        for text, expected in cases:
+            result = parse_count(text)
+            if result != expected:
+                failures += 1
+                print(f"[失败] {platform}: parse_count({text!r}) = {result!r}，期望 {expected!r}")
+    total = sum(len(cases) for cases in GOLDEN_CASES.values())
+    print(f"校验 {total} 条，失败 {failures} 条")
+    return failures
+
+def build_inputs(count):
+    rng = random.Random(7)
+    templates = [
+        lambda: f"{rng.randint(1, 9999)}.{rng.randint(0, 9)}万热度",
+        lambda: f"{rng.randint(100000, 9999999):,}",
+        lambda: str(rng.randint(1, 9999999)),
+        lambda: f"热 {rng.randint(1, 999)}.{rng.randint(0, 9)}万",
+        lambda: f"{rng.randint(1, 99)}.{rng.randint(0, 9)}亿",
+        lambda: f"{rng.randint(1, 999)}回应",
+    ]
+    return [rng.choice(templates)() for _ in range(count)]
+
+def best_time(func, repeat):
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="计数文本解析校验与性能对比")
+    parser.add_argument("--count", type=int, default=100000, help="参与计时的文本条数")
+    parser.add_argument("--repeat", type=int, default=21, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    failures = check_golden()
+    # 批量接口与逐条解析的结果必须一致
+    for cases in GOLDEN_CASES.values():
+        texts = [text for text, _ in cases]
+        if parse_counts(texts) != [parse_count(text) for text in texts]:
+            failures += 1
+            print(f"[失败] parse_counts与parse_count结果不一致: {texts!r}")
+
+    texts = build_inputs(args.count)
+    legacy_time = best_time(lambda: [legacy_parse(text) for text in texts], args.repeat)
+    single_time = best_time(lambda: [parse_count(text) for text in texts], args.repeat)
+    batch_time = best_time(lambda: parse_counts(texts), args.repeat)
+    mismatched = sum(1 for old, new in zip((legacy_parse(t) for t in texts), parse_counts(texts)) if old != new)
+
+    print(f"{args.count} 条文本:")
+    print(f"  原写法(逐条re.search)   {legacy_time * 1000:8.1f} ms")
+    print(f"  parse_count逐条调用     {single_time * 1000:8.1f} ms  ({legacy_time / single_time:.2f}x)")
+    print(f"  parse_counts批量调用    {batch_time * 1000:8.1f} ms  ({legacy_time / batch_time:.2f}x)")
+    print(f"  原写法结果错误的条数    {mismatched}（千位分隔符、亿）")
+
+    # 统一热度榜的输入是规范化后的热度，大多已经是整数
+    numbers = [parse_count(text) for text in texts]
+    single_time = best_time(lambda: [parse_count(number) for number in numbers], args.repeat)
+    batch_time = best_time(lambda: parse_counts(numbers), args.repeat)
+    print(f"{args.count} 个整数热度:")
+    print(f"  parse_count逐条调用     {single_time * 1000:8.1f} ms")
+    print(f"  parse_counts批量调用    {batch_time * 1000:8.1f} ms  ({single_time / batch_time:.2f}x)")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""各平台页面在不同HTML解析后端下的解析与选择器耗时对比
+
+用法:
+    python benchmarks/bench_html_parsers.py [--pages 目录] [--synthetic] [--record] [--repeat N]
+
+默认使用仓库中benchmarks/pages/下保存的各平台页面，文件名为平台名（如 weibo.html、hupu.html）；
+目录中缺少的平台或指定--synthetic时，生成与其页面结构相近的合成页面。
+--record 从各平台的web_url重新抓取页面并覆盖目录中保存的文件。
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import CrawlerConfig
+from utils.charset import resolve_encoding
+from utils.helpers import build_scope_strainer, make_request
+
+DEFAULT_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+# 各平台BeautifulSoup回退中使用的选择器
+PLATFORM_SELECTORS = {
+    "weibo": ["tbody tr", ".card-wrap", ".data-list .list_a li", ".HotList_list_3HSTeYk .HotList_item_1xZPJYE"],
+    "hupu": [".bbs-sl-web-post-body .post-list .post-item", ".bbs-sl-table-wrapper tbody tr",
+             ".bbs-index-web-post-layout .post-list .post-item", ".hupu-thread-item-wrap"],
+    "douyin": [".hot-board-container .hot-board-item", ".hot-container .hot-item",
+               ".rank-content-container .rank-item", ".search-card-hot-list .search-card-hot-item"],
+    "baidu": [".hot-list li", ".content_1YWBm .item-wrap_2oCLZ", "[class*='content_'] [class*='item-wrap_']"],
+    "36kr": ["div.hotlist-item", "div.kr-home-flow-item", "div.article-item", "div.kr-flow-article-item"],
+    "bilibili": [".rank-item", ".video-card", ".bili-video-card"],
+    "douban": [".channel-item"],
+    "zhihu": ["script"],
+    "it_news": ["div.article-item", "div.kr-flow-article-item"],
+}
+
+# 合成页面中实际出现的列表项结构
+ITEM_TEMPLATES = {
+    "weibo": '<tr><td class="td-01">{rank}</td><td class="td-02"><a href="/weibo?q={rank}">{title}</a><span>{hot}</span></td></tr>',
+    "hupu": '<div class="hupu-thread-item-wrap"><a class="t-title" href="/{rank}.html">{title}</a><span class="t-lights">{hot}</span></div>',
+    "douyin": '<div class="hot-item"><div class="hot-item-title">{title}</div><div class="hot-item-count">{hot}</div></div>',
+    "baidu": '<div class="item-wrap_2oCLZ"><div class="index_1Ew5p">{rank}</div><div class="c-single-text-ellipsis">{title}</div><div class="hot-index_1Bl1a">{hot}</div></div>',
+    "36kr": '<div class="kr-flow-article-item"><a class="article-item-title" href="/p/{rank}">{title}</a><div class="summary">{title}</div></div>',
+    "bilibili": '<li class="rank-item"><div class="num">{rank}</div><a class="title" href="//www.bilibili.com/video/{rank}">{title}</a><div class="detail-state"><span class="data-box">{hot}</span></div></li>',
+    "douban": '<div class="channel-item"><div class="title"><a href="/group/topic/{rank}/">{title}</a></div><div class="content"><p>{title}</p></div></div>',
+    "zhihu": '{{"target": {{"title": "{title}", "question": {{"id": {rank}}}}}, "detail_text": "{hot}热度"}}',
+    "it_news": '<div class="kr-flow-article-item"><h3><a href="/p/{rank}">{title}</a></h3><div class="summary">{title}</div></div>',
+}
+
+ITEM_CONTAINERS = {
+    "weibo": '<table><tbody>{items}</tbody></table>',
+    "hupu": '<div class="list">{items}</div>',
+    "douyin": '<div class="hot-container">{items}</div>',
+    "baidu": '<div class="content_1YWBm">{items}</div>',
+    "36kr": '<div class="flow">{items}</div>',
+    "bilibili": '<ul class="rank-list">{items}</ul>',
+    "douban": '<div class="article">{items}</div>',
+    "zhihu": '<script>window.initialState = {{"topstory": {{"hotList": [{items}]}}}};</script>',
+    "it_news": '<div class="information-flow-list">{items}</div>',
+}
+
+def build_page(platform, count=50, noise_blocks=1500):
+    """生成合成页面：列表项前后夹杂大量导航、脚本等无关节点，接近真实页面的规模"""
+    rng = random.Random(platform)
+    noise = "".join(
+        f'<div class="nav-{i}"><ul><li><a href="/n/{i}">导航{i}</a></li><li><span>{rng.random():.6f}</span></li></ul></div>'
+        for i in range(noise_blocks)
+    )
+    items = ("," if platform == "zhihu" else "").join(
+        ITEM_TEMPLATES[platform].format(rank=i + 1, title=f"热点标题{i}", hot=f"{rng.randint(1, 999)}万")
+        for i in range(count)
+    )
+    body = ITEM_CONTAINERS[platform].format(items=items)
+    return f'<html><head><title>{platform}</title><script>var s = "{"x" * 20000}";</script></head><body>{noise}{body}{noise}</body></html>'
+
+def available_backends():
+    backends = ["html.parser"]
+    for name, module in (("lxml", "lxml"), ("html5lib", "html5lib")):
+        if importlib.util.find_spec(module) is not None:
+            backends.append(name)
+    return backends
+
+def load_pages(pages_dir, synthetic=False):
+    """读取保存的页面，缺少的平台使用合成页面"""
+    pages = {}
+    for platform in PLATFORM_SELECTORS:
+        path = os.path.join(pages_dir, f"{platform}.html")
+        if not synthetic and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                pages[platform] = f.read()
+        else:
+            print(f"{platform}: 使用合成页面")
+            pages[platform] = build_page(platform)
+    return pages
+
+def record_pages(pages_dir):
+    """从各平台的web_url抓取页面，以UTF-8保存到pages_dir"""
+    os.makedirs(pages_dir, exist_ok=True)
+    for platform in PLATFORM_SELECTORS:
+        url = CrawlerConfig.PLATFORMS.get(platform, {}).get("web_url")
+        response = make_request(url) if url else None
+        if response is None or response.status_code != 200:
+            print(f"{platform}: 抓取 {url} 失败，保留原有页面")
+            continue
+        response.encoding = resolve_encoding(response.content, response.headers)
+        with open(os.path.join(pages_dir, f"{platform}.html"), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"{platform}: 已保存 {url}（{len(response.content) / 1024:.0f} KB）")
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run_selectors(soup, selectors):
+    for selector in selectors:
+        if soup.select(selector):
+            return
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML解析后端性能对比")
+    parser.add_argument("--pages", default=DEFAULT_PAGES_DIR, help="保存的页面目录，文件名为平台名.html")
+    parser.add_argument("--synthetic", action="store_true", help="全部使用合成页面")
+    parser.add_argument("--record", action="store_true", help="重新抓取各平台页面并覆盖保存的文件")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.pages)
+    pages = load_pages(args.pages, args.synthetic)
+    backends = available_backends()
+    print(f"可用后端: {', '.join(backends)}")
+    print(f"{'平台':<8}{'大小':>8}  {'后端':<12}{'解析(ms)':>10}{'选择器(ms)':>12}{'逐策略解析(ms)':>16}{'范围解析(ms)':>14}")
+
+    for platform, html in pages.items():
+        selectors = PLATFORM_SELECTORS[platform]
+        strainer = build_scope_strainer(CrawlerConfig.PLATFORMS.get(platform, {}).get("parse_scope"))
+        for backend in backends:
+            parse_time = best_time(lambda: BeautifulSoup(html, backend), args.repeat)
+            soup = BeautifulSoup(html, backend)
+            select_time = best_time(lambda: run_selectors(soup, selectors), args.repeat)
+            # 旧实现中每个回退策略各自解析一次页面
+            reparse_time = parse_time * len(selectors) + select_time
+            # 按平台parse_scope只构建热榜容器子树（html5lib不支持parse_only）
+            scoped_time = ""
+            if strainer is not None and backend != "html5lib":
+                scoped_time = f"{best_time(lambda: BeautifulSoup(html, backend, parse_only=strainer), args.repeat) * 1000:.1f}"
+            print(f"{platform:<8}{len(html) / 1024:>6.0f}KB  {backend:<12}{parse_time * 1000:>10.1f}"
+                  f"{select_time * 1000:>12.1f}{reparse_time * 1000:>16.1f}{scoped_time:>14}")
+
+if __name__ == "__main__":
+    main()
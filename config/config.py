@@ -2,7 +2,6 @@ import os
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
-import json
 
 # 加载环境变量
 load_dotenv()
@@ -14,6 +13,9 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT_DIR, "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 运行状态目录（熔断器等需要跨调度周期保留的状态）
+STATE_DIR = os.path.join(DATA_DIR, "state")
+
 # 日志配置
 LOG_DIR = os.path.join(ROOT_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -30,56 +32,76 @@ PLATFORMS = {
         "use_api": True,
         "api_url": "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total?limit=50",
         "web_url": "https://www.zhihu.com/hot",
-        "max_items": 50
+        "max_items": 50,
+        "parse_scope": {"tags": ["script"]},  # 只解析脚本，initialState在其中
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "36kr": {
         "enabled": True,
         "use_api": True,
         "api_url": "https://36kr.com/api/newsflash/catalog",
         "web_url": "https://36kr.com/hot-list/catalog",
-        "max_items": 30
+        "max_items": 30,
+        "parse_scope": {"classes": ["hotlist-item", "kr-home-flow-item", "article-item", "kr-flow-article-item"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "baidu": {
         "enabled": True,
         "use_api": True,
         "api_url": "https://top.baidu.com/api/board?platform=wise&tab=realtime",
         "web_url": "https://top.baidu.com/board?tab=realtime",
-        "max_items": 30
+        "max_items": 30,
+        "parse_scope": {"classes": ["hot-list", "content_*"]},  # 以*结尾表示类名前缀
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "bilibili": {
         "enabled": True,
         "use_api": True,
         "api_url": "https://api.bilibili.com/x/web-interface/popular/series/one",
         "web_url": "https://www.bilibili.com/v/popular/rank/all",
-        "max_items": 100
+        "max_items": 100,
+        "rate_limit": {"rate": 0.5, "burst": 2},  # 每秒请求数和突发数，按主机限流
+        "parse_scope": {"classes": ["rank-item", "video-card", "bili-video-card"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "weibo": {
         "enabled": True,
         "use_api": True,
         "api_url": "https://weibo.com/ajax/side/hotSearch",
         "web_url": "https://s.weibo.com/top/summary",
-        "max_items": 50
+        "max_items": 50,
+        "rate_limit": {"rate": 0.5, "burst": 2},  # 每秒请求数和突发数，按主机限流
+        "parse_scope": {"classes": ["data", "card-wrap", "data-list", "HotList_list_3HSTeYk"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "douyin": {
         "enabled": True,
         "use_api": True,
         "api_url": "https://www.douyin.com/aweme/v1/web/hot/search/list/",
         "web_url": "https://www.douyin.com/hot",
-        "max_items": 50
+        "max_items": 50,
+        "rate_limit": {"rate": 0.5, "burst": 2},  # 每秒请求数和突发数，按主机限流
+        "parse_scope": {"classes": ["hot-board-container", "hot-container", "rank-content-container", "search-card-hot-list"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "hupu": {
         "enabled": True,
         "use_api": False,
         "api_url": "",
         "web_url": "https://bbs.hupu.com/all-gambia",
-        "max_items": 30
+        "max_items": 30,
+        "rate_limit": {"rate": 0.5, "burst": 2},  # 每秒请求数和突发数，按主机限流
+        "parse_scope": {"classes": ["bbs-sl-web-post-body", "bbs-sl-table-wrapper", "bbs-index-web-post-layout", "hupu-thread-item-wrap"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "douban": {
         "enabled": True,
         "use_api": False,
         "api_url": "",
         "web_url": "https://www.douban.com/group/explore",
-        "max_items": 30
+        "max_items": 30,
+        "parse_scope": {"classes": ["channel-item"]},
+        "encoding": "utf-8"  # 页面和接口的编码，响应头没有声明时直接使用，不再探测
     },
     "it_news": {
         "enabled": True,
@@ -94,6 +116,7 @@ PLATFORMS = {
 class CrawlerConfig:
     # 添加DATA_DIR作为类属性
     DATA_DIR = DATA_DIR
+    STATE_DIR = STATE_DIR
     
     # 添加PLATFORMS作为类属性
     PLATFORMS = PLATFORMS
@@ -102,7 +125,34 @@ class CrawlerConfig:
     USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     REQUEST_TIMEOUT = 10  # 秒
     RETRY_TIMES = 3
-    RETRY_DELAY = 2  # 秒
+    RETRY_DELAY = 2  # 秒，指数退避的基础延迟
+    MAX_RETRY_DELAY = 30  # 秒，指数退避的上限
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "10"))  # 异步模式下全局同时进行的请求数
+    DEFAULT_RATE_LIMIT = {"rate": 2, "burst": 5}  # 未单独配置rate_limit的平台使用的主机限流
+    HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "1.5"))  # 秒，备用URL的对冲启动延迟，平台可用hedge_delay覆盖
+    
+    # 熔断器：端点连续失败后在恢复时间内直接跳过
+    CIRCUIT_BREAKER = os.getenv("CIRCUIT_BREAKER", "true").lower() == "true"
+    BREAKER_FAILURE_THRESHOLD = 5
+    BREAKER_RECOVERY_TIMEOUT = 300  # 秒
+    BREAKER_STATE_PATH = os.path.join(STATE_DIR, "circuit_breakers.json")
+    
+    # 自适应策略：记录端点/模式/选择器的成败，下次优先尝试最近成功的
+    ADAPTIVE_STRATEGIES = os.getenv("ADAPTIVE_STRATEGIES", "true").lower() == "true"
+    STRATEGY_STATE_PATH = os.path.join(STATE_DIR, "strategies.json")
+    
+    # 内容去重：响应体与上次相同时跳过解析，榜单除时间戳外完全相同时跳过各平台的写入；
+    # 汇总、热度榜等整次运行的输出改用LAST_BATCH_DIR中该平台上次写入的数据
+    CONTENT_DEDUP = os.getenv("CONTENT_DEDUP", "true").lower() == "true"
+    FINGERPRINT_STATE_PATH = os.path.join(STATE_DIR, "fingerprints.json")
+    LAST_BATCH_DIR = os.path.join(STATE_DIR, "last_batch")
+    
+    # HTML解析后端，lxml不可用时自动退回html.parser
+    HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+    
+    # 条件请求缓存（ETag/Last-Modified）
+    HTTP_CACHE = os.getenv("HTTP_CACHE", "true").lower() == "true"
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(DATA_DIR, "http_cache"))
     
     # 代理设置
     USE_PROXY = os.getenv("USE_PROXY", "false").lower() == "true"
@@ -110,8 +160,34 @@ class CrawlerConfig:
     
     # 输出配置
     OUTPUT_FORMATS = os.getenv("OUTPUT_FORMAT", "json").split(",")
+    # 流水线输出：默认写各文件格式、ndjson、diff、stories、leaderboard、summary，可用SINKS单独指定；
+    # parquet、timeseries、db每次运行都有额外的写入或依赖，按需加入
+    SINKS = [name.strip() for name in os.getenv("SINKS", ",".join(OUTPUT_FORMATS + ["ndjson", "diff", "stories", "leaderboard", "summary"])).split(",") if name.strip()]
+    SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+    # 快照差异：与上一次快照比较，变化记录写入data/deltas，热度相对变化超过阈值才记为变化
+    DIFF_STATE_PATH = os.path.join(STATE_DIR, "snapshot_diff.json")
+    DIFF_HOT_THRESHOLD = float(os.getenv("DIFF_HOT_THRESHOLD", "0.2"))
+    # 跨平台故事：不同平台的近似重复标题归为同一事件，超过保留天数未再上榜的故事会被清理
+    STORY_STATE_PATH = os.path.join(STATE_DIR, "stories.json")
+    STORY_RETENTION_DAYS = int(os.getenv("STORY_RETENTION_DAYS", "14"))
+    # 统一热度榜：各平台热度按最近SCORE_WINDOW批数据做稳健标准化后合并排序
+    SCORE_STATE_PATH = os.path.join(STATE_DIR, "hot_scores.json")
+    SCORE_WINDOW = int(os.getenv("SCORE_WINDOW", "24"))
+    # Parquet归档（SINKS中包含parquet时写入），每天维护时把前一天的小文件合并
+    ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+    # 条目时间序列（SINKS中包含timeseries时写入），每天维护时把超过TIMESERIES_RAW_HOURS的点按小时合并
+    TIMESERIES_DIR = os.path.join(DATA_DIR, "timeseries")
+    TIMESERIES_RAW_HOURS = int(os.getenv("TIMESERIES_RAW_HOURS", "48"))
+    # 每天执行归档合并、时间序列降采样等维护任务的时间
+    MAINTENANCE_TIME = os.getenv("MAINTENANCE_TIME", "00:10")
     SAVE_TO_DB = os.getenv("SAVE_TO_DB", "false").lower() == "true"
     
+    # 数据库输出（SAVE_TO_DB=true或SINKS中包含db时启用）：默认SQLite，可选mongo
+    DB_BACKEND = os.getenv("DB_BACKEND", "sqlite")
+    DB_PATH = os.getenv("DB_PATH", os.path.join(DATA_DIR, "hotnews.db"))
+    MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+    MONGODB_DB = os.getenv("MONGODB_DB", "hotnews")
+    
     # 调度配置
     SCHEDULE_INTERVAL = int(os.getenv("SCHEDULE_INTERVAL", "60"))  # 分钟
     
@@ -162,35 +238,9 @@ class CrawlerConfig:
         
         return logger
     
-    def get_output_file(self):
-        """获取输出文件路径"""
-        date_str = datetime.now().strftime("%Y%m%d")
-        if OUTPUT_FORMAT == "json":
-            return os.path.join(DATA_DIR, f"{self.platform}_{date_str}.json")
-        elif OUTPUT_FORMAT == "csv":
-            return os.path.join(DATA_DIR, f"{self.platform}_{date_str}.csv")
-        elif OUTPUT_FORMAT == "excel":
-            return os.path.join(DATA_DIR, f"{self.platform}_{date_str}.xlsx")
-        else:
-            return os.path.join(DATA_DIR, f"{self.platform}_{date_str}.json")
-    
     @staticmethod
     def get_output_filename(platform, fmt="json"):
         """生成输出文件名"""
         date_str = datetime.now().strftime("%Y%m%d")
         return os.path.join(DATA_DIR, f"{platform}_{date_str}.{fmt}")
-    
-    @staticmethod
-    def save_data(platform, data, fmt="json"):
-        """保存数据到文件"""
-        filename = CrawlerConfig.get_output_filename(platform, fmt)
-        
-        if fmt == "json":
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        elif fmt == "csv":
-            import pandas as pd
-            df = pd.DataFrame(data)
-            df.to_csv(filename, index=False, encoding="utf-8")
-        
-        return filename 
\ No newline at end of file
+ 
\ No newline at end of file
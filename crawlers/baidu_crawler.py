@@ -1,7 +1,35 @@
 import re
+import bisect
 import requests
-import json
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
+from utils.json_extractor import extract_json
+
+_HREF_PATTERN = re.compile(r'href="([^"]+)"')
+
+def index_title_urls(html_content, titles):
+    """为每个标题找到其在页面中首次出现之后的第一个链接
+    
+    结果与逐个标题执行 re.search(f'{re.escape(title)}.*?href="([^"]+)"', html_content, re.DOTALL)
+    相同（包括一个标题出现在另一个标题内部的情况），但链接只扫描一遍：先建立链接位置索引，
+    每个标题用str.find定位首次出现的位置，再用二分查找取其后的第一个链接。
+    """
+    wanted = set(title for title in titles if title)
+    if not wanted:
+        return {}
+    
+    anchors = [(match.start(), match.group(1)) for match in _HREF_PATTERN.finditer(html_content)]
+    anchor_starts = [start for start, _ in anchors]
+    
+    urls = {}
+    for title in wanted:
+        start = html_content.find(title)
+        if start < 0:
+            continue
+        index = bisect.bisect_left(anchor_starts, start + len(title))
+        if index < len(anchors):
+            urls[title] = anchors[index][1]
+    return urls
 
 class BaiduCrawler(BaseCrawler):
     """百度热搜爬虫"""
@@ -29,192 +57,198 @@ class BaiduCrawler(BaseCrawler):
                 self.logger.error("获取网页内容失败")
                 return []
                 
-            html_content = response.text
-            
-            # 尝试从HTML中提取热搜数据
-            items = []
+            html_content = self.response_text(response)
             
-            # 方法1：尝试从页面中提取JSON数据
-            json_data = None
+            # 按历史表现依次尝试各解析方法，最近成功的方法优先
+            return self.run_strategies("parsers", [
+                ("s_data", lambda: self._parse_s_data(html_content)),
+                ("hot_regex", lambda: self._parse_hot_regex(html_content)),
+                ("rank_regex", lambda: self._parse_rank_regex(html_content)),
+                ("soup", lambda: self._parse_soup(html_content)),
+            ])
             
-            # 查找包含热搜数据的JSON
-            json_pattern = re.search(r'<!--s-data:(.*?)-->', html_content, re.DOTALL)
-            if json_pattern:
-                try:
-                    json_str = json_pattern.group(1).strip()
-                    json_data = json.loads(json_str)
-                except Exception as e:
-                    self.logger.warning(f"解析JSON数据失败: {str(e)}")
-            
-            # 如果找到JSON数据，从中提取热搜
-            if json_data and "data" in json_data and "cards" in json_data["data"]:
-                for card in json_data["data"]["cards"]:
-                    if "content" in card and isinstance(card["content"], list):
-                        for i, item in enumerate(card["content"]):
-                            try:
-                                if "word" not in item:
-                                    continue
-                                    
-                                title = item.get("word", "")
-                                url = item.get("url", "")
-                                hot_value = item.get("hotScore", 0)
-                                
-                                # 提取排名
-                                rank = i + 1
-                                if "index" in item and str(item["index"]).isdigit():
-                                    rank = int(item["index"])
-                                
-                                # 提取分类
-                                category = item.get("category", "")
-                                
-                                items.append({
-                                    "rank": rank,
-                                    "title": title,
-                                    "url": url,
-                                    "hot_value": hot_value,
-                                    "category": category
-                                })
-                                
-                            except Exception as e:
-                                self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"爬取百度热搜失败: {str(e)}")
+            return []
+    
+    def _parse_s_data(self, html_content):
+        """方法1：尝试从页面中提取JSON数据"""
+        items = []
+        # 查找包含热搜数据的JSON
+        json_data = extract_json(html_content, "<!--s-data:")
+        
+        # 如果找到JSON数据，从中提取热搜
+        if json_data and "data" in json_data and "cards" in json_data["data"]:
+            for card in json_data["data"]["cards"]:
+                if self.budget_full(items):
+                    break
+                if "content" in card and isinstance(card["content"], list):
+                    for i, item in enumerate(card["content"]):
+                        if self.budget_full(items):
+                            break
+                        try:
+                            if "word" not in item:
                                 continue
-                
-                if items:
-                    return items
-            
-            # 方法2：直接从页面中提取热搜数据
-            # 查找热搜指数和标题
-            pattern = r'热搜指数\s*</div>\s*<div[^>]*>\s*([0-9,]+)\s*</div>.*?<div[^>]*class="c-single-text-ellipsis"[^>]*>(.*?)</div>'
-            matches = re.findall(pattern, html_content, re.DOTALL)
-            
-            if not matches:
-                # 尝试另一种模式
-                pattern = r'热搜指数\s*</div>\s*<div[^>]*>\s*([0-9,]+)\s*</div>.*?<div[^>]*>(.*?)</div>'
-                matches = re.findall(pattern, html_content, re.DOTALL)
-            
-            if matches:
-                for i, (hot_value_str, title) in enumerate(matches):
-                    try:
-                        # 清理数据
-                        hot_value = int(hot_value_str.replace(',', ''))
-                        title = re.sub(r'<[^>]+>', '', title).strip()
-                        
-                        if not title:
-                            continue
+                                
+                            title = item.get("word", "")
+                            url = item.get("url", "")
+                            hot_value = item.get("hotScore", 0)
                             
-                        # 尝试提取URL
-                        url = ""
-                        url_pattern = re.search(f'{re.escape(title)}.*?href="([^"]+)"', html_content, re.DOTALL)
-                        if url_pattern:
-                            url = url_pattern.group(1)
-                        
-                        items.append({
-                            "rank": i + 1,
-                            "title": title,
-                            "url": url,
-                            "hot_value": hot_value,
-                            "category": ""
-                        })
-                        
-                    except Exception as e:
-                        self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
-                        continue
-                
-                if items:
-                    return items
-            
-            # 方法3：使用正则表达式直接提取热搜数据
-            pattern = r'<div[^>]*>\s*([0-9]+)\s*</div>.*?<div[^>]*>\s*([0-9,]+)\s*</div>.*?热搜指数.*?>(.*?)<'
-            matches = re.findall(pattern, html_content, re.DOTALL)
-            
-            if matches:
-                for rank_str, hot_value_str, title in matches:
-                    try:
-                        # 清理数据
-                        rank = int(rank_str.strip())
-                        hot_value = int(hot_value_str.replace(',', ''))
-                        title = re.sub(r'<[^>]+>', '', title).strip()
-                        
-                        if not title:
-                            continue
+                            # 提取排名
+                            rank = i + 1
+                            if "index" in item and str(item["index"]).isdigit():
+                                rank = int(item["index"])
+                            
+                            # 提取分类
+                            category = item.get("category", "")
+                            
+                            items.append({
+                                "rank": rank,
+                                "title": title,
+                                "url": url,
+                                "hot_value": hot_value,
+                                "category": category
+                            })
                             
-                        items.append({
-                            "rank": rank,
-                            "title": title,
-                            "url": "",
-                            "hot_value": hot_value,
-                            "category": ""
-                        })
-                        
-                    except Exception as e:
-                        self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+                        except Exception as e:
+                            self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+                            continue
+        
+        return items
+    
+    def _parse_hot_regex(self, html_content):
+        """方法2：直接从页面中提取热搜数据"""
+        items = []
+        # 查找热搜指数和标题，第一种模式没有结果时尝试另一种模式
+        patterns = [
+            r'热搜指数\s*</div>\s*<div[^>]*>\s*([0-9,]+)\s*</div>.*?<div[^>]*class="c-single-text-ellipsis"[^>]*>(.*?)</div>',
+            r'热搜指数\s*</div>\s*<div[^>]*>\s*([0-9,]+)\s*</div>.*?<div[^>]*>(.*?)</div>',
+        ]
+        
+        entries = []
+        for pattern in patterns:
+            # 逐个匹配，取够max_items条后不再扫描页面的剩余部分
+            for i, match in enumerate(re.finditer(pattern, html_content, re.DOTALL)):
+                if self.budget_full(entries):
+                    break
+                try:
+                    hot_value_str, title = match.groups()
+                    # 清理数据
+                    hot_value = int(hot_value_str.replace(',', ''))
+                    title = re.sub(r'<[^>]+>', '', title).strip()
+                    
+                    if not title:
                         continue
-            
-            # 如果以上方法都失败，尝试使用BeautifulSoup解析
-            if not items:
-                soup = self.get_soup(self.web_url, headers=headers)
-                if not soup:
-                    self.logger.error("获取网页内容失败")
-                    return []
+                    
+                    entries.append((i + 1, title, hot_value))
+                    
+                except Exception as e:
+                    self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+                    continue
+            if entries:
+                break
+        
+        if entries:
+            # 一次扫描页面为所有标题提取URL
+            title_urls = index_title_urls(html_content, [title for _, title, _ in entries])
+            for rank, title, hot_value in entries:
+                items.append({
+                    "rank": rank,
+                    "title": title,
+                    "url": title_urls.get(title, ""),
+                    "hot_value": hot_value,
+                    "category": ""
+                })
+        
+        return items
+    
+    def _parse_rank_regex(self, html_content):
+        """方法3：使用正则表达式直接提取热搜数据"""
+        items = []
+        pattern = r'<div[^>]*>\s*([0-9]+)\s*</div>.*?<div[^>]*>\s*([0-9,]+)\s*</div>.*?热搜指数.*?>(.*?)<'
+        
+        for match in re.finditer(pattern, html_content, re.DOTALL):
+            if self.budget_full(items):
+                break
+            try:
+                rank_str, hot_value_str, title = match.groups()
+                # 清理数据
+                rank = int(rank_str.strip())
+                hot_value = int(hot_value_str.replace(',', ''))
+                title = re.sub(r'<[^>]+>', '', title).strip()
                 
-                # 尝试查找热搜列表
-                hot_items = soup.select(".hot-list li") or soup.select(".content_1YWBm .item-wrap_2oCLZ") or soup.select("[class*='content_'] [class*='item-wrap_']")
+                if not title:
+                    continue
+                    
+                items.append({
+                    "rank": rank,
+                    "title": title,
+                    "url": "",
+                    "hot_value": hot_value,
+                    "category": ""
+                })
                 
-                for i, hot_item in enumerate(hot_items):
-                    try:
-                        # 提取排名
-                        rank = i + 1
-                        rank_elem = hot_item.select_one(".index_1Ew5p") or hot_item.select_one(".num") or hot_item.select_one("[class*='index_']")
-                        if rank_elem and rank_elem.text.strip().isdigit():
-                            rank = int(rank_elem.text.strip())
-                        
-                        # 提取标题和URL
-                        title_elem = hot_item.select_one(".c-single-text-ellipsis") or hot_item.select_one(".content_1YWBm") or hot_item.select_one("[class*='content_']")
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.text.strip()
-                        url = ""
-                        
-                        link_elem = hot_item.select_one("a")
-                        if link_elem and link_elem.has_attr("href"):
-                            url = link_elem["href"]
-                        
-                        # 提取热度
-                        hot_value = 0
-                        hot_elem = hot_item.select_one(".hot-index_1Bl1a") or hot_item.select_one(".hot-degree") or hot_item.select_one("[class*='hot-index_']")
-                        if hot_elem:
-                            hot_text = hot_elem.text.strip()
-                            try:
-                                if "万" in hot_text:
-                                    hot_value = int(float(hot_text.replace("万", "")) * 10000)
-                                else:
-                                    hot_value = int(re.sub(r"\D", "", hot_text))
-                            except:
-                                pass
-                        
-                        # 提取分类标签
-                        category = ""
-                        tag_elem = hot_item.select_one(".label_3xnwR") or hot_item.select_one(".tag") or hot_item.select_one("[class*='label_']")
-                        if tag_elem:
-                            category = tag_elem.text.strip()
-                        
-                        item = {
-                            "rank": rank,
-                            "title": title,
-                            "url": url,
-                            "hot_value": hot_value,
-                            "category": category
-                        }
-                        
-                        items.append(item)
-                        
-                    except Exception as e:
-                        self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
-                        continue
-            
-            return items
-            
-        except Exception as e:
-            self.logger.error(f"爬取百度热搜失败: {str(e)}")
-            return [] 
\ No newline at end of file
+            except Exception as e:
+                self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+                continue
+        
+        return items
+    
+    def _parse_soup(self, html_content):
+        """方法4：使用BeautifulSoup解析已获取的页面"""
+        items = []
+        
+        # 尝试查找热搜列表
+        hot_items = (self.iselect(html_content, ".hot-list li") or
+                     self.iselect(html_content, ".content_1YWBm .item-wrap_2oCLZ") or
+                     self.iselect(html_content, "[class*='content_'] [class*='item-wrap_']"))
+        
+        for i, hot_item in enumerate(hot_items):
+            if self.budget_full(items):
+                break
+            try:
+                # 提取排名
+                rank = i + 1
+                rank_elem = hot_item.select_one(".index_1Ew5p") or hot_item.select_one(".num") or hot_item.select_one("[class*='index_']")
+                if rank_elem and rank_elem.text.strip().isdigit():
+                    rank = int(rank_elem.text.strip())
+                
+                # 提取标题和URL
+                title_elem = hot_item.select_one(".c-single-text-ellipsis") or hot_item.select_one(".content_1YWBm") or hot_item.select_one("[class*='content_']")
+                if not title_elem:
+                    continue
+                    
+                title = title_elem.text.strip()
+                url = ""
+                
+                link_elem = hot_item.select_one("a")
+                if link_elem and link_elem.has_attr("href"):
+                    url = link_elem["href"]
+                
+                # 提取热度
+                hot_value = 0
+                hot_elem = hot_item.select_one(".hot-index_1Bl1a") or hot_item.select_one(".hot-degree") or hot_item.select_one("[class*='hot-index_']")
+                if hot_elem:
+                    hot_value = parse_count(hot_elem.text.strip())
+                
+                # 提取分类标签
+                category = ""
+                tag_elem = hot_item.select_one(".label_3xnwR") or hot_item.select_one(".tag") or hot_item.select_one("[class*='label_']")
+                if tag_elem:
+                    category = tag_elem.text.strip()
+                
+                item = {
+                    "rank": rank,
+                    "title": title,
+                    "url": url,
+                    "hot_value": hot_value,
+                    "category": category
+                }
+                
+                items.append(item)
+                
+            except Exception as e:
+                self.logger.warning(f"处理百度热搜条目时出错: {str(e)}")
+                continue
+        
+        return items
@@ -1,6 +1,17 @@
+import time
+import asyncio
 import logging
+from itertools import chain
 from abc import ABC, abstractmethod
-from utils.helpers import make_request, get_soup, normalize_data
+from utils.helpers import make_request, make_hedged_request, parse_html, build_scope_strainer
+from utils.hot_item import normalize_batch
+from crawlers.pipeline import CrawlPipeline
+from utils.async_engine import AsyncCrawlEngine
+from utils.http_cache import get_http_cache
+from utils.circuit_breaker import get_breaker_registry
+from utils.strategy_registry import get_strategy_registry
+from utils.fingerprint import ContentUnchanged, body_fingerprint, ranking_fingerprint, get_fingerprint_store
+from utils.charset import resolve_encoding
 from config.config import CrawlerConfig
 
 class BaseCrawler(ABC):
@@ -20,9 +31,140 @@ class BaseCrawler(ABC):
         self.api_url = self.config.get("api_url")
         self.web_url = self.config.get("web_url")
         self.max_items = self.config.get("max_items", 50)
+        self.parse_scope = self.config.get("parse_scope")
+        self.encoding = self.config.get("encoding")
         
-    def crawl(self):
-        """爬取热点数据"""
+        # 异步模式下由acrawl绑定的爬取引擎
+        self._engine = None
+        
+        # 最近一次解析的页面及其完整/范围文档树，同一响应的各解析策略共享
+        self._parsed = None
+        
+        # 本次运行最后一个可用响应的(URL, 响应体指纹)，写入成功后记入指纹存储
+        self._last_body = None
+        
+        # 本次运行是否遇到与上次相同的响应体，之后的请求直接返回None，爬虫的结果不再使用
+        self._unchanged = False
+        
+        # 本次运行解码响应体的字节数、耗时和编码，随运行记录写出
+        self._decode_stats = None
+        
+    def crawl(self, pipeline=None):
+        """爬取热点数据（同步入口，内部运行异步爬取）"""
+        return asyncio.run(self.acrawl(pipeline=pipeline))
+    
+    async def acrawl(self, engine=None, pipeline=None):
+        """异步爬取热点数据并写入流水线的各个输出
+        
+        未传入引擎时创建独立的引擎；未传入流水线时按配置创建一个，只用于本平台。
+        """
+        if engine is None:
+            async with AsyncCrawlEngine(CrawlerConfig.MAX_CONCURRENCY) as engine:
+                return await self.acrawl(engine, pipeline)
+        
+        self._engine = engine
+        try:
+            return await engine.run_in_worker(self._run_pipeline, pipeline)
+        finally:
+            self._engine = None
+            self._parsed = None
+            self._last_body = None
+            self._unchanged = False
+            self._decode_stats = None
+            # 保存本次运行记录的策略表现
+            if CrawlerConfig.ADAPTIVE_STRATEGIES:
+                get_strategy_registry(CrawlerConfig.STRATEGY_STATE_PATH).save()
+    
+    def _run_pipeline(self, pipeline):
+        """在工作线程中爬取数据并交给流水线输出"""
+        if pipeline is None:
+            with CrawlPipeline.from_config() as pipeline:
+                return self._run_pipeline(pipeline)
+        
+        self._decode_stats = {"decode_bytes": 0, "decode_ms": 0.0, "encoding": None}
+        self._unchanged = False
+        try:
+            items = self._crawl_blocking()
+        except ContentUnchanged as e:
+            self.logger.info(f"{self.platform_name} 内容与上次相同（{e.stage}），跳过{'解析和' if e.stage == 'body' else ''}写入")
+            if e.stage == "ranking":
+                self._save_fingerprints()
+            # 汇总类输出仍使用该平台上次写入的数据，返回这批数据供调用方展示
+            return pipeline.mark_unchanged(self.platform_name, e.stage, **self._decode_metrics())
+        
+        if items:
+            pipeline.emit(self.platform_name, items, **self._decode_metrics())
+            self._save_fingerprints(items)
+        return items
+    
+    def _decode_metrics(self):
+        """本次运行的解码指标，没有解码过响应体时为空"""
+        stats = self._decode_stats
+        if not stats or not stats["decode_bytes"]:
+            return {}
+        return dict(stats, decode_ms=round(stats["decode_ms"], 3))
+    
+    def _save_fingerprints(self, items=None):
+        """记录本次运行的响应体指纹和榜单指纹"""
+        if not CrawlerConfig.CONTENT_DEDUP:
+            return
+        url, body = self._last_body or (None, None)
+        get_fingerprint_store(CrawlerConfig.FINGERPRINT_STATE_PATH).update(
+            self.platform_name, url=url, body=body,
+            ranking=ranking_fingerprint(items) if items else None,
+        )
+    
+    def _check_body(self, url, response):
+        """响应体与上次产出数据的响应完全相同时记下本次内容未变化并返回True，调用方不再交出该响应
+        
+        不在这里抛出异常：爬虫代码中宽泛的except Exception会把它当成请求失败吞掉。
+        _crawl_blocking在爬虫返回后检查这个标记，爬虫本身不需要知道内容去重。
+        """
+        if not CrawlerConfig.CONTENT_DEDUP or not response or response.status_code != 200:
+            return False
+        fingerprint = body_fingerprint(response.content)
+        if get_fingerprint_store(CrawlerConfig.FINGERPRINT_STATE_PATH).body_unchanged(self.platform_name, url, fingerprint):
+            self.logger.info(f"{url} 的响应体与上次相同，本次运行不再解析响应，其余请求和回退也不再发出")
+            self._unchanged = True
+            return True
+        self._last_body = (url, fingerprint)
+        return False
+    
+    def _apply_encoding(self, response):
+        """为响应确定编码：响应头声明 > 平台配置的encoding > 开头的BOM/meta声明 > utf-8
+        
+        设置response.encoding后，response.text和response.json()不会再对整个响应体做字符集探测。
+        """
+        if response:
+            response.encoding = resolve_encoding(response.content, response.headers, self.encoding)
+    
+    def response_text(self, response):
+        """按已确定的编码把响应体解码为文本，并记录解码的字节数和耗时
+        
+        同一响应只应解码一次，得到的文本交给正则、JSON提取和HTML解析共用。
+        """
+        content = response.content
+        started = time.perf_counter()
+        text = content.decode(response.encoding or "utf-8", errors="replace")
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        if self._decode_stats is not None:
+            self._decode_stats["decode_bytes"] += len(content)
+            self._decode_stats["decode_ms"] += elapsed
+            self._decode_stats["encoding"] = response.encoding
+        self.logger.debug(f"按 {response.encoding} 解码 {len(content)} 字节，耗时 {elapsed:.2f}ms")
+        return text
+    
+    def _check_ranking(self, items):
+        """规范化后的榜单除时间戳外与上次完全相同时抛出ContentUnchanged，跳过写入"""
+        if CrawlerConfig.CONTENT_DEDUP and items:
+            if get_fingerprint_store(CrawlerConfig.FINGERPRINT_STATE_PATH).ranking_unchanged(
+                self.platform_name, ranking_fingerprint(items)
+            ):
+                raise ContentUnchanged(self.platform_name, "ranking")
+    
+    def _crawl_blocking(self):
+        """抓取、解析并规范化数据，在工作线程中执行"""
         if not self.enabled:
             self.logger.info(f"{self.platform_name} 平台未启用")
             return []
@@ -36,49 +178,189 @@ class BaseCrawler(ABC):
             else:
                 items = self.crawl_by_web()
                 
-            # 规范化数据
-            normalized_items = normalize_data(items, self.platform_name)
-            
-            # 限制最大数量
-            if len(normalized_items) > self.max_items:
-                normalized_items = normalized_items[:self.max_items]
-                
-            self.logger.info(f"成功爬取 {self.platform_name} 的 {len(normalized_items)} 条热点数据")
-            
-            # 保存数据
-            for fmt in CrawlerConfig.OUTPUT_FORMATS:
-                filename = CrawlerConfig.save_data(self.platform_name, normalized_items, fmt)
-                self.logger.info(f"数据已保存到 {filename}")
-                
-            return normalized_items
+            # 规范化数据，整批共享一个时间戳，只规范化前max_items条
+            normalized_items = normalize_batch(items, self.platform_name, limit=self.max_items)
             
         except Exception as e:
-            self.logger.error(f"爬取 {self.platform_name} 数据时出错: {str(e)}", exc_info=True)
-            return []
+            # 内容未变化时爬虫拿到的响应是None，由此引起的异常不算爬取出错
+            if not self._unchanged:
+                self.logger.error(f"爬取 {self.platform_name} 数据时出错: {str(e)}", exc_info=True)
+                return []
+        
+        # 某个响应体与上次相同，之后的请求都返回了None，爬虫的结果不可用
+        if self._unchanged:
+            raise ContentUnchanged(self.platform_name, "body")
+        
+        # 只有时间戳变化时不再写入
+        self._check_ranking(normalized_items)
+        
+        self.logger.info(f"成功爬取 {self.platform_name} 的 {len(normalized_items)} 条热点数据")
+        return normalized_items
     
-    def make_request(self, url, **kwargs):
-        """发送HTTP请求"""
-        return make_request(
-            url,
+    def ordered_strategies(self, cascade, keys):
+        """按历史表现重排候选策略（端点、JSON模式、选择器等），最近成功的排在最前"""
+        keys = list(keys)
+        if not CrawlerConfig.ADAPTIVE_STRATEGIES:
+            return keys
+        return get_strategy_registry(CrawlerConfig.STRATEGY_STATE_PATH).order(self.platform_name, cascade, keys)
+    
+    def record_strategy(self, cascade, key, success, latency):
+        """记录一次策略尝试的结果和耗时"""
+        if CrawlerConfig.ADAPTIVE_STRATEGIES:
+            get_strategy_registry(CrawlerConfig.STRATEGY_STATE_PATH).record(
+                self.platform_name, cascade, key, success, latency
+            )
+    
+    def run_strategies(self, cascade, strategies):
+        """按自适应顺序依次执行策略，返回第一个非空结果
+        
+        strategies为[(策略名, 无参函数)]列表，函数返回条目列表。
+        """
+        funcs = dict(strategies)
+        for key in self.ordered_strategies(cascade, [key for key, _ in strategies]):
+            started = time.time()
+            try:
+                items = funcs[key]()
+            except Exception as e:
+                self.logger.warning(f"策略 {cascade}/{key} 执行出错: {str(e)}")
+                items = []
+            # 内容未变化时策略拿不到响应，不计入该策略的成败
+            if self._unchanged:
+                return []
+            self.record_strategy(cascade, key, bool(items), time.time() - started)
+            if items:
+                self.logger.info(f"策略 {cascade}/{key} 获取到 {len(items)} 条数据")
+                return items
+        return []
+    
+    def _request_kwargs(self, kwargs):
+        """合并全局请求配置和调用方参数"""
+        request_kwargs = dict(
             use_proxy=CrawlerConfig.USE_PROXY,
             proxy_list_path=CrawlerConfig.PROXY_LIST_PATH,
             timeout=CrawlerConfig.REQUEST_TIMEOUT,
             retry_times=CrawlerConfig.RETRY_TIMES,
             retry_delay=CrawlerConfig.RETRY_DELAY,
-            **kwargs
+            cache=get_http_cache(CrawlerConfig.HTTP_CACHE_DIR) if CrawlerConfig.HTTP_CACHE else None,
+            rate_limit=self.config.get("rate_limit", CrawlerConfig.DEFAULT_RATE_LIMIT),
+            breakers=get_breaker_registry(
+                CrawlerConfig.BREAKER_STATE_PATH,
+                CrawlerConfig.BREAKER_FAILURE_THRESHOLD,
+                CrawlerConfig.BREAKER_RECOVERY_TIMEOUT,
+            ) if CrawlerConfig.CIRCUIT_BREAKER else None,
+            max_retry_delay=CrawlerConfig.MAX_RETRY_DELAY,
         )
+        request_kwargs.update(kwargs)
+        return request_kwargs
+    
+    def make_request(self, url, **kwargs):
+        """发送HTTP请求，异步模式下交给事件循环执行
+        
+        响应体与上次相同时返回None，本次运行之后的请求（包括各级回退）也不再发出。
+        """
+        if self._unchanged:
+            return None
+        request_kwargs = self._request_kwargs(kwargs)
+        
+        if self._engine is not None:
+            response = self._engine.request_threadsafe(url, **request_kwargs)
+        else:
+            response = make_request(url, **request_kwargs)
+        
+        if self._check_body(url, response):
+            return None
+        self._apply_encoding(response)
+        return response
     
-    def get_soup(self, url, **kwargs):
+    def make_hedged_request(self, urls, validate=None, cascade=None, **kwargs):
+        """对备用URL列表发起对冲请求，返回(url, response)
+        
+        对冲延迟取平台配置的hedge_delay，配置为None时按顺序逐个尝试。
+        传入cascade时按历史表现重排URL，并记录本次胜出的URL。
+        """
+        if self._unchanged:
+            return None, None
+        hedge_delay = self.config.get("hedge_delay", CrawlerConfig.HEDGE_DELAY)
+        request_kwargs = self._request_kwargs(kwargs)
+        
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if cascade:
+            urls = self.ordered_strategies(cascade, urls)
+        
+        started = time.time()
+        if self._engine is not None:
+            url, response = self._engine.hedged_request_threadsafe(urls, hedge_delay=hedge_delay, validate=validate, **request_kwargs)
+        else:
+            url, response = make_hedged_request(urls, hedge_delay=hedge_delay, validate=validate, **request_kwargs)
+        
+        if cascade and urls:
+            elapsed = time.time() - started
+            if response:
+                self.record_strategy(cascade, url, True, elapsed)
+            # 排在最前的URL没有胜出，说明它失败或偏慢
+            if url != urls[0]:
+                self.record_strategy(cascade, urls[0], False, elapsed)
+        
+        if self._check_body(url, response):
+            return url, None
+        self._apply_encoding(response)
+        return url, response
+    
+    def parse_html(self, html_content, scoped=False):
+        """把页面解析为BeautifulSoup对象，同一页面只解析一次
+        
+        使用CrawlerConfig.HTML_PARSER指定的后端（默认lxml），解析结果缓存到下一个页面为止，
+        同一响应上的多个选择器/解析策略共享同一棵文档树。
+        scoped为True且平台配置了parse_scope时只构建热榜容器所在的子树。
+        """
+        scoped = bool(scoped and self.parse_scope)
+        if self._parsed is None or not (self._parsed["html"] is html_content or self._parsed["html"] == html_content):
+            self._parsed = {"html": html_content}
+        
+        soup = self._parsed.get(scoped)
+        if soup is None:
+            parse_only = build_scope_strainer(self.parse_scope) if scoped else None
+            soup = parse_html(html_content, CrawlerConfig.HTML_PARSER, parse_only=parse_only)
+            self._parsed[scoped] = soup
+        return soup
+    
+    def select(self, html_content, selector):
+        """按CSS选择器查找热榜元素，先在范围解析的子树中查找，找不到时退回完整解析"""
+        elements = self.parse_html(html_content, scoped=True).select(selector)
+        if not elements and self.parse_scope:
+            elements = self.parse_html(html_content).select(selector)
+            if elements:
+                self.logger.debug(f"选择器 '{selector}' 不在parse_scope范围内，已使用完整解析")
+        return elements
+    
+    def iselect(self, html_content, selector):
+        """select的惰性版本，按文档顺序逐个产出匹配的元素
+        
+        调用方取够max_items条后停止迭代，剩余元素不会被匹配。没有匹配时返回空元组，
+        因此仍可以写成iselect(a) or iselect(b)的形式依次尝试多个选择器。
+        """
+        elements = self.parse_html(html_content, scoped=True).css.iselect(selector)
+        first = next(elements, None)
+        if first is None and self.parse_scope:
+            elements = self.parse_html(html_content).css.iselect(selector)
+            first = next(elements, None)
+            if first is not None:
+                self.logger.debug(f"选择器 '{selector}' 不在parse_scope范围内，已使用完整解析")
+        if first is None:
+            return ()
+        return chain((first,), elements)
+    
+    def budget_full(self, items):
+        """已提取的条目是否达到max_items，各解析循环据此提前结束"""
+        return len(items) >= self.max_items
+    
+    def get_soup(self, url, scoped=False, **kwargs):
         """获取BeautifulSoup对象"""
-        return get_soup(
-            url,
-            use_proxy=CrawlerConfig.USE_PROXY,
-            proxy_list_path=CrawlerConfig.PROXY_LIST_PATH,
-            timeout=CrawlerConfig.REQUEST_TIMEOUT,
-            retry_times=CrawlerConfig.RETRY_TIMES,
-            retry_delay=CrawlerConfig.RETRY_DELAY,
-            **kwargs
-        )
+        response = self.make_request(url, **kwargs)
+        if response is None:
+            return None
+        
+        return self.parse_html(self.response_text(response), scoped=scoped)
     
     @abstractmethod
     def crawl_by_api(self):
@@ -1,9 +1,8 @@
-import re
-import json
-import requests
 import time
 import random
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
+from utils.json_extractor import extract_first_json
 
 class BilibiliCrawler(BaseCrawler):
     """B站热门爬虫"""
@@ -40,9 +39,6 @@ class BilibiliCrawler(BaseCrawler):
                 "b_lsid": f"{''.join(random.choices('0123456789ABCDEF', k=32))}",
             }
             
-            # 添加随机延迟，避免被反爬
-            time.sleep(random.uniform(1, 3))
-            
             # 尝试多个API端点
             api_endpoints = [
                 "https://api.bilibili.com/x/web-interface/popular?ps=50&pn=1",
@@ -51,20 +47,13 @@ class BilibiliCrawler(BaseCrawler):
                 self.api_url
             ]
             
-            response = None
-            used_api = ""
-            
-            for api in api_endpoints:
-                try:
-                    self.logger.info(f"尝试从 {api} 获取B站热门数据")
-                    # 使用requests直接发送请求，以便添加cookies
-                    response = requests.get(api, headers=headers, cookies=cookies, timeout=10)
-                    if response and response.status_code == 200:
-                        used_api = api
-                        self.logger.info(f"成功从 {api} 获取数据")
-                        break
-                except Exception as e:
-                    self.logger.warning(f"API请求失败 ({api}): {str(e)}")
+            # 对冲请求多个端点，取最先返回的可用响应
+            used_api, response = self.make_hedged_request(
+                api_endpoints, headers=headers, cookies=cookies, cascade="api_endpoints",
+                validate=lambda r: r.status_code == 200
+            )
+            if response:
+                self.logger.info(f"成功从 {used_api} 获取数据")
             
             if not response:
                 self.logger.error("所有API请求失败，切换到网页爬取")
@@ -80,8 +69,8 @@ class BilibiliCrawler(BaseCrawler):
                 try:
                     backup_api = "https://api.bilibili.com/x/web-interface/wbi/index/top/feed/rcmd?web_location=1430650&y_num=5&fresh_type=4&feed_version=V8&fresh_idx_1h=2&fetch_row=1&fresh_idx=1&brush=1&homepage_ver=1&ps=12"
                     self.logger.info(f"尝试备用API: {backup_api}")
-                    backup_response = requests.get(backup_api, headers=headers, cookies=cookies, timeout=10)
-                    if backup_response.status_code == 200:
+                    backup_response = self.make_request(backup_api, headers=headers, cookies=cookies)
+                    if backup_response and backup_response.status_code == 200:
                         backup_data = backup_response.json()
                         if backup_data.get("code") == 0:
                             data = backup_data
@@ -113,6 +102,8 @@ class BilibiliCrawler(BaseCrawler):
                     videos = data.get("data", [])
                 
                 for i, video in enumerate(videos):
+                    if self.budget_full(items):
+                        break
                     try:
                         # 处理不同的视频数据结构
                         title = ""
@@ -225,41 +216,24 @@ class BilibiliCrawler(BaseCrawler):
                 "https://www.bilibili.com/v/popular/weekly"
             ]
             
-            response = None
-            for url in web_urls:
-                try:
-                    response = self.make_request(url, headers=headers)
-                    if response and response.status_code == 200:
-                        break
-                except Exception as e:
-                    self.logger.warning(f"网页请求失败 ({url}): {str(e)}")
+            _, response = self.make_hedged_request(
+                web_urls, headers=headers, cascade="web_urls", validate=lambda r: r.status_code == 200
+            )
             
             if not response:
                 self.logger.error("获取网页内容失败")
                 return []
                 
-            html_content = response.text
+            html_content = self.response_text(response)
             items = []
             
             # 方法1: 尝试从页面中提取JSON数据
-            json_data = None
-            
-            # 尝试多种JSON数据提取模式
-            json_patterns = [
-                r'window\.__INITIAL_STATE__\s*=\s*({.*?});',
-                r'window\.__STORE__\s*=\s*({.*?});',
-                r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>'
-            ]
-            
-            for pattern in json_patterns:
-                json_match = re.search(pattern, html_content, re.DOTALL)
-                if json_match:
-                    try:
-                        json_str = json_match.group(1)
-                        json_data = json.loads(json_str)
-                        break
-                    except Exception as e:
-                        self.logger.warning(f"解析JSON数据失败: {str(e)}")
+            # 尝试多种JSON数据标记
+            _, json_data = extract_first_json(html_content, [
+                "window.__INITIAL_STATE__",
+                "window.__STORE__",
+                '<script id="__NEXT_DATA__" type="application/json">'
+            ])
             
             # 如果找到JSON数据，从中提取视频列表
             if json_data:
@@ -283,6 +257,8 @@ class BilibiliCrawler(BaseCrawler):
                 
                 if video_list:
                     for i, video in enumerate(video_list):
+                        if self.budget_full(items):
+                            break
                         try:
                             # 提取标题
                             title = ""
@@ -345,15 +321,12 @@ class BilibiliCrawler(BaseCrawler):
                         return items
             
             # 方法2: 使用BeautifulSoup解析HTML
-            soup = self.get_soup(self.web_url, headers=headers)
-            if not soup:
-                self.logger.error("获取网页内容失败")
-                return []
-                
             # 找到所有视频列表项
-            video_items = soup.select(".rank-item")
+            video_items = self.iselect(html_content, ".rank-item")
             
             for i, video_item in enumerate(video_items):
+                if self.budget_full(items):
+                    break
                 try:
                     # 提取排名
                     rank_elem = video_item.select_one(".num")
@@ -378,14 +351,7 @@ class BilibiliCrawler(BaseCrawler):
                     play_count = 0
                     play_elem = video_item.select_one(".detail-state .data-box:nth-child(1)")
                     if play_elem:
-                        play_text = play_elem.text.strip()
-                        try:
-                            if "万" in play_text:
-                                play_count = int(float(play_text.replace("万", "")) * 10000)
-                            else:
-                                play_count = int(play_text)
-                        except:
-                            pass
+                        play_count = parse_count(play_elem.text.strip())
                     
                     # 提取作者
                     author = ""
@@ -416,9 +382,11 @@ class BilibiliCrawler(BaseCrawler):
             
             # 如果第一种选择器没有找到结果，尝试第二种选择器
             if not items:
-                video_items = soup.select(".video-card") or soup.select(".bili-video-card")
+                video_items = self.iselect(html_content, ".video-card") or self.iselect(html_content, ".bili-video-card")
                 
                 for i, video_item in enumerate(video_items):
+                    if self.budget_full(items):
+                        break
                     try:
                         # 提取标题和URL
                         title_elem = video_item.select_one(".title") or video_item.select_one(".bili-video-card__info--tit")
@@ -436,14 +404,7 @@ class BilibiliCrawler(BaseCrawler):
                         play_count = 0
                         play_elem = video_item.select_one(".play-count") or video_item.select_one(".bili-video-card__stats--item")
                         if play_elem:
-                            play_text = play_elem.text.strip()
-                            try:
-                                if "万" in play_text:
-                                    play_count = int(float(play_text.replace("万", "")) * 10000)
-                                else:
-                                    play_count = int(re.sub(r"\D", "", play_text))
-                            except:
-                                pass
+                            play_count = parse_count(play_elem.text.strip())
                         
                         # 提取作者
                         author = ""
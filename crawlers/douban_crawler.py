@@ -1,5 +1,5 @@
-import re
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
 
 class DoubanCrawler(BaseCrawler):
     """豆瓣热门爬虫"""
@@ -25,17 +25,21 @@ class DoubanCrawler(BaseCrawler):
                 'Cache-Control': 'max-age=0'
             }
             
-            soup = self.get_soup(self.web_url, headers=headers)
-            if not soup:
+            response = self.make_request(self.web_url, headers=headers)
+            if not response:
                 self.logger.error("获取网页内容失败")
                 return []
+            
+            html_content = self.response_text(response)
                 
             items = []
             
             # 查找热门小组话题
-            group_items = soup.select(".channel-item")
+            group_items = self.iselect(html_content, ".channel-item")
             
             for i, group in enumerate(group_items):
+                if self.budget_full(items):
+                    break
                 try:
                     # 提取标题和URL
                     title_elem = group.select_one(".title a")
@@ -58,11 +62,7 @@ class DoubanCrawler(BaseCrawler):
                     reply_count = 0
                     reply_elem = group.select_one(".reply-num")
                     if reply_elem:
-                        reply_text = reply_elem.text.strip()
-                        try:
-                            reply_count = int(re.search(r"(\d+)", reply_text).group(1))
-                        except:
-                            pass
+                        reply_count = parse_count(reply_elem.text.strip())
                     
                     # 提取内容摘要
                     excerpt = ""
@@ -94,9 +94,11 @@ class DoubanCrawler(BaseCrawler):
             
             # 如果上面的选择器没有找到结果，尝试另一种页面结构
             if not items:
-                cards = soup.select(".channel-item")
+                cards = self.iselect(html_content, ".channel-item")
                 
                 for i, card in enumerate(cards):
+                    if self.budget_full(items):
+                        break
                     try:
                         # 提取标题和URL
                         title_elem = card.select_one("h3 a")
@@ -125,11 +127,7 @@ class DoubanCrawler(BaseCrawler):
                         like_count = 0
                         like_elem = card.select_one(".react-num")
                         if like_elem:
-                            like_text = like_elem.text.strip()
-                            try:
-                                like_count = int(re.search(r"(\d+)", like_text).group(1))
-                            except:
-                                pass
+                            like_count = parse_count(like_elem.text.strip())
                         
                         item = {
                             "rank": i + 1,
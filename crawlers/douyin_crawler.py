@@ -1,11 +1,10 @@
 import re
-import json
 import time
 import random
-import requests
 import logging
-from bs4 import BeautifulSoup
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
+from utils.json_extractor import extract_first_json
 from fake_useragent import UserAgent
 
 class DouyinCrawler(BaseCrawler):
@@ -35,19 +34,9 @@ class DouyinCrawler(BaseCrawler):
                 'Connection': 'keep-alive',
             }
             
-            # 添加随机延迟，避免被反爬
-            time.sleep(random.uniform(1, 3))
-            
-            response = None
-            for api_url in api_urls:
-                try:
-                    self.logger.info(f"尝试从 {api_url} 获取抖音热榜")
-                    response = self.make_request(api_url, headers=headers)
-                    if response:
-                        break
-                except Exception as e:
-                    self.logger.warning(f"从 {api_url} 获取抖音热榜失败: {str(e)}")
-                    continue
+            api_url, response = self.make_hedged_request(api_urls, headers=headers, cascade="api_urls")
+            if response:
+                self.logger.info(f"成功从 {api_url} 获取抖音热榜")
             
             if not response:
                 self.logger.warning("API请求失败，尝试网页爬取")
@@ -65,6 +54,8 @@ class DouyinCrawler(BaseCrawler):
                 items = []
                 
                 for i, item in enumerate(hot_list):
+                    if self.budget_full(items):
+                        break
                     try:
                         # 提取标题
                         title = item.get("word", "")
@@ -130,155 +121,236 @@ class DouyinCrawler(BaseCrawler):
                 'Cookie': 'msToken='+self._generate_random_token(107)
             }
             
-            # 添加随机延迟，避免被反爬
-            time.sleep(random.uniform(1, 3))
-            
             html_content = None
-            for url in urls:
-                try:
-                    self.logger.info(f"尝试从 {url} 获取抖音热榜")
-                    response = self.make_request(url, headers=headers)
-                    if response:
-                        html_content = response.text
-                        break
-                except Exception as e:
-                    self.logger.warning(f"从 {url} 获取抖音热榜失败: {str(e)}")
-                    continue
+            url, response = self.make_hedged_request(urls, headers=headers, cascade="web_urls")
+            if response:
+                self.logger.info(f"成功从 {url} 获取抖音热榜")
+                html_content = self.response_text(response)
             
             if not html_content:
                 self.logger.error("所有URL都无法获取抖音热榜")
                 return []
             
-            items = []
+            # 按历史表现依次尝试各解析方法，最近成功的方法优先
+            items = self.run_strategies("parsers", [
+                ("json", lambda: self._parse_json(html_content)),
+                ("regex", lambda: self._parse_regex(html_content)),
+                ("soup", lambda: self._parse_soup(html_content)),
+            ])
             
-            # 方法1: 尝试从页面中提取JSON数据
-            json_data = None
-            json_patterns = [
-                r'<script id="RENDER_DATA" type="application/json">(.*?)</script>',
-                r'window\.__INIT_PROPS__\s*=\s*({.*?});</script>',
-                r'"hotSearch":\s*({.*?}),\s*"hotVideo"'
-            ]
+            # 如果所有方法都失败，尝试使用备用方法
+            if not items:
+                items = self._crawl_backup_api()
             
-            for pattern in json_patterns:
-                json_match = re.search(pattern, html_content, re.DOTALL)
-                if json_match:
-                    try:
-                        json_str = json_match.group(1)
-                        # 抖音可能会对JSON进行URL编码
-                        if '%' in json_str:
-                            import urllib.parse
-                            json_str = urllib.parse.unquote(json_str)
-                        json_data = json.loads(json_str)
-                        self.logger.info("成功从页面提取JSON数据")
-                        break
-                    except Exception as e:
-                        self.logger.warning(f"解析JSON数据失败: {str(e)}")
+            return items
             
-            # 如果找到JSON数据，从中提取热榜
-            if json_data:
-                # 尝试多种可能的JSON结构
-                hot_list = None
-                
-                # 尝试不同的数据路径
-                data_paths = [
-                    ["hotSearch", "data"],
-                    ["hotSearch", "word_list"],
-                    ["SSR_RENDER_DATA", "hotSearch", "data"],
-                    ["SSR_RENDER_DATA", "app", "hotSearch", "data"],
-                    ["state", "hotSearch", "data"]
-                ]
+        except Exception as e:
+            self.logger.error(f"爬取抖音热榜失败: {str(e)}")
+            return []
+    
+    def _parse_json(self, html_content):
+        """方法1: 尝试从页面中提取JSON数据"""
+        items = []
+        # RENDER_DATA可能经过URL编码，由提取器只解码脚本内容
+        marker, json_data = extract_first_json(html_content, [
+            '<script id="RENDER_DATA" type="application/json">',
+            "window.__INIT_PROPS__",
+            '"hotSearch":'
+        ])
+        if marker == '"hotSearch":':
+            # 只取到了hotSearch的值，补回外层键以匹配下面的数据路径
+            json_data = {"hotSearch": json_data}
+        if json_data:
+            self.logger.info("成功从页面提取JSON数据")
+        
+        # 如果找到JSON数据，从中提取热榜
+        if json_data:
+            # 尝试多种可能的JSON结构
+            hot_list = None
+            
+            # 尝试不同的数据路径
+            data_paths = [
+                ["hotSearch", "data"],
+                ["hotSearch", "word_list"],
+                ["SSR_RENDER_DATA", "hotSearch", "data"],
+                ["SSR_RENDER_DATA", "app", "hotSearch", "data"],
+                ["state", "hotSearch", "data"]
+            ]
+            
+            for path in data_paths:
+                current = json_data
+                valid_path = True
                 
-                for path in data_paths:
-                    current = json_data
-                    valid_path = True
-                    
-                    for key in path:
-                        if isinstance(current, dict) and key in current:
-                            current = current[key]
-                        else:
-                            valid_path = False
-                            break
-                    
-                    if valid_path and isinstance(current, (list, dict)):
-                        if isinstance(current, dict) and "word_list" in current:
-                            hot_list = current["word_list"]
-                        elif isinstance(current, list):
-                            hot_list = current
+                for key in path:
+                    if isinstance(current, dict) and key in current:
+                        current = current[key]
+                    else:
+                        valid_path = False
                         break
                 
-                if hot_list:
-                    for i, item in enumerate(hot_list):
-                        try:
-                            # 尝试多种可能的字段名
-                            title = (item.get("word", "") or 
-                                    item.get("title", "") or 
-                                    item.get("content", ""))
-                            
-                            if not title:
-                                continue
-                                
-                            # 提取URL
-                            url = (item.get("url", "") or 
-                                  item.get("link", "") or 
-                                  f"https://www.douyin.com/search/{title}")
-                            
-                            if url and not url.startswith("http"):
-                                url = "https://www.douyin.com" + url
-                                
-                            # 提取热度
-                            hot_value = (item.get("hot_value", 0) or 
-                                        item.get("view_count", 0) or 
-                                        item.get("heat", 0))
-                            
-                            # 提取标签
-                            category = (item.get("label", "") or 
-                                       item.get("tag", "") or 
-                                       item.get("category", ""))
+                if valid_path and isinstance(current, (list, dict)):
+                    if isinstance(current, dict) and "word_list" in current:
+                        hot_list = current["word_list"]
+                    elif isinstance(current, list):
+                        hot_list = current
+                    break
+            
+            if hot_list:
+                for i, item in enumerate(hot_list):
+                    if self.budget_full(items):
+                        break
+                    try:
+                        # 尝试多种可能的字段名
+                        title = (item.get("word", "") or 
+                                item.get("title", "") or 
+                                item.get("content", ""))
+                        
+                        if not title:
+                            continue
                             
-                            items.append({
-                                "rank": i + 1,
-                                "title": title,
-                                "url": url,
-                                "hot_value": hot_value,
-                                "category": category
-                            })
+                        # 提取URL
+                        url = (item.get("url", "") or 
+                              item.get("link", "") or 
+                              f"https://www.douyin.com/search/{title}")
+                        
+                        if url and not url.startswith("http"):
+                            url = "https://www.douyin.com" + url
                             
-                        except Exception as e:
-                            self.logger.warning(f"处理抖音热榜条目时出错: {str(e)}")
-                            continue
+                        # 提取热度
+                        hot_value = (item.get("hot_value", 0) or 
+                                    item.get("view_count", 0) or 
+                                    item.get("heat", 0))
+                        
+                        # 提取标签
+                        category = (item.get("label", "") or 
+                                   item.get("tag", "") or 
+                                   item.get("category", ""))
+                        
+                        items.append({
+                            "rank": i + 1,
+                            "title": title,
+                            "url": url,
+                            "hot_value": hot_value,
+                            "category": category
+                        })
+                        
+                    except Exception as e:
+                        self.logger.warning(f"处理抖音热榜条目时出错: {str(e)}")
+                        continue
+                
+                if items:
+                    self.logger.info(f"从JSON数据中提取到 {len(items)} 条抖音热榜")
+                    return items
+        
+        return items
+    
+    def _parse_regex(self, html_content):
+        """方法2: 使用正则表达式直接从HTML中提取热榜数据"""
+        items = []
+        pattern = r'<div[^>]*class="[^"]*hot-item[^"]*"[^>]*>.*?<div[^>]*class="[^"]*hot-item-title[^"]*"[^>]*>(.*?)</div>.*?<div[^>]*class="[^"]*hot-item-count[^"]*"[^>]*>(.*?)</div>'
+        
+        # 逐个匹配，取够max_items条后不再扫描页面的剩余部分
+        for i, match in enumerate(re.finditer(pattern, html_content, re.DOTALL)):
+            if self.budget_full(items):
+                break
+            try:
+                title_html, count_html = match.groups()
+                # 提取标题
+                title = re.sub(r'<[^>]+>', '', title_html).strip()
+                if not title:
+                    continue
                     
-                    if items:
-                        self.logger.info(f"从JSON数据中提取到 {len(items)} 条抖音热榜")
-                        return items
-            
-            # 方法2: 使用正则表达式直接从HTML中提取热榜数据
-            pattern = r'<div[^>]*class="[^"]*hot-item[^"]*"[^>]*>.*?<div[^>]*class="[^"]*hot-item-title[^"]*"[^>]*>(.*?)</div>.*?<div[^>]*class="[^"]*hot-item-count[^"]*"[^>]*>(.*?)</div>'
-            matches = re.findall(pattern, html_content, re.DOTALL)
-            
-            if matches:
-                for i, (title_html, count_html) in enumerate(matches):
+                # 提取热度
+                hot_text = re.sub(r'<[^>]+>', '', count_html).strip()
+                hot_value = parse_count(hot_text)
+                
+                items.append({
+                    "rank": i + 1,
+                    "title": title,
+                    "url": f"https://www.douyin.com/search/{title}",
+                    "hot_value": hot_value,
+                    "hot_text": hot_text
+                })
+                
+            except Exception as e:
+                self.logger.warning(f"处理抖音热榜条目时出错: {str(e)}")
+                continue
+        
+        if items:
+            self.logger.info(f"从HTML正则中提取到 {len(items)} 条抖音热榜")
+            return items
+        
+        return items
+    
+    def _parse_soup(self, html_content):
+        """方法3: 使用BeautifulSoup解析HTML"""
+        items = []
+        
+        # 尝试多种选择器
+        selectors = [
+            ".hot-board-container .hot-board-item",  # 热榜容器
+            ".hot-container .hot-item",  # 另一种热榜容器
+            ".rank-content-container .rank-item",  # 排行榜容器
+            ".search-card-hot-list .search-card-hot-item"  # 搜索热榜
+        ]
+        
+        for selector in self.ordered_strategies("selectors", selectors):
+            started = time.time()
+            hot_items = self.iselect(html_content, selector)
+            if hot_items:
+                self.logger.info(f"使用选择器 '{selector}' 找到热榜项")
+                
+                for i, item in enumerate(hot_items):
+                    if self.budget_full(items):
+                        break
                     try:
                         # 提取标题
-                        title = re.sub(r'<[^>]+>', '', title_html).strip()
-                        if not title:
+                        title_elem = (item.select_one(".hot-item-title") or 
+                                     item.select_one(".rank-title") or 
+                                     item.select_one(".hot-item-text"))
+                        
+                        if not title_elem:
                             continue
                             
+                        title = title_elem.text.strip()
+                        if not title:
+                            continue
+                        
+                        # 提取URL
+                        url = f"https://www.douyin.com/search/{title}"
+                        link_elem = item.select_one("a")
+                        if link_elem and link_elem.has_attr("href"):
+                            url = link_elem["href"]
+                            if not url.startswith("http"):
+                                url = "https://www.douyin.com" + url
+                        
                         # 提取热度
-                        hot_text = re.sub(r'<[^>]+>', '', count_html).strip()
                         hot_value = 0
-                        match = re.search(r"(\d+(?:\.\d+)?)(?:万)?", hot_text)
-                        if match:
-                            hot_num = float(match.group(1))
-                            if "万" in hot_text:
-                                hot_num *= 10000
-                            hot_value = int(hot_num)
+                        hot_text = ""
+                        hot_elem = (item.select_one(".hot-item-count") or 
+                                   item.select_one(".rank-count") or 
+                                   item.select_one(".hot-item-num"))
+                        
+                        if hot_elem:
+                            hot_text = hot_elem.text.strip()
+                            hot_value = parse_count(hot_text)
+                        
+                        # 提取标签
+                        category = ""
+                        tag_elem = (item.select_one(".hot-item-tag") or 
+                                   item.select_one(".rank-tag") or 
+                                   item.select_one(".hot-item-label"))
+                        
+                        if tag_elem:
+                            category = tag_elem.text.strip()
                         
                         items.append({
                             "rank": i + 1,
                             "title": title,
-                            "url": f"https://www.douyin.com/search/{title}",
+                            "url": url,
                             "hot_value": hot_value,
-                            "hot_text": hot_text
+                            "hot_text": hot_text if 'hot_text' in locals() else "",
+                            "category": category
                         })
                         
                     except Exception as e:
@@ -286,133 +358,56 @@ class DouyinCrawler(BaseCrawler):
                         continue
                 
                 if items:
-                    self.logger.info(f"从HTML正则中提取到 {len(items)} 条抖音热榜")
-                    return items
-            
-            # 方法3: 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 尝试多种选择器
-            selectors = [
-                ".hot-board-container .hot-board-item",  # 热榜容器
-                ".hot-container .hot-item",  # 另一种热榜容器
-                ".rank-content-container .rank-item",  # 排行榜容器
-                ".search-card-hot-list .search-card-hot-item"  # 搜索热榜
-            ]
-            
-            for selector in selectors:
-                hot_items = soup.select(selector)
-                if hot_items:
-                    self.logger.info(f"使用选择器 '{selector}' 找到 {len(hot_items)} 个热榜项")
-                    
-                    for i, item in enumerate(hot_items):
+                    self.record_strategy("selectors", selector, True, time.time() - started)
+                    self.logger.info(f"从BeautifulSoup中提取到 {len(items)} 条抖音热榜")
+                    break
+            self.record_strategy("selectors", selector, False, time.time() - started)
+        
+        return items
+    
+    def _crawl_backup_api(self):
+        """备用方法: 从热门搜索接口获取数据"""
+        items = []
+        # 尝试从热门搜索接口获取数据
+        backup_url = "https://www.douyin.com/aweme/v1/web/hot/search/list/"
+        try:
+            self.logger.info(f"尝试从备用API {backup_url} 获取抖音热榜")
+            backup_headers = {
+                'User-Agent': self.ua.random,
+                'Accept': 'application/json',
+                'Referer': 'https://www.douyin.com/hot',
+                'Cookie': 'msToken='+self._generate_random_token(107)
+            }
+            response = self.make_request(backup_url, headers=backup_headers)
+            if response and response.status_code == 200:
+                data = response.json()
+                if "data" in data and "word_list" in data["data"]:
+                    hot_list = data["data"]["word_list"]
+                    for i, item in enumerate(hot_list):
+                        if self.budget_full(items):
+                            break
                         try:
-                            # 提取标题
-                            title_elem = (item.select_one(".hot-item-title") or 
-                                         item.select_one(".rank-title") or 
-                                         item.select_one(".hot-item-text"))
-                            
-                            if not title_elem:
-                                continue
-                                
-                            title = title_elem.text.strip()
+                            title = item.get("word", "")
                             if not title:
                                 continue
                             
-                            # 提取URL
-                            url = f"https://www.douyin.com/search/{title}"
-                            link_elem = item.select_one("a")
-                            if link_elem and link_elem.has_attr("href"):
-                                url = link_elem["href"]
-                                if not url.startswith("http"):
-                                    url = "https://www.douyin.com" + url
-                            
-                            # 提取热度
-                            hot_value = 0
-                            hot_text = ""
-                            hot_elem = (item.select_one(".hot-item-count") or 
-                                       item.select_one(".rank-count") or 
-                                       item.select_one(".hot-item-num"))
-                            
-                            if hot_elem:
-                                hot_text = hot_elem.text.strip()
-                                match = re.search(r"(\d+(?:\.\d+)?)(?:万)?", hot_text)
-                                if match:
-                                    hot_num = float(match.group(1))
-                                    if "万" in hot_text:
-                                        hot_num *= 10000
-                                    hot_value = int(hot_num)
-                            
-                            # 提取标签
-                            category = ""
-                            tag_elem = (item.select_one(".hot-item-tag") or 
-                                       item.select_one(".rank-tag") or 
-                                       item.select_one(".hot-item-label"))
-                            
-                            if tag_elem:
-                                category = tag_elem.text.strip()
-                            
                             items.append({
                                 "rank": i + 1,
                                 "title": title,
-                                "url": url,
-                                "hot_value": hot_value,
-                                "hot_text": hot_text if 'hot_text' in locals() else "",
-                                "category": category
+                                "url": f"https://www.douyin.com/search/{title}",
+                                "hot_value": item.get("hot_value", 0),
+                                "category": item.get("label", "")
                             })
-                            
                         except Exception as e:
-                            self.logger.warning(f"处理抖音热榜条目时出错: {str(e)}")
+                            self.logger.warning(f"处理备用API抖音热榜条目时出错: {str(e)}")
                             continue
                     
                     if items:
-                        self.logger.info(f"从BeautifulSoup中提取到 {len(items)} 条抖音热榜")
-                        break
-            
-            # 如果所有方法都失败，尝试使用备用方法
-            if not items:
-                # 尝试从热门搜索接口获取数据
-                backup_url = "https://www.douyin.com/aweme/v1/web/hot/search/list/"
-                try:
-                    self.logger.info(f"尝试从备用API {backup_url} 获取抖音热榜")
-                    backup_headers = {
-                        'User-Agent': self.ua.random,
-                        'Accept': 'application/json',
-                        'Referer': 'https://www.douyin.com/hot',
-                        'Cookie': 'msToken='+self._generate_random_token(107)
-                    }
-                    response = requests.get(backup_url, headers=backup_headers, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "data" in data and "word_list" in data["data"]:
-                            hot_list = data["data"]["word_list"]
-                            for i, item in enumerate(hot_list):
-                                try:
-                                    title = item.get("word", "")
-                                    if not title:
-                                        continue
-                                    
-                                    items.append({
-                                        "rank": i + 1,
-                                        "title": title,
-                                        "url": f"https://www.douyin.com/search/{title}",
-                                        "hot_value": item.get("hot_value", 0),
-                                        "category": item.get("label", "")
-                                    })
-                                except Exception as e:
-                                    self.logger.warning(f"处理备用API抖音热榜条目时出错: {str(e)}")
-                                    continue
-                            
-                            if items:
-                                self.logger.info(f"从备用API获取到 {len(items)} 条抖音热榜")
-                except Exception as e:
-                    self.logger.warning(f"从备用API获取抖音热榜失败: {str(e)}")
-            
-            return items
-            
+                        self.logger.info(f"从备用API获取到 {len(items)} 条抖音热榜")
         except Exception as e:
-            self.logger.error(f"爬取抖音热榜失败: {str(e)}")
-            return []
+            self.logger.warning(f"从备用API获取抖音热榜失败: {str(e)}")
+        
+        return items
     
     def _generate_random_token(self, length=107):
         """生成随机token，用于模拟抖音的msToken"""
@@ -1,11 +1,9 @@
-import re
-import json
+import time
 import requests
-from bs4 import BeautifulSoup
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
+from utils.json_extractor import extract_first_json
 import logging
-import time
-import random
 from fake_useragent import UserAgent
 
 class HupuCrawler(BaseCrawler):
@@ -35,19 +33,9 @@ class HupuCrawler(BaseCrawler):
                 'Connection': 'keep-alive',
             }
             
-            # 添加随机延迟，避免被反爬
-            time.sleep(random.uniform(1, 3))
-            
-            response = None
-            for api_url in api_urls:
-                try:
-                    self.logger.info(f"尝试从 {api_url} 获取虎扑热榜")
-                    response = self.make_request(api_url, headers=headers)
-                    if response:
-                        break
-                except Exception as e:
-                    self.logger.warning(f"从 {api_url} 获取虎扑热榜失败: {str(e)}")
-                    continue
+            api_url, response = self.make_hedged_request(api_urls, headers=headers, cascade="api_urls")
+            if response:
+                self.logger.info(f"成功从 {api_url} 获取虎扑热榜")
             
             if not response:
                 self.logger.warning("API请求失败，尝试网页爬取")
@@ -64,6 +52,8 @@ class HupuCrawler(BaseCrawler):
             items = []
             
             for i, post in enumerate(hot_list):
+                if self.budget_full(items):
+                    break
                 try:
                     # 提取标题
                     title = post.get("title", "")
@@ -127,20 +117,11 @@ class HupuCrawler(BaseCrawler):
                 'Cache-Control': 'max-age=0',
             }
             
-            # 添加随机延迟，避免被反爬
-            time.sleep(random.uniform(1, 3))
-            
             html_content = None
-            for url in urls:
-                try:
-                    self.logger.info(f"尝试从 {url} 获取虎扑热榜")
-                    response = self.make_request(url, headers=headers)
-                    if response:
-                        html_content = response.text
-                        break
-                except Exception as e:
-                    self.logger.warning(f"从 {url} 获取虎扑热榜失败: {str(e)}")
-                    continue
+            url, response = self.make_hedged_request(urls, headers=headers, cascade="web_urls")
+            if response:
+                self.logger.info(f"成功从 {url} 获取虎扑热榜")
+                html_content = self.response_text(response)
             
             if not html_content:
                 self.logger.error("所有URL都无法获取虎扑热榜")
@@ -149,23 +130,13 @@ class HupuCrawler(BaseCrawler):
             items = []
             
             # 方法1: 尝试从页面中提取JSON数据
-            json_data = None
-            json_patterns = [
-                r'<script>window\.__INITIAL_STATE__\s*=\s*({.*?});</script>',
-                r'<script>window\.__STORE_DATA__\s*=\s*({.*?});</script>',
-                r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>'
-            ]
-            
-            for pattern in json_patterns:
-                json_match = re.search(pattern, html_content, re.DOTALL)
-                if json_match:
-                    try:
-                        json_str = json_match.group(1)
-                        json_data = json.loads(json_str)
-                        self.logger.info("成功从页面提取JSON数据")
-                        break
-                    except Exception as e:
-                        self.logger.warning(f"解析JSON数据失败: {str(e)}")
+            _, json_data = extract_first_json(html_content, [
+                "window.__INITIAL_STATE__",
+                "window.__STORE_DATA__",
+                '<script id="__NEXT_DATA__" type="application/json">'
+            ])
+            if json_data:
+                self.logger.info("成功从页面提取JSON数据")
             
             # 如果找到JSON数据，从中提取热榜
             if json_data:
@@ -198,6 +169,8 @@ class HupuCrawler(BaseCrawler):
                 
                 if hot_list:
                     for i, post in enumerate(hot_list):
+                        if self.budget_full(items):
+                            break
                         try:
                             # 尝试多种可能的字段名
                             title = (post.get("title", "") or 
@@ -254,8 +227,6 @@ class HupuCrawler(BaseCrawler):
                         return items
             
             # 方法2: 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
             # 尝试多种选择器
             selectors = [
                 ".bbs-sl-web-post-body .post-list .post-item",  # 新版热榜
@@ -264,12 +235,15 @@ class HupuCrawler(BaseCrawler):
                 ".hupu-thread-item-wrap"  # 最新版热榜
             ]
             
-            for selector in selectors:
-                post_items = soup.select(selector)
+            for selector in self.ordered_strategies("selectors", selectors):
+                started = time.time()
+                post_items = self.iselect(html_content, selector)
                 if post_items:
-                    self.logger.info(f"使用选择器 '{selector}' 找到 {len(post_items)} 个热榜项")
+                    self.logger.info(f"使用选择器 '{selector}' 找到热榜项")
                     
                     for i, post in enumerate(post_items):
+                        if self.budget_full(items):
+                            break
                         try:
                             # 根据不同选择器使用不同的提取逻辑
                             if selector == ".bbs-sl-web-post-body .post-list .post-item":
@@ -289,10 +263,7 @@ class HupuCrawler(BaseCrawler):
                                 hot_value = 0
                                 reply_elem = post.select_one(".post-reply-count")
                                 if reply_elem:
-                                    reply_text = reply_elem.text.strip()
-                                    match = re.search(r"(\d+)", reply_text)
-                                    if match:
-                                        hot_value = int(match.group(1))
+                                    hot_value = parse_count(reply_elem.text.strip())
                                 
                                 author = ""
                                 author_elem = post.select_one(".post-author")
@@ -321,10 +292,7 @@ class HupuCrawler(BaseCrawler):
                                 hot_value = 0
                                 reply_elem = post.select_one("td.p_reply")
                                 if reply_elem:
-                                    reply_text = reply_elem.text.strip()
-                                    match = re.search(r"(\d+)", reply_text)
-                                    if match:
-                                        hot_value = int(match.group(1))
+                                    hot_value = parse_count(reply_elem.text.strip())
                                 
                                 author = ""
                                 author_elem = post.select_one("td.p_author")
@@ -353,10 +321,7 @@ class HupuCrawler(BaseCrawler):
                                 hot_value = 0
                                 reply_elem = post.select_one(".post-reply-count")
                                 if reply_elem:
-                                    reply_text = reply_elem.text.strip()
-                                    match = re.search(r"(\d+)", reply_text)
-                                    if match:
-                                        hot_value = int(match.group(1))
+                                    hot_value = parse_count(reply_elem.text.strip())
                                 
                                 author = ""
                                 author_elem = post.select_one(".post-author")
@@ -385,10 +350,7 @@ class HupuCrawler(BaseCrawler):
                                 hot_value = 0
                                 reply_elem = post.select_one(".thread-reply-num")
                                 if reply_elem:
-                                    reply_text = reply_elem.text.strip()
-                                    match = re.search(r"(\d+)", reply_text)
-                                    if match:
-                                        hot_value = int(match.group(1))
+                                    hot_value = parse_count(reply_elem.text.strip())
                                 
                                 author = ""
                                 author_elem = post.select_one(".thread-author-name")
@@ -418,8 +380,10 @@ class HupuCrawler(BaseCrawler):
                             continue
                     
                     if items:
+                        self.record_strategy("selectors", selector, True, time.time() - started)
                         self.logger.info(f"从BeautifulSoup中提取到 {len(items)} 条虎扑热榜")
                         break
+                self.record_strategy("selectors", selector, False, time.time() - started)
             
             return items
             
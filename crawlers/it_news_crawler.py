@@ -5,7 +5,6 @@ import random
 import requests
 import logging
 import feedparser
-from bs4 import BeautifulSoup
 from crawlers.base_crawler import BaseCrawler
 from fake_useragent import UserAgent
 from datetime import datetime
@@ -34,12 +33,18 @@ class ITNewsCrawler(BaseCrawler):
             for rss_url in rss_urls:
                 try:
                     self.logger.info(f"尝试从RSS源 {rss_url} 获取IT新闻")
-                    feed = feedparser.parse(rss_url)
+                    # 通过make_request获取，经过限流、缓存和内容指纹检查后再交给feedparser
+                    response = self.make_request(rss_url)
+                    if not response or response.status_code != 200:
+                        continue
+                    feed = feedparser.parse(response.content)
                     
                     if feed.entries:
                         self.logger.info(f"成功从RSS源 {rss_url} 获取 {len(feed.entries)} 条新闻")
                         
                         for i, entry in enumerate(feed.entries):
+                            if self.budget_full(items):
+                                break
                             try:
                                 title = entry.get("title", "")
                                 url = entry.get("link", "")
@@ -123,26 +128,27 @@ class ITNewsCrawler(BaseCrawler):
                     response = self.make_request(url, headers=headers)
                     
                     if response and response.status_code == 200:
-                        html = response.text
-                        soup = BeautifulSoup(html, "html.parser")
+                        html = self.response_text(response)
                         
                         # 根据不同网站使用不同的选择器
                         article_elements = []
                         
                         if "36kr.com" in url:
-                            article_elements = soup.select("div.article-item") or soup.select("div.kr-flow-article-item")
+                            article_elements = self.iselect(html, "div.article-item") or self.iselect(html, "div.kr-flow-article-item")
                         elif "ithome.com" in url:
-                            article_elements = soup.select("div.block") or soup.select("div.new-list-1")
+                            article_elements = self.iselect(html, "div.block") or self.iselect(html, "div.new-list-1")
                         elif "cnbeta.com" in url:
-                            article_elements = soup.select("div.item") or soup.select("div.news-list")
+                            article_elements = self.iselect(html, "div.item") or self.iselect(html, "div.news-list")
                         elif "pingwest.com" in url:
-                            article_elements = soup.select("div.item") or soup.select("div.article-list")
+                            article_elements = self.iselect(html, "div.item") or self.iselect(html, "div.article-list")
                         else:
                             # 通用选择器
-                            article_elements = soup.select("article") or soup.select("div.article") or soup.select("div.news-item")
+                            article_elements = self.iselect(html, "article") or self.iselect(html, "div.article") or self.iselect(html, "div.news-item")
                         
                         if article_elements:
                             for i, article in enumerate(article_elements):
+                                if self.budget_full(items):
+                                    break
                                 try:
                                     # 提取标题和链接
                                     title_elem = article.select_one("h3") or article.select_one("h4") or article.select_one("a.title")
@@ -208,12 +214,3 @@ class ITNewsCrawler(BaseCrawler):
         except Exception as e:
             self.logger.error(f"通过网页爬取IT新闻失败: {str(e)}")
             return []
-    
-    def crawl(self):
-        """爬取IT新闻"""
-        if self.use_api:
-            items = self.crawl_by_api()
-        else:
-            items = self.crawl_by_web()
-        
-        return items 
\ No newline at end of file
@@ -0,0 +1,143 @@
+import logging
+
+import os
+import json
+
+from utils.sinks import EncodedBatch, build_sinks
+from utils.run_log import RunLog
+from utils.hot_item import normalize_batch
+from config.config import CrawlerConfig
+
+logger = logging.getLogger("HotNews.Pipeline")
+
+class CrawlPipeline:
+    """爬取流水线的输出端：抓取 → 解析 → 规范化 → sink
+
+    爬虫负责抓取、解析和规范化，得到的批次交给emit，每条记录只序列化一次，
+    再分发给配置的各个sink，一次运行中每种格式只写一次。
+    传入last_batch_dir时保存各平台最近一次写入的数据，平台内容未变化时交给汇总类sink。
+    """
+
+    def __init__(self, sinks, run_log=None, last_batch_dir=None):
+        self.sinks = sinks
+        self.run_log = run_log
+        self.last_batch_dir = last_batch_dir
+        self._run_level_sinks = [sink for sink in sinks if sink.run_level]
+
+    @classmethod
+    def from_config(cls, sink_names=None, output_dir=None):
+        """按CrawlerConfig.SINKS（或指定的名称列表）创建流水线"""
+        names = list(sink_names if sink_names is not None else CrawlerConfig.SINKS)
+        if sink_names is None and CrawlerConfig.SAVE_TO_DB and "db" not in names:
+            names.append("db")
+
+        options = {
+            "leaderboard": {
+                "state_path": CrawlerConfig.SCORE_STATE_PATH,
+                "window": CrawlerConfig.SCORE_WINDOW,
+            },
+            "timeseries": {"raw_hours": CrawlerConfig.TIMESERIES_RAW_HOURS},
+            "stories": {
+                "state_path": CrawlerConfig.STORY_STATE_PATH,
+                "retention_days": CrawlerConfig.STORY_RETENTION_DAYS,
+            },
+            "diff": {
+                "state_path": CrawlerConfig.DIFF_STATE_PATH,
+                "hot_threshold": CrawlerConfig.DIFF_HOT_THRESHOLD,
+            },
+            "db": {
+                "backend": CrawlerConfig.DB_BACKEND,
+                "path": CrawlerConfig.DB_PATH,
+                "uri": CrawlerConfig.MONGODB_URI,
+                "database": CrawlerConfig.MONGODB_DB,
+            },
+        }
+        output_dir = output_dir or CrawlerConfig.DATA_DIR
+        return cls(build_sinks(names, output_dir, options), RunLog(os.path.join(output_dir, "runs")),
+                   CrawlerConfig.LAST_BATCH_DIR)
+
+    def emit(self, platform, items, **metrics):
+        """把一个平台的规范化数据写入所有sink，metrics（如解码耗时）随运行记录写出"""
+        if not items:
+            logger.warning(f"{platform} 没有数据可保存")
+            return
+
+        batch = EncodedBatch(platform, items)
+        self._write(batch, self.sinks)
+        if self._run_level_sinks:
+            self._save_last_batch(batch)
+        
+        if self.run_log is not None:
+            self.run_log.record(platform, "changed", len(batch), **metrics)
+    
+    def mark_unchanged(self, platform, stage, **metrics):
+        """记录平台本次内容未变化（stage为body或ranking）
+        
+        各平台的快照和格式文件不再写入；汇总类sink收到该平台上次写入的数据，
+        运行结束时的汇总、热度榜和故事中仍包含这个平台。返回上次写入的数据，没有时返回空列表。
+        """
+        items = self._load_last_batch(platform) if self._run_level_sinks else []
+        if items:
+            self._write(EncodedBatch(platform, items, replayed=True), self._run_level_sinks)
+        
+        if self.run_log is not None:
+            self.run_log.record(platform, "unchanged", len(items), stage=stage, **metrics)
+        return items
+    
+    @staticmethod
+    def _write(batch, sinks):
+        for sink in sinks:
+            try:
+                filename = sink.write(batch)
+                if filename:
+                    logger.info(f"数据已保存到 {filename}")
+            except Exception as e:
+                logger.error(f"写入 {sink.name} 输出失败: {str(e)}", exc_info=True)
+    
+    def _last_batch_path(self, platform):
+        return os.path.join(self.last_batch_dir, f"{platform}.ndjson")
+    
+    def _save_last_batch(self, batch):
+        """保存平台本次写入的数据（复用已序列化的记录），只在内容变化时写一次"""
+        if not self.last_batch_dir:
+            return
+        path = self._last_batch_path(batch.platform)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.last_batch_dir, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{row}\n" for row in batch.json_rows))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"保存 {batch.platform} 最近一次数据失败: {str(e)}")
+    
+    def _load_last_batch(self, platform):
+        """读取平台最近一次写入的数据，恢复为原时间戳的HotBatch"""
+        if not self.last_batch_dir:
+            return []
+        try:
+            with open(self._last_batch_path(platform), "r", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取 {platform} 最近一次数据失败: {str(e)}")
+            return []
+        if not rows:
+            return []
+        return normalize_batch(rows, platform, rows[0].get("timestamp"))
+
+    def close(self):
+        """结束本次运行，汇总类sink在此时写出"""
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"关闭 {sink.name} 输出失败: {str(e)}", exc_info=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
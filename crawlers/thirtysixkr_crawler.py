@@ -1,7 +1,6 @@
-import re
-import json
-from bs4 import BeautifulSoup
+import time
 from crawlers.base_crawler import BaseCrawler
+from utils.json_extractor import extract_json
 
 class ThirtySixKrCrawler(BaseCrawler):
     """36氪热门爬虫"""
@@ -27,19 +26,11 @@ class ThirtySixKrCrawler(BaseCrawler):
                 self.api_url
             ]
             
-            response = None
-            used_api = ""
-            
-            for api in api_endpoints:
-                try:
-                    self.logger.info(f"尝试从 {api} 获取36氪热门数据")
-                    response = self.make_request(api, headers=headers)
-                    if response and response.status_code == 200:
-                        used_api = api
-                        self.logger.info(f"成功从 {api} 获取数据")
-                        break
-                except Exception as e:
-                    self.logger.warning(f"API请求失败 ({api}): {str(e)}")
+            used_api, response = self.make_hedged_request(
+                api_endpoints, headers=headers, cascade="api_endpoints", validate=lambda r: r.status_code == 200
+            )
+            if response:
+                self.logger.info(f"成功从 {used_api} 获取数据")
             
             if not response:
                 self.logger.error("所有API请求失败，切换到网页爬取")
@@ -61,6 +52,8 @@ class ThirtySixKrCrawler(BaseCrawler):
                     articles = data["data"]
                 
                 for i, article in enumerate(articles):
+                    if self.budget_full(items):
+                        break
                     try:
                         title = article.get("title", "")
                         url = article.get("news_url", "") or article.get("url", "")
@@ -116,105 +109,95 @@ class ThirtySixKrCrawler(BaseCrawler):
                 self.web_url
             ]
             
-            response = None
-            used_url = ""
-            
-            for url in urls:
-                try:
-                    self.logger.info(f"尝试从 {url} 爬取36氪热门数据")
-                    response = self.make_request(url, headers=headers)
-                    if response and response.status_code == 200:
-                        used_url = url
-                        self.logger.info(f"成功从 {url} 获取数据")
-                        break
-                except Exception as e:
-                    self.logger.warning(f"网页请求失败 ({url}): {str(e)}")
+            used_url, response = self.make_hedged_request(
+                urls, headers=headers, cascade="web_urls", validate=lambda r: r.status_code == 200
+            )
+            if response:
+                self.logger.info(f"成功从 {used_url} 获取数据")
             
             if not response:
                 self.logger.error("所有网页请求失败")
                 return []
             
-            html = response.text
+            html = self.response_text(response)
             items = []
             
             # 尝试从HTML中提取JSON数据
             try:
-                # 尝试多种正则模式提取JSON
-                json_patterns = [
-                    r'window\.initialState\s*=\s*({.*?});',
-                    r'window\.__NEXT_DATA__\s*=\s*({.*?});',
-                    r'window\.reactState\s*=\s*({.*?});',
-                    r'"itemList":\s*(\[.*?\])',
-                    r'"hotList":\s*(\[.*?\])'
+                # 尝试多种JSON数据标记
+                json_markers = [
+                    "window.initialState",
+                    "window.__NEXT_DATA__",
+                    "window.reactState",
+                    '"itemList":',
+                    '"hotList":'
                 ]
                 
-                for pattern in json_patterns:
-                    match = re.search(pattern, html, re.DOTALL)
-                    if match:
-                        json_str = match.group(1)
-                        try:
-                            data = json.loads(json_str)
-                            
-                            # 尝试从不同的JSON结构中提取文章数据
-                            articles = []
-                            
-                            # 检查多种可能的数据结构
-                            if "hotList" in data:
-                                articles = data["hotList"]
-                            elif "itemList" in data:
-                                articles = data["itemList"]
-                            elif "feedStream" in data and "data" in data["feedStream"]:
-                                articles = data["feedStream"]["data"]
-                            elif "props" in data and "pageProps" in data["props"]:
-                                if "initialState" in data["props"]["pageProps"]:
-                                    state = data["props"]["pageProps"]["initialState"]
-                                    if "hotList" in state:
-                                        articles = state["hotList"]
-                                    elif "itemList" in state:
-                                        articles = state["itemList"]
-                            
-                            if articles:
-                                for i, article in enumerate(articles):
-                                    try:
-                                        title = article.get("title", "")
-                                        url = article.get("news_url", "") or article.get("url", "") or article.get("route", "")
-                                        hot_value = article.get("views_count", 0) or article.get("view_count", 0) or 0
-                                        excerpt = article.get("description", "") or article.get("summary", "") or ""
-                                        publish_time = article.get("published_at", "") or article.get("published_time", "") or ""
-                                        author = article.get("author", {}).get("name", "") if article.get("author") else ""
-                                        
-                                        if not url or not url.startswith("http"):
-                                            url = f"https://36kr.com/p/{article.get('id')}"
-                                        
-                                        item = {
-                                            "rank": i + 1,
-                                            "title": title,
-                                            "url": url,
-                                            "hot_value": hot_value,
-                                            "excerpt": excerpt,
-                                            "publish_time": publish_time,
-                                            "author": author
-                                        }
-                                        
-                                        items.append(item)
-                                        
-                                    except Exception as e:
-                                        self.logger.warning(f"处理36氪文章条目时出错: {str(e)}")
-                                        continue
+                for marker in json_markers:
+                    data = extract_json(html, marker)
+                    if data is None:
+                        continue
+                    if isinstance(data, list):
+                        # "itemList": [...] 之类只取到列表本身，补回外层键
+                        data = {marker.strip('":'): data}
+                    
+                    # 尝试从不同的JSON结构中提取文章数据
+                    articles = []
+                    
+                    # 检查多种可能的数据结构
+                    if "hotList" in data:
+                        articles = data["hotList"]
+                    elif "itemList" in data:
+                        articles = data["itemList"]
+                    elif "feedStream" in data and "data" in data["feedStream"]:
+                        articles = data["feedStream"]["data"]
+                    elif "props" in data and "pageProps" in data["props"]:
+                        if "initialState" in data["props"]["pageProps"]:
+                            state = data["props"]["pageProps"]["initialState"]
+                            if "hotList" in state:
+                                articles = state["hotList"]
+                            elif "itemList" in state:
+                                articles = state["itemList"]
+                    
+                    if articles:
+                        for i, article in enumerate(articles):
+                            if self.budget_full(items):
+                                break
+                            try:
+                                title = article.get("title", "")
+                                url = article.get("news_url", "") or article.get("url", "") or article.get("route", "")
+                                hot_value = article.get("views_count", 0) or article.get("view_count", 0) or 0
+                                excerpt = article.get("description", "") or article.get("summary", "") or ""
+                                publish_time = article.get("published_at", "") or article.get("published_time", "") or ""
+                                author = article.get("author", {}).get("name", "") if article.get("author") else ""
                                 
-                                if items:
-                                    self.logger.info(f"从JSON数据中提取到 {len(items)} 条36氪热门文章")
-                                    return items
-                        except json.JSONDecodeError:
-                            self.logger.warning("JSON解析失败，尝试下一种模式")
-                            continue
+                                if not url or not url.startswith("http"):
+                                    url = f"https://36kr.com/p/{article.get('id')}"
+                                
+                                item = {
+                                    "rank": i + 1,
+                                    "title": title,
+                                    "url": url,
+                                    "hot_value": hot_value,
+                                    "excerpt": excerpt,
+                                    "publish_time": publish_time,
+                                    "author": author
+                                }
+                                
+                                items.append(item)
+                                
+                            except Exception as e:
+                                self.logger.warning(f"处理36氪文章条目时出错: {str(e)}")
+                                continue
+                        
+                        if items:
+                            self.logger.info(f"从JSON数据中提取到 {len(items)} 条36氪热门文章")
+                            return items
             except Exception as e:
                 self.logger.warning(f"从HTML提取JSON数据失败: {str(e)}")
             
             # 如果JSON提取失败，尝试使用BeautifulSoup解析HTML
             try:
-                soup = BeautifulSoup(html, "html.parser")
-                
                 # 尝试多种选择器
                 article_selectors = [
                     "div.hotlist-item",
@@ -223,10 +206,13 @@ class ThirtySixKrCrawler(BaseCrawler):
                     "div.kr-flow-article-item"
                 ]
                 
-                for selector in article_selectors:
-                    articles = soup.select(selector)
+                for selector in self.ordered_strategies("selectors", article_selectors):
+                    started = time.time()
+                    articles = self.iselect(html, selector)
                     if articles:
                         for i, article in enumerate(articles):
+                            if self.budget_full(items):
+                                break
                             try:
                                 title_elem = article.select_one("a.title") or article.select_one("a.article-title") or article.select_one("h4")
                                 title = title_elem.text.strip() if title_elem else ""
@@ -259,8 +245,10 @@ class ThirtySixKrCrawler(BaseCrawler):
                                 continue
                         
                         if items:
+                            self.record_strategy("selectors", selector, True, time.time() - started)
                             self.logger.info(f"从HTML中提取到 {len(items)} 条36氪热门文章")
                             return items
+                    self.record_strategy("selectors", selector, False, time.time() - started)
             except Exception as e:
                 self.logger.error(f"使用BeautifulSoup解析HTML失败: {str(e)}")
             
@@ -273,12 +261,3 @@ class ThirtySixKrCrawler(BaseCrawler):
         except Exception as e:
             self.logger.error(f"通过网页爬取36氪热门失败: {str(e)}")
             return []
-    
-    def crawl(self):
-        """爬取36氪热门"""
-        if self.use_api:
-            items = self.crawl_by_api()
-        else:
-            items = self.crawl_by_web()
-        
-        return items 
\ No newline at end of file
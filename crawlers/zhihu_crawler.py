@@ -1,6 +1,6 @@
-import json
-import re
 from crawlers.base_crawler import BaseCrawler
+from utils.count_parser import parse_count
+from utils.json_extractor import extract_json
 
 class ZhihuCrawler(BaseCrawler):
     """知乎热榜爬虫"""
@@ -20,19 +20,15 @@ class ZhihuCrawler(BaseCrawler):
             items = []
             
             for i, item_data in enumerate(data.get("data", [])):
+                if self.budget_full(items):
+                    break
                 try:
                     target = item_data.get("target", {})
                     question = target.get("question", {})
                     
                     # 获取热度值
                     detail_text = item_data.get("detail_text", "")
-                    hot_value = 0
-                    match = re.search(r"(\d+(?:\.\d+)?)(?:万)?", detail_text)
-                    if match:
-                        hot_num = float(match.group(1))
-                        if "万" in detail_text:
-                            hot_num *= 10000
-                        hot_value = int(hot_num)
+                    hot_value = parse_count(detail_text)
                     
                     # 构建URL
                     url = ""
@@ -65,7 +61,7 @@ class ZhihuCrawler(BaseCrawler):
     def crawl_by_web(self):
         """通过网页爬取知乎热榜"""
         try:
-            soup = self.get_soup(self.web_url)
+            soup = self.get_soup(self.web_url, scoped=True)
             if not soup:
                 self.logger.error("获取网页内容失败")
                 return []
@@ -87,14 +83,7 @@ class ZhihuCrawler(BaseCrawler):
                 return []
             
             # 提取JSON数据
-            json_data = None
-            match = re.search(r'window\.initialState\s*=\s*({.*?})(?=;)', script_content, re.DOTALL)
-            if match:
-                try:
-                    json_data = json.loads(match.group(1))
-                except:
-                    self.logger.error("解析JSON数据失败")
-                    return []
+            json_data = extract_json(script_content, "window.initialState")
             
             if not json_data:
                 self.logger.error("无法解析网页中的热榜数据")
@@ -104,18 +93,14 @@ class ZhihuCrawler(BaseCrawler):
             hot_list = json_data.get("topstory", {}).get("hotList", [])
             
             for i, item_data in enumerate(hot_list):
+                if self.budget_full(items):
+                    break
                 try:
                     target = item_data.get("target", {})
                     
                     # 获取热度值
                     detail_text = item_data.get("detail_text", "")
-                    hot_value = 0
-                    match = re.search(r"(\d+(?:\.\d+)?)(?:万)?", detail_text)
-                    if match:
-                        hot_num = float(match.group(1))
-                        if "万" in detail_text:
-                            hot_num *= 10000
-                        hot_value = int(hot_num)
+                    hot_value = parse_count(detail_text)
                     
                     # 处理URL
                     url = ""
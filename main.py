@@ -2,16 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
 import logging
-import concurrent.futures
 import os
 from datetime import datetime
 from tqdm import tqdm
-import json
-import csv
 
 from crawlers.crawler_factory import CrawlerFactory
-from config.config import CrawlerConfig, OUTPUT_FORMAT, DATA_DIR
+from config.config import CrawlerConfig, DATA_DIR
+from crawlers.pipeline import CrawlPipeline
+from utils.async_engine import AsyncCrawlEngine
+from utils.story_index import StoryIndex
 
 # 导入爬虫
 from crawlers.zhihu_crawler import ZhihuCrawler
@@ -40,36 +41,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger("main")
 
-def save_data(data, output_file):
-    """保存数据"""
-    if not data:
-        logger.warning("没有数据可保存")
-        return
-    
-    # 创建目录
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    # 根据文件扩展名保存数据
-    if output_file.endswith(".json"):
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    elif output_file.endswith(".csv"):
-        with open(output_file, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-    elif output_file.endswith(".xlsx"):
-        try:
-            import pandas as pd
-            df = pd.DataFrame(data)
-            df.to_excel(output_file, index=False)
-        except ImportError:
-            logger.error("保存Excel格式需要安装pandas和openpyxl库")
-            with open(output_file.replace(".xlsx", ".json"), "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    logger.info(f"数据已保存到 {output_file}")
-
 def get_crawler(platform):
     """获取爬虫实例"""
     if platform == "zhihu":
@@ -94,36 +65,24 @@ def get_crawler(platform):
         logger.error(f"不支持的平台: {platform}")
         return None
 
-def crawl_platform(platform):
-    """爬取指定平台的热门数据"""
+def _prepare_crawler(platform):
+    """检查平台配置并创建爬虫实例"""
     if platform not in CrawlerConfig.PLATFORMS:
         logger.error(f"不支持的平台: {platform}")
-        return
+        return None
     
     if not CrawlerConfig.PLATFORMS[platform]["enabled"]:
         logger.warning(f"平台 {platform} 已禁用")
-        return
+        return None
     
     logger.info(f"开始爬取 {platform} 的热门数据")
     
     # 获取爬虫实例
-    crawler = get_crawler(platform)
-    if not crawler:
-        return
-    
-    # 爬取数据
-    items = crawler.crawl()
-    
-    # 限制数量
-    max_items = CrawlerConfig.PLATFORMS[platform]["max_items"]
-    if len(items) > max_items:
-        items = items[:max_items]
-    
-    # 保存数据
-    config = CrawlerConfig(platform)
-    output_file = config.get_output_file()
-    save_data(items, output_file)
-    
+    return get_crawler(platform)
+
+def _finish_platform(platform, items):
+    """输出爬取摘要（数量限制和保存已由爬虫和流水线完成）"""
+    items = items or []
     logger.info(f"成功爬取 {platform} 的 {len(items)} 条热点数据")
     
     # 打印热门标题
@@ -134,28 +93,66 @@ def crawl_platform(platform):
     
     return items
 
-def crawl_all_platforms(use_concurrent=True):
-    """爬取所有启用的平台"""
+def crawl_platform(platform, pipeline=None):
+    """爬取指定平台的热门数据，结果写入流水线的各个输出"""
+    crawler = _prepare_crawler(platform)
+    if not crawler:
+        return
+    
+    # 爬取数据
+    items = crawler.crawl(pipeline=pipeline)
+    
+    return _finish_platform(platform, items)
+
+async def acrawl_platform(platform, engine, pipeline=None):
+    """在异步引擎中爬取指定平台的热门数据"""
+    crawler = _prepare_crawler(platform)
+    if not crawler:
+        return
+    
+    # 爬取数据，写文件在爬虫的工作线程中完成
+    items = await crawler.acrawl(engine, pipeline)
+    
+    return _finish_platform(platform, items)
+
+async def acrawl_all_platforms(platforms, pipeline):
+    """在同一个事件循环中并发爬取所有平台"""
+    results = {}
+    
+    async def run(platform, engine):
+        try:
+            return platform, await acrawl_platform(platform, engine, pipeline)
+        except Exception as e:
+            logger.error(f"获取 {platform} 结果时出错: {str(e)}")
+            return platform, []
+    
+    # 每个平台占用一个解析线程，线程池按平台数创建，全局并发只由MAX_CONCURRENCY限制
+    async with AsyncCrawlEngine(CrawlerConfig.MAX_CONCURRENCY, max_workers=len(platforms)) as engine:
+        # 使用tqdm显示进度
+        with tqdm(total=len(platforms), desc="爬取进度") as progress:
+            for future in asyncio.as_completed([run(platform, engine) for platform in platforms]):
+                platform, items = await future
+                results[platform] = items
+                progress.update(1)
+    
+    return results
+
+def crawl_all_platforms(use_concurrent=True, pipeline=None):
+    """爬取所有启用的平台，未传入流水线时按配置创建，运行结束时关闭（写出汇总）"""
+    if pipeline is None:
+        with CrawlPipeline.from_config() as pipeline:
+            return crawl_all_platforms(use_concurrent, pipeline)
+    
     platforms = CrawlerFactory.available_platforms()
     results = {}
     
     if use_concurrent:
-        # 使用线程池并发爬取
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(platforms), 5)) as executor:
-            future_to_platform = {executor.submit(crawl_platform, platform): platform for platform in platforms}
-            
-            # 使用tqdm显示进度
-            for future in tqdm(concurrent.futures.as_completed(future_to_platform), total=len(platforms), desc="爬取进度"):
-                platform = future_to_platform[future]
-                try:
-                    results[platform] = future.result()
-                except Exception as e:
-                    logger.error(f"获取 {platform} 结果时出错: {str(e)}")
-                    results[platform] = []
+        # 所有平台共享一个事件循环和全局并发上限
+        results = asyncio.run(acrawl_all_platforms(platforms, pipeline))
     else:
         # 顺序爬取
         for platform in tqdm(platforms, desc="爬取进度"):
-            results[platform] = crawl_platform(platform)
+            results[platform] = crawl_platform(platform, pipeline)
             
     return results
 
@@ -175,6 +172,17 @@ def print_summary(results):
         for i, item in enumerate(items[:3]):
             print(f"  {i+1}. {item['title']}")
         print()
+    
+    # 同一事件在多个平台上榜时合并显示
+    index = StoryIndex()
+    for platform, items in results.items():
+        index.add_items(platform, items or [])
+    stories = index.stories(min_platforms=2)
+    if stories:
+        print("跨平台热点:")
+        for story in stories[:10]:
+            print(f"  {story['title']} ({', '.join(story['platforms'])})")
+        print()
         
     print(f"总计爬取 {total_items} 条热点新闻")
     print("=" * 50)
@@ -196,34 +204,17 @@ def main():
     global DATA_DIR
     DATA_DIR = args.output
     
-    # 爬取数据
-    all_items = {}
-    
-    if args.platform:
-        items = crawl_platform(args.platform)
-        if items:
-            all_items[args.platform] = items
-    elif args.all:
-        for platform, config in CrawlerConfig.PLATFORMS.items():
-            if config["enabled"]:
-                items = crawl_platform(platform)
-                if items:
-                    all_items[platform] = items
-    else:
+    if not args.platform and not args.all:
         parser.print_help()
         return
     
-    # 汇总数据
-    if len(all_items) > 1:
-        summary_file = os.path.join(DATA_DIR, f"summary_{datetime.now().strftime('%Y%m%d')}.json")
-        with open(summary_file, "w", encoding="utf-8") as f:
-            json.dump(all_items, f, ensure_ascii=False, indent=2)
-        logger.info(f"汇总数据已保存到 {summary_file}")
-        
-        # 打印汇总信息
-        logger.info("爬取汇总:")
-        for platform, items in all_items.items():
-            logger.info(f"{platform}: {len(items)} 条热点")
+    # 各平台数据只写一次，多个平台时流水线关闭时写出汇总
+    with CrawlPipeline.from_config(output_dir=DATA_DIR) as pipeline:
+        if args.platform:
+            crawl_platform(args.platform, pipeline)
+        else:
+            # 所有已启用的平台在同一个事件循环中并发爬取
+            crawl_all_platforms(pipeline=pipeline)
     
     logger.info("爬取完成")
 
@@ -9,6 +9,9 @@ from datetime import datetime
 
 from config.config import CrawlerConfig
 from main import crawl_all_platforms, print_summary
+from utils.proxy_pool import get_proxy_pool
+from utils.archive import compact_archive
+from utils.timeseries import TimeSeriesStore
 
 # 设置日志
 logging.basicConfig(
@@ -33,6 +36,13 @@ def job():
         # 打印摘要
         print_summary(results)
         
+        # 输出代理健康状况，分数最低的代理排在最前
+        if CrawlerConfig.USE_PROXY:
+            for stat in get_proxy_pool(CrawlerConfig.PROXY_LIST_PATH).stats():
+                logger.info(f"代理 {stat['proxy']}: 分数 {stat['score']}, 成功率 {stat['success_rate']}, "
+                            f"延迟 {stat['latency']}s, 请求 {stat['requests']}, 失败 {stat['failures']}"
+                            f"{', 已隔离' if stat['quarantined'] else ''}")
+        
         # 统计耗时
         elapsed_time = time.time() - start_time
         logger.info(f"定时爬取任务完成，耗时 {elapsed_time:.2f} 秒")
@@ -42,6 +52,23 @@ def job():
         
     logger.info(f"下次任务将在 {CrawlerConfig.SCHEDULE_INTERVAL} 分钟后执行")
 
+def maintenance_job():
+    """每天合并前一天及更早的Parquet归档小文件，并对时间序列降采样"""
+    if "parquet" in CrawlerConfig.SINKS:
+        logger.info("开始合并Parquet归档")
+        try:
+            compacted = compact_archive(CrawlerConfig.ARCHIVE_DIR)
+            logger.info(f"归档合并完成，共 {len(compacted)} 个分区")
+        except Exception as e:
+            logger.error(f"合并Parquet归档时出错: {str(e)}", exc_info=True)
+    
+    if "timeseries" in CrawlerConfig.SINKS:
+        logger.info("开始时间序列降采样")
+        try:
+            TimeSeriesStore(CrawlerConfig.TIMESERIES_DIR, raw_hours=CrawlerConfig.TIMESERIES_RAW_HOURS).downsample()
+        except Exception as e:
+            logger.error(f"时间序列降采样时出错: {str(e)}", exc_info=True)
+
 def main():
     """主函数"""
     logger.info("热点新闻定时爬取服务已启动")
@@ -52,6 +79,8 @@ def main():
     
     # 设置定时任务
     schedule.every(CrawlerConfig.SCHEDULE_INTERVAL).minutes.do(job)
+    if "parquet" in CrawlerConfig.SINKS or "timeseries" in CrawlerConfig.SINKS:
+        schedule.every().day.at(CrawlerConfig.MAINTENANCE_TIME).do(maintenance_job)
     
     # 运行定时任务
     while True:
@@ -0,0 +1,51 @@
+# 各平台热度/播放量/回复数的实际写法及期望结果，单元测试和benchmarks/bench_count_parser.py共用
+GOLDEN_CASES = {
+    "zhihu": [
+        ("1234 万热度", 12340000),
+        ("986万热度", 9860000),
+        ("0.29万热度", 2900),
+        ("", 0),
+    ],
+    "weibo": [
+        ("1234567", 1234567),
+        ("剧集 345678", 345678),
+        ("综艺 1.2万", 12000),
+        ("热 99.8万", 998000),
+        ("1.5亿", 150000000),
+    ],
+    "douyin": [
+        ("1234.5万", 12345000),
+        ("980.1w", 9801000),
+        ("3.2亿", 320000000),
+        ("12,345,678", 12345678),
+    ],
+    "baidu": [
+        ("4,989,520", 4989520),
+        ("4989520", 4989520),
+        ("热搜指数 12,345", 12345),
+    ],
+    "bilibili": [
+        ("123.4万", 1234000),
+        ("9999", 9999),
+        ("1.2亿播放", 120000000),
+        ("播放 5.6k", 5600),
+        ("--", 0),
+    ],
+    "hupu": [
+        ("回复 1234", 1234),
+        ("1.1万", 11000),
+        ("亮了(345)", 345),
+    ],
+    "douban": [
+        ("56回应", 56),
+        ("1,024 回应", 1024),
+        ("3人喜欢", 3),
+    ],
+    "misc": [
+        ("5 Weibo", 5),
+        ("萬", 0),
+        (".5万", 5000),
+        (12345, 12345),
+        (None, 0),
+    ],
+}
@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from crawlers.baidu_crawler import index_title_urls
+
+def search_title_urls(html_content, titles):
+    """原实现：每个标题对整页做一次惰性DOTALL搜索"""
+    urls = {}
+    for title in titles:
+        match = re.search(f'{re.escape(title)}.*?href="([^"]+)"', html_content, re.DOTALL)
+        if match:
+            urls.setdefault(title, match.group(1))
+    return urls
+
+PAGES = [
+    # 一个标题出现在另一个标题内部
+    ('<div>李明退役</div><a href="/1">x</a><div>李明</div><a href="/2">y</a>', ["李明退役", "李明"]),
+    ('<div>李明</div><a href="/1">x</a><div>李明退役</div><a href="/2">y</a>', ["李明退役", "李明"]),
+    # 标题重复出现、之后没有链接、页面中不存在
+    ('<a href="/0">a</a>甲<a href="/1">b</a>甲<a href="/2">c</a>乙', ["甲", "乙", "丙"]),
+    # 空链接被跳过，标题紧接着链接
+    ('标题<a href="">a</a><a href="/ok">b</a>标题2href="/3"', ["标题", "标题2", "题"]),
+    # 正则特殊字符
+    ('<p>C++ (2024)?</p><a href="/cpp">c</a>', ["C++ (2024)?"]),
+]
+
+@pytest.mark.parametrize("html_content, titles", PAGES)
+def test_matches_per_title_search(html_content, titles):
+    assert index_title_urls(html_content, titles) == search_title_urls(html_content, titles)
+
+def test_nested_title_uses_its_own_first_occurrence():
+    html_content = '<div>李明退役</div><a href="/1">x</a><div>李明</div><a href="/2">y</a>'
+    assert index_title_urls(html_content, ["李明退役", "李明"]) == {"李明退役": "/1", "李明": "/1"}
+
+def test_empty_titles():
+    assert index_title_urls('<a href="/1">x</a>', []) == {}
+    assert index_title_urls('<a href="/1">x</a>', [""]) == {}
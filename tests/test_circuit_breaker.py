@@ -0,0 +1,73 @@
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "time", lambda: now[0])
+    return now
+
+def test_opens_after_threshold_and_probes_once(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock[0] += 60
+    # 恢复时间过后只放行一个探测请求
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    assert breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    clock[0] += 60
+    assert breaker.allow_request()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_at == clock[0]
+    assert not breaker.allow_request()
+
+def test_stuck_probe_is_retried_after_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    clock[0] += 60
+    assert breaker.allow_request()
+    clock[0] += 59
+    assert not breaker.allow_request()
+    clock[0] += 1
+    assert breaker.allow_request()
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    assert not breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_registry_keys_by_endpoint_and_persists_state(tmp_path, clock):
+    path = str(tmp_path / "breakers.json")
+    registry = CircuitBreakerRegistry(path, failure_threshold=1, recovery_timeout=60)
+    registry.record_failure("https://api.example/hot?page=1")
+    # 查询参数不同仍是同一端点，路径不同是另一个端点
+    assert not registry.allow_request("https://api.example/hot?page=2")
+    assert registry.allow_request("https://api.example/other")
+
+    clock[0] += 60
+    assert registry.allow_request("https://api.example/hot")
+
+    # 半开状态持久化为打开，重启后仍需等待恢复时间
+    reloaded = CircuitBreakerRegistry(path, failure_threshold=1, recovery_timeout=60)
+    assert reloaded.stats()["https://api.example/hot"]["state"] == CircuitBreaker.OPEN
+    clock[0] -= 1
+    assert not reloaded.allow_request("https://api.example/hot")
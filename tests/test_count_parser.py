@@ -0,0 +1,36 @@
+import pytest
+
+from utils.count_parser import parse_count, parse_counts
+from tests.count_cases import GOLDEN_CASES
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [case for cases in GOLDEN_CASES.values() for case in cases],
+)
+def test_golden_cases(text, expected):
+    assert parse_count(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("²", 0),
+    ("12³", 12),
+    ("²万", 0),
+    ("１２３", 123),
+    ("١٢٣", 123),
+])
+def test_unicode_digits_do_not_raise(text, expected):
+    assert parse_count(text) == expected
+
+def test_default_for_unparseable_text():
+    assert parse_count("--", default=None) is None
+    assert parse_count("²", default=None) is None
+    assert parse_count(True, default=-1) == -1
+
+def test_batch_matches_single():
+    texts = [text for cases in GOLDEN_CASES.values() for text, _ in cases]
+    assert parse_counts(texts) == [parse_count(text) for text in texts]
+    assert parse_counts(texts, default=None) == [parse_count(text, default=None) for text in texts]
+
+def test_batch_matches_single_for_mixed_values():
+    values = [12, 3.5, True, None, "", "007", "²", "１２３", "1.2万", b"12"]
+    assert parse_counts(values, default=-1) == [parse_count(value, default=-1) for value in values]
+    assert parse_counts(iter(["1", "2万"])) == [1, 20000]
@@ -0,0 +1,85 @@
+import pytest
+
+from config.config import CrawlerConfig
+from crawlers.base_crawler import BaseCrawler
+from crawlers.pipeline import CrawlPipeline
+from utils.fingerprint import FingerprintStore, body_fingerprint, ranking_fingerprint
+from utils.helpers import AsyncResponse
+from utils.hot_item import normalize_batch
+
+RAW = [
+    {"title": "标题A", "url": "https://a", "hot_value": 100, "rank": 1},
+    {"title": "标题B", "url": "https://b", "hot_value": 50, "rank": 2},
+]
+
+def test_ranking_fingerprint_ignores_only_the_timestamp():
+    first = normalize_batch(RAW, "weibo", "2024-01-01T00:00:00")
+    later = normalize_batch(RAW, "weibo", "2024-01-01T01:00:00")
+    assert ranking_fingerprint(first) == ranking_fingerprint(later)
+
+    hotter = normalize_batch([dict(RAW[0], hot_value=200), RAW[1]], "weibo", "2024-01-01T01:00:00")
+    assert ranking_fingerprint(hotter) != ranking_fingerprint(first)
+
+def test_store_compares_body_per_url(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.json"))
+    body = body_fingerprint(b"<html></html>")
+    assert not store.body_unchanged("weibo", "https://a", body)
+    store.update("weibo", url="https://a", body=body, ranking="r1")
+    assert store.body_unchanged("weibo", "https://a", body)
+    assert not store.body_unchanged("weibo", "https://b", body)
+    assert store.ranking_unchanged("weibo", "r1")
+    assert not store.ranking_unchanged("baidu", "r1")
+
+class _SwallowingCrawler(BaseCrawler):
+    """API失败时切换网页爬取、并用宽泛的except Exception包住请求的爬虫"""
+
+    def __init__(self, responses):
+        super().__init__("weibo")
+        self.use_api = True
+        self.api_url = "https://api.example/hot"
+        self.responses = responses
+        self.requested = []
+
+    def crawl_by_api(self):
+        try:
+            response = self.make_request(self.api_url)
+            return [dict(item) for item in response.json()]
+        except Exception:
+            return self.crawl_by_web()
+
+    def crawl_by_web(self):
+        response = self.make_request("https://web.example/hot")
+        return [dict(item) for item in response.json()] if response else []
+
+    def fake_request(self, url, **kwargs):
+        self.requested.append(url)
+        return AsyncResponse(url, 200, {"Content-Type": "application/json"}, self.responses[url])
+
+@pytest.fixture
+def dedup_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(CrawlerConfig, "CONTENT_DEDUP", True)
+    monkeypatch.setattr(CrawlerConfig, "ADAPTIVE_STRATEGIES", False)
+    monkeypatch.setattr(CrawlerConfig, "FINGERPRINT_STATE_PATH", str(tmp_path / "fingerprints.json"))
+
+def test_unchanged_body_skips_fallbacks_even_behind_broad_excepts(dedup_config, monkeypatch):
+    crawler = _SwallowingCrawler({"https://api.example/hot": b'[{"title": "A", "url": "https://a", "rank": 1}]'})
+    monkeypatch.setattr("crawlers.base_crawler.make_request", crawler.fake_request)
+    pipeline = CrawlPipeline([])
+
+    assert len(crawler._run_pipeline(pipeline)) == 1
+    assert crawler._run_pipeline(pipeline) == []
+    # 第二次只请求了API，没有因为"请求失败"去请求网页
+    assert crawler.requested == ["https://api.example/hot", "https://api.example/hot"]
+    assert crawler._unchanged
+
+def test_same_ranking_with_new_body_is_not_written(dedup_config, monkeypatch):
+    crawler = _SwallowingCrawler({"https://api.example/hot": b'[{"title": "A", "url": "https://a", "rank": 1}]'})
+    monkeypatch.setattr("crawlers.base_crawler.make_request", crawler.fake_request)
+    written = []
+    pipeline = CrawlPipeline([])
+    monkeypatch.setattr(pipeline, "emit", lambda platform, items, **metrics: written.append(platform))
+
+    crawler._run_pipeline(pipeline)
+    crawler.responses["https://api.example/hot"] = b'[{"title": "A", "url": "https://a", "rank": 1}] '
+    crawler._run_pipeline(pipeline)
+    assert written == ["weibo"]
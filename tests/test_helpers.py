@@ -0,0 +1,61 @@
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.helpers import make_hedged_request, make_request
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = Counter()
+
+    def do_GET(self):
+        type(self).hits[self.path] += 1
+        if self.path == "/slow-fail":
+            time.sleep(0.2)
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    _Handler.hits = Counter()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_hedged_request_returns_first_valid_response(server):
+    url, response = make_hedged_request(
+        [f"{server}/slow-fail", f"{server}/fast"], hedge_delay=0.05,
+        headers={"User-Agent": "test"}, retry_times=1,
+    )
+    assert url == f"{server}/fast"
+    assert response.content == b"ok"
+
+def test_hedged_request_stops_losing_retries(server):
+    url, _ = make_hedged_request(
+        [f"{server}/slow-fail", f"{server}/fast"], hedge_delay=0.05,
+        headers={"User-Agent": "test"}, retry_times=5, retry_delay=0.05, max_retry_delay=0.05,
+    )
+    assert url == f"{server}/fast"
+    # 落后的请求在当前这次尝试结束后停止，不再重试
+    time.sleep(0.6)
+    assert _Handler.hits["/slow-fail"] == 1
+
+def test_cancelled_request_does_not_start(server):
+    cancel = threading.Event()
+    cancel.set()
+    assert make_request(f"{server}/fast", headers={"User-Agent": "test"}, cancel=cancel) is None
+    assert _Handler.hits["/fast"] == 0
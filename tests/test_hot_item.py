@@ -0,0 +1,55 @@
+import json
+
+from utils.hot_item import HotBatch, HotItem, item_identity, normalize_batch, to_rows
+
+RAW = [
+    {"title": "标题A", "url": "https://a", "hot_value": 100, "rank": 1, "category": "社会", "excerpt": "摘要"},
+    {"title": "标题B", "rank": 2, "author": "作者", "extra": "忽略"},
+]
+
+def test_to_dicts_matches_normalized_rows():
+    batch = normalize_batch(RAW, "weibo", "2024-01-01T00:00:00")
+    assert batch.to_dicts() == [
+        {"platform": "weibo", "timestamp": "2024-01-01T00:00:00", "title": "标题A", "url": "https://a",
+         "hot_value": 100, "rank": 1, "excerpt": "摘要", "category": "社会"},
+        {"platform": "weibo", "timestamp": "2024-01-01T00:00:00", "title": "标题B", "url": "",
+         "hot_value": 0, "rank": 2, "author": "作者"},
+    ]
+    # 字段顺序与原normalize_data一致，未知字段被丢弃
+    assert list(batch.to_dicts()[1]) == ["platform", "timestamp", "title", "url", "hot_value", "rank", "author"]
+    assert [json.loads(row) for row in batch.iter_json_rows()] == batch.to_dicts()
+
+def test_batch_shares_one_timestamp_and_slices_into_batches():
+    batch = normalize_batch(RAW, "weibo")
+    assert batch[0].timestamp is batch[1].timestamp is batch.timestamp
+    head = batch[:1]
+    assert isinstance(head, HotBatch)
+    assert head.timestamp == batch.timestamp
+    assert head.to_dicts() == batch.to_dicts()[:1]
+
+def test_limit_stops_consuming_the_generator():
+    consumed = []
+
+    def produce():
+        for i in range(10):
+            consumed.append(i)
+            yield {"title": f"标题{i}", "rank": i + 1}
+
+    batch = normalize_batch(produce(), "baidu", limit=3)
+    assert len(batch) == 3
+    assert consumed == [0, 1, 2]
+
+def test_item_reads_like_a_dict():
+    item = HotItem("weibo", "2024-01-01T00:00:00", title="标题", category="社会")
+    assert item["title"] == "标题"
+    assert item.get("author", "无") == "无"
+    assert "category" in item and "author" not in item and "extra" not in item
+    assert item_identity(item) == "标题"
+
+def test_to_rows_accepts_batches_items_and_dicts():
+    batch = normalize_batch(RAW, "weibo", "2024-01-01T00:00:00")
+    rows = batch.to_dicts()
+    assert to_rows(batch) == rows
+    assert to_rows(list(batch)) == rows
+    assert to_rows(rows) == rows
+    assert to_rows(None) == []
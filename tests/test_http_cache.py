@@ -0,0 +1,66 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.helpers import make_request
+from utils.http_cache import HttpCache
+
+ETAG = '"v1"'
+
+class _Handler(BaseHTTPRequestHandler):
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            type(self).statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        type(self).statuses.append(200)
+        body = "热榜".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Vary", "User-Agent, Accept-Language")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    _Handler.statuses = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/hot"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_304_is_served_from_cache_even_with_a_new_user_agent(server, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    first = make_request(server, headers={"User-Agent": "ua-1", "Accept-Language": "zh-CN"}, cache=cache)
+    assert not first.from_cache
+
+    second = make_request(server, headers={"User-Agent": "ua-2", "Accept-Language": "zh-CN"}, cache=cache)
+    assert _Handler.statuses == [200, 304]
+    assert second.from_cache
+    assert second.status_code == 200
+    assert second.content == "热榜".encode("utf-8")
+
+def test_other_vary_headers_still_have_to_match(server, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    make_request(server, headers={"User-Agent": "ua", "Accept-Language": "zh-CN"}, cache=cache)
+    assert cache.lookup("GET", server, headers={"User-Agent": "other", "Accept-Language": "zh-CN"}) is not None
+    assert cache.lookup("GET", server, headers={"User-Agent": "ua", "Accept-Language": "en"}) is None
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.store("GET", "https://a/hot", None, {}, {"Content-Type": "text/html"}, b"x")
+    assert cache.lookup("GET", "https://a/hot") is None
+    cache.store("GET", "https://a/hot", None, {}, {"ETag": '"1"', "Vary": "*"}, b"x")
+    assert cache.lookup("GET", "https://a/hot") is None
@@ -0,0 +1,34 @@
+import pytest
+
+from utils.json_extractor import extract_first_json, extract_json
+
+@pytest.mark.parametrize("text, marker, expected", [
+    ('<script>window.__INITIAL_STATE__ = {"a": 1};</script>', "window.__INITIAL_STATE__", {"a": 1}),
+    ('<script>window.initialState={"a":[1,2]}</script>', "window.initialState", {"a": [1, 2]}),
+    ('{"data": {"hotgov": {"word": "x"}, "list": []}}', '"hotgov":', {"word": "x"}),
+    ('"itemList": [{"id": 1}], "other": 2', '"itemList":', [{"id": 1}]),
+    ('<!--s-data:{"data": {"cards": []}}-->', "<!--s-data:", {"data": {"cards": []}}),
+])
+def test_decodes_value_after_marker(text, marker, expected):
+    assert extract_json(text, marker) == expected
+
+def test_strings_containing_terminators_are_not_truncated():
+    text = '<script>window.s = {"title": "a};</script>b", "n": 2};</script>'
+    assert extract_json(text, "window.s") == {"title": "a};</script>b", "n": 2}
+
+def test_url_encoded_json_is_decoded():
+    text = '<script id="RENDER_DATA" type="application/json">%7B%22word%22%3A%22%E7%83%AD%22%7D</script>'
+    assert extract_json(text, 'type="application/json">') == {"word": "热"}
+
+def test_skips_occurrences_that_are_not_json():
+    text = 'var name = "window.state"; window.state = {broken; window.state = {"ok": true};'
+    assert extract_json(text, "window.state") == {"ok": True}
+
+@pytest.mark.parametrize("text", ["", None, "<html>没有数据</html>", "window.state = 1;"])
+def test_returns_none_when_missing(text):
+    assert extract_json(text, "window.state") is None
+
+def test_first_json_tries_markers_in_order():
+    text = 'window.b = {"b": 1}; window.a = {"a": 1};'
+    assert extract_first_json(text, ["window.c", "window.a", "window.b"]) == ("window.a", {"a": 1})
+    assert extract_first_json(text, ["window.c"]) == (None, None)
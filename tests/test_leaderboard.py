@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.leaderboard import HotScorer, leaderboard
+
+def make_items(values):
+    return [{"rank": index + 1, "title": f"t{index}", "hot_value": value} for index, value in enumerate(values)]
+
+def test_scores_follow_rank_and_hot_value():
+    scorer = HotScorer(window=4)
+    scores = scorer.score("weibo", make_items([5000, 3000, 1000]))
+    assert list(np.argsort(-scores)) == [0, 1, 2]
+    assert ((scores >= 0) & (scores <= 1)).all()
+
+def test_items_without_hot_value_get_neutral_hot_score():
+    scores = HotScorer().score("it_news", make_items([0, 0]))
+    # 排名分为1和0.5，热度分为中性的0.5
+    assert scores.tolist() == pytest.approx([0.75, 0.5])
+
+def test_leaderboard_merges_platforms_by_score():
+    scorer = HotScorer(window=4)
+    board = leaderboard({"a": make_items([900, 100]), "b": make_items([500])}, scorer, limit=2)
+    assert len(board) == 2
+    assert board[0]["score"] >= board[1]["score"]
+    assert {entry["platform"] for entry in board} <= {"a", "b"}
+
+def test_replayed_batches_do_not_fill_the_window():
+    scorer = HotScorer(window=4)
+    scorer.score("zhihu", make_items([100, 1000, 10000]))
+    history = [list(batch) for batch in scorer._history["zhihu"]]
+    first = scorer.score("zhihu", make_items([100, 1000, 10000]), update=False)
+    for _ in range(10):
+        replayed = leaderboard({"zhihu": make_items([100, 1000, 10000])}, scorer, replayed={"zhihu"})
+    assert scorer._history["zhihu"] == history
+    assert [entry["score"] for entry in replayed] == pytest.approx(sorted(np.round(first, 4), reverse=True))
+
+def test_new_batches_roll_the_window():
+    scorer = HotScorer(window=2)
+    for _ in range(3):
+        scorer.score("douyin", make_items([10, 20]))
+    assert len(scorer._history["douyin"]) == 2
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import rate_limiter
+from utils.helpers import async_make_request
+from utils.rate_limiter import TokenBucket, get_rate_limiter
+
+def test_bucket_allows_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # 令牌透支后按到达顺序排队
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+def test_limiter_is_shared_per_host():
+    limit = {"rate": 5, "burst": 1}
+    first = get_rate_limiter("https://limiter-test.example/a", limit)
+    assert get_rate_limiter("https://limiter-test.example/b?x=1", limit) is first
+    assert get_rate_limiter("https://other-limiter-test.example/a", limit) is not first
+    assert get_rate_limiter("https://limiter-test.example/a", None) is None
+    assert get_rate_limiter("https://limiter-test.example/a", {"rate": 0}) is None
+
+class _FailingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(500)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def failing_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FailingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+def test_fallback_path_takes_a_token_for_every_attempt(failing_server, monkeypatch):
+    acquired = []
+    bucket = TokenBucket(rate=1000, burst=10)
+    original = bucket.async_acquire
+
+    async def counting_acquire():
+        acquired.append(1)
+        return await original()
+
+    monkeypatch.setattr(bucket, "async_acquire", counting_acquire)
+    monkeypatch.setitem(rate_limiter._buckets, "127.0.0.1", bucket)
+
+    response = asyncio.run(async_make_request(
+        failing_server, headers={"User-Agent": "test"}, retry_times=3, retry_delay=0,
+        rate_limit={"rate": 1000, "burst": 10}, session=None,
+    ))
+    assert response is None
+    assert len(acquired) == 3
@@ -0,0 +1,51 @@
+import pytest
+
+from utils.snapshot_diff import SnapshotDiffer, diff_snapshots, snapshot_index
+
+def _changes(deltas):
+    return {delta["key"]: delta for delta in deltas}
+
+def test_new_dropped_and_updated_entries():
+    previous = {"a": (1, 100, "A"), "b": (2, 90, "B"), "c": (3, 80, "C")}
+    current = {"a": (1, 105, "A"), "c": (2, 80, "C"), "d": (3, 70, "D")}
+    changes = _changes(diff_snapshots(previous, current))
+    # a的热度变化不足阈值，不产生记录
+    assert set(changes) == {"b", "c", "d"}
+    assert changes["d"] == {"change": "new", "key": "d", "title": "D", "rank": 3, "hot_value": 70}
+    assert changes["b"] == {"change": "dropped", "key": "b", "title": "B", "prev_rank": 2, "prev_hot_value": 90}
+    assert changes["c"] == {"change": "updated", "key": "c", "title": "C", "rank": 2, "prev_rank": 3}
+
+@pytest.mark.parametrize("prev_hot, hot, changed", [
+    (100, 119, False),
+    (100, 120, True),
+    ("1.2万", "1.5万", True),
+    ("1.2万", 12000, False),
+    (0, 5, True),
+    ("热", "沸", True),
+])
+def test_hot_value_threshold(prev_hot, hot, changed):
+    deltas = diff_snapshots({"a": (1, prev_hot, "A")}, {"a": (1, hot, "A")}, hot_threshold=0.2)
+    assert bool(deltas) is changed
+    if changed:
+        assert deltas[0]["prev_hot_value"] == prev_hot and "prev_rank" not in deltas[0]
+
+def test_index_keeps_first_occurrence_and_falls_back_to_title():
+    rows = [
+        {"title": "A", "url": "https://a", "rank": 1, "hot_value": 10},
+        {"title": "A2", "url": "https://a", "rank": 5, "hot_value": 1},
+        {"title": "B", "url": "", "rank": 2, "hot_value": 5},
+    ]
+    assert snapshot_index(rows) == {"https://a": (1, 10, "A"), "B": (2, 5, "B")}
+
+def test_differ_compares_with_snapshot_from_before_restart(tmp_path):
+    path = str(tmp_path / "snapshots.json")
+    first = [{"title": "A", "url": "https://a", "rank": 1, "hot_value": 10, "timestamp": "t1"}]
+    second = [{"title": "B", "url": "https://b", "rank": 1, "hot_value": 20, "timestamp": "t2"}]
+
+    # 第一次快照的所有条目都是新上榜
+    assert [delta["change"] for delta in SnapshotDiffer(path).diff("weibo", first)] == ["new"]
+
+    deltas = SnapshotDiffer(path).diff("weibo", second)
+    assert sorted(delta["change"] for delta in deltas) == ["dropped", "new"]
+    assert all(delta["platform"] == "weibo" and delta["timestamp"] == "t2" and delta["prev_timestamp"] == "t1"
+               for delta in deltas)
@@ -0,0 +1,48 @@
+from utils.story_index import MinHasher, StoryIndex, normalize_title, shingles, similarity
+
+def test_titles_are_normalized_before_shingling():
+    assert normalize_title("神舟十九号 发射成功！") == "神舟十九号发射成功"
+    assert shingles("A股!") == {"a股"}
+    assert shingles("") == set()
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher(num_perm=128)
+    close_a = hasher.signature(shingles("神舟十九号载人飞船发射成功"))
+    close_b = hasher.signature(shingles("神舟十九号载人飞船今日发射成功"))
+    unrelated = hasher.signature(shingles("国足世预赛对阵日本"))
+    assert similarity(close_a, close_b) > 0.6
+    assert similarity(close_a, unrelated) < 0.2
+
+def test_near_duplicate_titles_across_platforms_form_one_story():
+    index = StoryIndex()
+    story = index.add("weibo", "神舟十九号载人飞船发射成功", "https://weibo/1", "2024-10-30T04:30:00")
+    assert index.add("baidu", "神舟十九号载人飞船今日发射成功！", "https://baidu/1", "2024-10-30T05:00:00") == story
+    other = index.add("zhihu", "国足世预赛对阵日本", "https://zhihu/1", "2024-10-30T05:00:00")
+    assert other != story
+    assert index.add("weibo", "", "https://weibo/2") is None
+
+    stories = index.stories(min_platforms=2)
+    assert [s["id"] for s in stories] == [story]
+    assert stories[0]["platforms"] == ["baidu", "weibo"]
+    assert stories[0]["first_seen"] == "2024-10-30T04:30:00"
+    assert stories[0]["last_seen"] == "2024-10-30T05:00:00"
+
+def test_same_item_seen_again_only_updates_time():
+    index = StoryIndex()
+    story = index.add("weibo", "神舟十九号载人飞船发射成功", "https://weibo/1", "t1")
+    assert index.add("weibo", "神舟十九号载人飞船发射成功", "https://weibo/1", "t2") == story
+    assert len(index.story(story)["items"]) == 1
+    assert index.story(story)["last_seen"] == "t2"
+
+def test_prune_and_reload(tmp_path):
+    path = str(tmp_path / "stories.json")
+    index = StoryIndex(path)
+    kept = index.add("weibo", "神舟十九号载人飞船发射成功", "https://weibo/1", "2024-10-30")
+    index.add("weibo", "国足世预赛对阵日本", "https://weibo/2", "2024-10-01")
+    assert index.prune("2024-10-15") == 1
+    index.save()
+
+    # 重新加载后由标题重建LSH桶，新标题仍能归入已有故事
+    reloaded = StoryIndex(path)
+    assert reloaded.add("douyin", "神舟十九号载人飞船发射成功了", "https://douyin/1", "2024-10-31") == kept
+    assert reloaded.add("douyin", "国足世预赛对阵日本", "https://douyin/2", "2024-10-31") not in (None, kept)
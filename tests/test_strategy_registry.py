@@ -0,0 +1,41 @@
+from utils.strategy_registry import StrategyRegistry
+
+KEYS = ["api", "json", "selectors"]
+
+def test_untried_strategies_keep_original_order(tmp_path):
+    registry = StrategyRegistry(str(tmp_path / "strategies.json"))
+    assert registry.order("weibo", "web", KEYS) == KEYS
+
+def test_last_winner_is_tried_first_and_failures_sink(tmp_path):
+    registry = StrategyRegistry(str(tmp_path / "strategies.json"))
+    registry.record("weibo", "web", "api", False, 1.0)
+    registry.record("weibo", "web", "selectors", True, 0.2)
+    # 成功的排最前，从未尝试的居中，失败的排最后
+    assert registry.order("weibo", "web", KEYS) == ["selectors", "json", "api"]
+    # 统计按平台和级联分开
+    assert registry.order("baidu", "web", KEYS) == KEYS
+    assert registry.order("weibo", "api", KEYS) == KEYS
+
+def test_equal_scores_prefer_faster_strategy(tmp_path):
+    registry = StrategyRegistry(str(tmp_path / "strategies.json"))
+    registry.record("weibo", "web", "api", True, 2.0)
+    registry.record("weibo", "web", "json", True, 0.5)
+    assert registry.order("weibo", "web", KEYS) == ["json", "api", "selectors"]
+
+def test_score_decays_towards_recent_results(tmp_path):
+    registry = StrategyRegistry(str(tmp_path / "strategies.json"), decay=0.5)
+    registry.record("weibo", "web", "api", True, 0.1)
+    registry.record("weibo", "web", "json", True, 0.1)
+    registry.record("weibo", "web", "api", False, 0.1)
+    assert registry.order("weibo", "web", KEYS) == ["json", "api", "selectors"]
+    registry.record("weibo", "web", "json", False, 0.1)
+    registry.record("weibo", "web", "json", False, 0.1)
+    assert registry.order("weibo", "web", KEYS) == ["api", "selectors", "json"]
+
+def test_order_survives_reload_only_after_save(tmp_path):
+    path = str(tmp_path / "strategies.json")
+    registry = StrategyRegistry(path)
+    registry.record("weibo", "web", "selectors", True, 0.2)
+    assert StrategyRegistry(path).order("weibo", "web", KEYS) == KEYS
+    registry.save()
+    assert StrategyRegistry(path).order("weibo", "web", KEYS)[0] == "selectors"
@@ -0,0 +1,59 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.timeseries import RECORD, TimeSeriesStore, canonical_url, series_key
+
+START = datetime(2024, 10, 1, 8, 0, 0)
+
+def _row(minutes, rank, hot_value, url="https://s.weibo.com/weibo?q=a"):
+    return {"title": "标题", "url": url, "rank": rank, "hot_value": hot_value,
+            "timestamp": (START + timedelta(minutes=minutes)).isoformat()}
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    store.append("weibo", [_row(minutes, minutes // 10 + 1, minutes * 100) for minutes in range(0, 100, 10)])
+    return store
+
+def test_range_query_is_inclusive_and_uses_bisect(store):
+    points = store.query("weibo", _row(0, 0, 0), START + timedelta(minutes=20), (START + timedelta(minutes=50)).isoformat())
+    assert points == [(START + timedelta(minutes=m), m // 10 + 1, float(m * 100)) for m in (20, 30, 40, 50)]
+
+@pytest.mark.parametrize("start, end, count", [
+    (None, None, 10),
+    (START - timedelta(hours=1), None, 10),
+    (START + timedelta(minutes=95), None, 0),
+    (None, START - timedelta(minutes=1), 0),
+    (START + timedelta(minutes=15), START + timedelta(minutes=15), 0),
+])
+def test_range_bounds(store, start, end, count):
+    assert len(store.query("weibo", _row(0, 0, 0), start, end)) == count
+
+def test_url_variants_share_one_series(tmp_path):
+    assert canonical_url(" HTTPS://Example.com/a/#top ") == "https://example.com/a"
+    assert series_key({"url": "https://example.com/a/"}) == series_key({"url": "https://example.com/a#x"})
+    assert series_key({"title": "标题"}) != series_key({"url": "https://example.com/a"})
+
+def test_unparseable_hot_value_and_torn_record(store):
+    store.append("weibo", [_row(100, 1, "沸")])
+    points = store.query("weibo", _row(0, 0, 0))
+    assert points[-1][2] is None
+
+    # 中断写入留下的半条记录在查询时被忽略，下次追加时被截掉
+    path = store.series_path("weibo", series_key(_row(0, 0, 0)))
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+    assert len(store.query("weibo", _row(0, 0, 0))) == 11
+    store.append("weibo", [_row(110, 1, 5)])
+    assert os.path.getsize(path) == 12 * RECORD.size
+    assert store.query("weibo", _row(0, 0, 0))[-1][2] == 5.0
+
+def test_downsample_merges_old_points_by_hour(store):
+    # 8:00-9:30的点中早于cutoff(9:00)的6个点合并为一个小时桶：最好排名、最高热度
+    assert store.downsample(now=START + timedelta(hours=49)) == 1
+    points = store.query("weibo", _row(0, 0, 0))
+    assert points[0] == (START, 1, 5000.0)
+    assert [point[0] for point in points[1:]] == [START + timedelta(minutes=m) for m in range(60, 100, 10)]
+    assert store.downsample(now=START + timedelta(hours=49)) == 0
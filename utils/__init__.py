@@ -1,4 +1,5 @@
 # 工具包初始化
 from utils.helpers import make_request, get_soup, normalize_data
+from utils.hot_item import HotItem, HotBatch, normalize_batch
 
-__all__ = ['make_request', 'get_soup', 'normalize_data'] 
\ No newline at end of file
+__all__ = ['make_request', 'get_soup', 'normalize_data', 'HotItem', 'HotBatch', 'normalize_batch'] 
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+import logging
+from datetime import datetime
+
+from utils.count_parser import parse_count
+
+logger = logging.getLogger("HotNews.Archive")
+
+# 热度列统一为数值（"123万"换算为1230000），原始文本另存一列
+_STRING_FIELDS = ("title", "url", "hot_value_raw", "author", "excerpt", "category", "image_url", "publish_time")
+
+RUN_PREFIX = "run-"
+DAILY_FILE = "daily.parquet"
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [("timestamp", pa.timestamp("us")), ("rank", pa.int32()), ("hot_value", pa.float64())]
+        + [(name, pa.string()) for name in _STRING_FIELDS]
+    )
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("platform", pa.string()), ("date", pa.string())]), flavor="hive")
+
+def partition_dir(base_dir, platform, date_str):
+    """返回分区目录：{base_dir}/platform={platform}/date={YYYYMMDD}"""
+    return os.path.join(base_dir, f"platform={platform}", f"date={date_str}")
+
+def _to_float(value):
+    number = parse_count(value, default=None)
+    return None if number is None else float(number)
+
+def _to_table(rows):
+    """把字典行转换为列式表，每列只构建一次"""
+    import pyarrow as pa
+
+    columns = {
+        "timestamp": [datetime.fromisoformat(row["timestamp"]) for row in rows],
+        "rank": [int(row.get("rank") or 0) for row in rows],
+        "hot_value": [_to_float(row.get("hot_value")) for row in rows],
+        "hot_value_raw": [None if row.get("hot_value") is None else str(row.get("hot_value")) for row in rows],
+    }
+    for name in _STRING_FIELDS:
+        if name not in columns:
+            columns[name] = [row.get(name) for row in rows]
+    return pa.Table.from_pydict(columns, schema=_schema())
+
+def _write_table(table, path):
+    """先写临时文件再替换，读取方不会看到写了一半的文件"""
+    import pyarrow.parquet as pq
+
+    # 以"."开头的临时文件不会被数据集扫描到
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    pq.write_table(table, tmp_path, compression="zstd", use_dictionary=True)
+    os.replace(tmp_path, path)
+
+class ArchiveWriter:
+    """按platform=/date=分区的Parquet归档
+
+    每次运行的一批数据写成分区下的一个run-*.parquet小文件，字符串列使用字典编码；
+    compact_archive定期把已结束日期的小文件合并为一个daily.parquet。
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+
+    def write(self, platform, rows):
+        """写入一批字典行，返回文件路径"""
+        if not rows:
+            return None
+
+        snapshot_time = datetime.fromisoformat(rows[0]["timestamp"])
+        directory = partition_dir(self.base_dir, platform, snapshot_time.strftime("%Y%m%d"))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{RUN_PREFIX}{snapshot_time.strftime('%H%M%S%f')}.parquet")
+        _write_table(_to_table(rows), path)
+        return path
+
+def _date_partitions(base_dir):
+    for platform_name in sorted(os.listdir(base_dir)):
+        platform_dir = os.path.join(base_dir, platform_name)
+        if not platform_name.startswith("platform=") or not os.path.isdir(platform_dir):
+            continue
+        for date_name in sorted(os.listdir(platform_dir)):
+            if date_name.startswith("date="):
+                yield platform_name[len("platform="):], date_name[len("date="):], os.path.join(platform_dir, date_name)
+
+def compact_archive(base_dir, before=None):
+    """把早于before（默认今天）的各日期分区中的run文件合并为daily.parquet，返回合并后的文件列表
+
+    已有的daily.parquet会和新的run文件一起合并，重复执行是安全的。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if not os.path.isdir(base_dir):
+        return []
+
+    cutoff = (before or datetime.now()).strftime("%Y%m%d")
+    compacted = []
+    for platform, date_str, directory in _date_partitions(base_dir):
+        if date_str >= cutoff:
+            continue
+        runs = sorted(name for name in os.listdir(directory) if name.startswith(RUN_PREFIX) and name.endswith(".parquet"))
+        if not runs:
+            continue
+
+        daily_path = os.path.join(directory, DAILY_FILE)
+        paths = [os.path.join(directory, name) for name in runs]
+        if os.path.exists(daily_path):
+            paths.insert(0, daily_path)
+
+        try:
+            table = pa.concat_tables([pq.ParquetFile(path).read() for path in paths])
+            _write_table(table.sort_by([("timestamp", "ascending"), ("rank", "ascending")]), daily_path)
+        except Exception as e:
+            logger.error(f"合并归档分区 {platform}/{date_str} 失败: {str(e)}")
+            continue
+
+        for name in runs:
+            os.remove(os.path.join(directory, name))
+        logger.info(f"归档分区 {platform}/{date_str}: {len(runs)} 个文件合并为 {DAILY_FILE}，共 {table.num_rows} 条")
+        compacted.append(daily_path)
+    return compacted
+
+def read_archive(base_dir, platforms=None, start_date=None, end_date=None, columns=None):
+    """读取归档为pyarrow Table，只读取需要的分区和列
+
+    platform和date作为分区列可直接用于过滤和投影，需要DataFrame时调用.to_pandas()。
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(base_dir, format="parquet", partitioning=_partitioning())
+    conditions = []
+    if platforms:
+        conditions.append(ds.field("platform").isin(list(platforms)))
+    if start_date:
+        conditions.append(ds.field("date") >= start_date.strftime("%Y%m%d"))
+    if end_date:
+        conditions.append(ds.field("date") <= end_date.strftime("%Y%m%d"))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import concurrent.futures
+
+from utils.helpers import aiohttp, async_make_request, async_hedged_request
+
+logger = logging.getLogger("HotNews.AsyncEngine")
+
+class AsyncCrawlEngine:
+    """异步爬取引擎
+
+    所有平台在同一个事件循环中并发执行，HTTP请求由事件循环统一发出，
+    并受同一个全局并发上限约束。爬虫的解析逻辑仍是同步代码，运行在工作线程中，
+    通过 request_threadsafe 把请求提交回事件循环。
+    """
+
+    def __init__(self, max_concurrency=10, max_workers=1):
+        self.max_concurrency = max(1, int(max_concurrency))
+        # 每个平台的解析线程在整个爬取期间阻塞等待请求结果，线程数必须不少于同时运行的平台数
+        self.max_workers = max(1, int(max_workers))
+        self.loop = None
+        self._semaphore = None
+        self._session = None
+        self._executor = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 解析线程不参与并发限流，数量按同时运行的平台数设置，不使用默认的min(32, CPU数+4)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="crawler"
+        )
+        if aiohttp is not None:
+            self._session = aiohttp.ClientSession()
+        else:
+            logger.warning("未安装aiohttp，异步请求将退化为线程池中的同步请求")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+        self.loop = None
+
+    async def request(self, url, **kwargs):
+        """在全局并发上限内异步发送请求
+        
+        并发许可由async_make_request在拿到主机限流令牌后才获取，被限流的主机不会占满全局名额。
+        """
+        return await async_make_request(url, session=self._session, semaphore=self._semaphore, **kwargs)
+
+    def request_threadsafe(self, url, **kwargs):
+        """供工作线程调用：把请求提交到事件循环并等待结果"""
+        future = asyncio.run_coroutine_threadsafe(self.request(url, **kwargs), self.loop)
+        return future.result()
+
+    async def hedged_request(self, urls, hedge_delay=1.0, validate=None, **kwargs):
+        """对候选URL发起对冲请求，返回(url, response)，落后的请求会被取消"""
+        return await async_hedged_request(
+            urls, lambda url: self.request(url, **kwargs), hedge_delay=hedge_delay, validate=validate
+        )
+
+    def hedged_request_threadsafe(self, urls, hedge_delay=1.0, validate=None, **kwargs):
+        """供工作线程调用的对冲请求"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.hedged_request(urls, hedge_delay=hedge_delay, validate=validate, **kwargs), self.loop
+        )
+        return future.result()
+
+    async def run_in_worker(self, func, *args):
+        """在工作线程中执行同步函数（爬虫的解析和保存逻辑）"""
+        return await self.loop.run_in_executor(self._executor, func, *args)
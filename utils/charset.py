@@ -0,0 +1,55 @@
+import re
+import codecs
+
+# 只在响应体的前几KB中查找<meta charset>，声明按规范必须出现在文档开头
+SNIFF_BYTES = 4096
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# 页面声明的编码常比实际使用的字符集小，按浏览器的做法改用超集解码（gb2312/gbk→gb18030等）
+_SUPERSETS = {"gb2312": "gb18030", "gbk": "gb18030", "ascii": "utf-8", "iso8859-1": "cp1252"}
+
+def normalize_encoding(name):
+    """把编码名称规范化为Python编解码器名称，无法识别时返回None"""
+    if not name:
+        return None
+    if isinstance(name, bytes):
+        name = name.decode("ascii", errors="ignore")
+    try:
+        codec = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    return _SUPERSETS.get(codec, codec)
+
+def header_encoding(headers):
+    """Content-Type头中显式声明的编码，没有声明时返回None
+
+    不使用requests按内容类型推断的默认值（text/*为ISO-8859-1），那不是服务器的声明。
+    """
+    match = _HEADER_CHARSET.search((headers or {}).get("Content-Type") or "")
+    return normalize_encoding(match.group(1)) if match else None
+
+def sniff_encoding(content, limit=SNIFF_BYTES):
+    """从响应体开头的BOM或<meta charset>/<meta http-equiv>声明判断编码，找不到时返回None"""
+    head = content[:limit]
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = _META_CHARSET.search(head)
+    return normalize_encoding(match.group(1)) if match else None
+
+def resolve_encoding(content, headers=None, declared=None):
+    """确定响应体的编码，不对整个响应体做字符集探测
+
+    依次使用：响应头的charset、平台配置声明的编码、响应体开头的BOM或meta声明，都没有时按utf-8处理。
+    """
+    return (header_encoding(headers)
+            or normalize_encoding(declared)
+            or sniff_encoding(content or b"")
+            or "utf-8")
@@ -0,0 +1,132 @@
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+
+from utils.state_store import JsonStateStore
+
+logger = logging.getLogger("HotNews.CircuitBreaker")
+
+class CircuitBreaker:
+    """单个端点的熔断器
+
+    连续失败达到阈值后打开，打开期间直接跳过该端点；超过恢复时间后进入半开状态，
+    只放行一个探测请求，探测成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=300, state=CLOSED, failures=0, opened_at=0.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = state
+        self.failures = failures
+        self.opened_at = opened_at
+        self._probe_started = 0.0
+
+    def allow_request(self):
+        """判断当前是否允许请求该端点"""
+        now = time.time()
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.recovery_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = now
+            return True
+
+        # 半开状态只放行一个探测请求，探测长时间没有结果时允许重新探测
+        if now - self._probe_started >= self.recovery_timeout:
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        """记录成功，返回状态是否发生变化"""
+        changed = self.state != self.CLOSED
+        self.state = self.CLOSED
+        self.failures = 0
+        return changed
+
+    def record_failure(self):
+        """记录失败，返回状态是否发生变化"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.time()
+            return True
+        return False
+
+    def to_dict(self):
+        # 半开状态持久化为打开，重启后重新等待探测时机
+        state = self.OPEN if self.state == self.HALF_OPEN else self.state
+        return {"state": state, "failures": self.failures, "opened_at": self.opened_at}
+
+class CircuitBreakerRegistry:
+    """按端点（协议+主机+路径）管理熔断器，状态变化时持久化到磁盘"""
+
+    def __init__(self, state_path, failure_threshold=5, recovery_timeout=300):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._store = JsonStateStore(state_path)
+        self._lock = threading.Lock()
+        self._breakers = {}
+        for endpoint in self._store.keys():
+            saved = self._store.get(endpoint) or {}
+            self._breakers[endpoint] = CircuitBreaker(
+                failure_threshold, recovery_timeout,
+                state=saved.get("state", CircuitBreaker.CLOSED),
+                failures=saved.get("failures", 0),
+                opened_at=saved.get("opened_at", 0.0),
+            )
+
+    @staticmethod
+    def endpoint(url):
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+    def _get(self, url):
+        endpoint = self.endpoint(url)
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            self._breakers[endpoint] = breaker
+        return endpoint, breaker
+
+    def allow_request(self, url):
+        with self._lock:
+            _, breaker = self._get(url)
+            return breaker.allow_request()
+
+    def record_success(self, url):
+        with self._lock:
+            endpoint, breaker = self._get(url)
+            if breaker.record_success():
+                logger.info(f"端点 {endpoint} 已恢复，熔断器关闭")
+                self._store.set(endpoint, breaker.to_dict())
+
+    def record_failure(self, url):
+        with self._lock:
+            endpoint, breaker = self._get(url)
+            if breaker.record_failure():
+                logger.warning(f"端点 {endpoint} 连续失败 {breaker.failures} 次，熔断器打开 {breaker.recovery_timeout} 秒")
+                self._store.set(endpoint, breaker.to_dict())
+
+    def stats(self):
+        """返回所有端点的熔断状态"""
+        with self._lock:
+            return {endpoint: breaker.to_dict() for endpoint, breaker in self._breakers.items()}
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_breaker_registry(state_path, failure_threshold=5, recovery_timeout=300):
+    """获取指定状态文件的共享熔断器注册表"""
+    with _registries_lock:
+        if state_path not in _registries:
+            _registries[state_path] = CircuitBreakerRegistry(state_path, failure_threshold, recovery_timeout)
+        return _registries[state_path]
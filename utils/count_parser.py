@@ -0,0 +1,78 @@
+import re
+
+# 数字（可带千位分隔符和小数）后面紧跟的可选单位，字母单位后面不能再接字母（避免"5 Weibo"）
+_COUNT = re.compile(r"(\d+(?:,\d{3})*(?:\.\d+)?|\.\d+)\s*(万|萬|亿|億|千|[wWkK](?![A-Za-z]))?")
+_search = _COUNT.search
+
+# 单位倍数表，新增单位只需在这里和上面的正则里加一项
+UNITS = {
+    None: 1,
+    "千": 1000,
+    "k": 1000,
+    "K": 1000,
+    "万": 10000,
+    "萬": 10000,
+    "w": 10000,
+    "W": 10000,
+    "亿": 100000000,
+    "億": 100000000,
+}
+
+def parse_count(text, default=0):
+    """把计数文本转换为整数，如"1.2万"→12000、"3亿"→300000000、"12,345"→12345
+
+    文本中第一个数字及其后紧跟的单位有效，前后的文字（"热度"、"播放"等）会被忽略。
+    int/float原样返回，无法识别时返回default。
+    """
+    if not isinstance(text, str):
+        if isinstance(text, (int, float)) and not isinstance(text, bool):
+            return text
+        return default
+    # isdigit对上标²等Unicode数字也为True，但int()不接受，只有ASCII数字走快速路径
+    if text.isascii() and text.isdigit():
+        return int(text)
+
+    match = _search(text)
+    if match is None:
+        return default
+    number, unit = match.groups()
+    if "," in number:
+        number = number.replace(",", "")
+    if unit is None and "." not in number:
+        return int(number)
+    # 先乘再取整，避免0.29*10000这类浮点误差被截断；round()不带位数时直接返回int
+    return round(float(number) * UNITS[unit])
+
+def parse_counts(texts, default=0):
+    """批量转换计数文本，返回与输入顺序一致的整数列表，结果与逐条调用parse_count相同
+
+    整个批次在一个循环内完成，不再为每条文本调用parse_count：已是int的值和纯ASCII数字直接返回，
+    其余文本只做一次预编译正则搜索，正则、单位表等都是局部变量。
+    """
+    search = _search
+    units = UNITS
+    results = []
+    append = results.append
+    for text in texts:
+        cls = text.__class__
+        if cls is int:
+            append(text)
+            continue
+        if cls is not str:
+            append(parse_count(text, default))
+            continue
+        if text.isdigit() and text.isascii():
+            append(int(text))
+            continue
+        match = search(text)
+        if match is None:
+            append(default)
+            continue
+        number, unit = match.groups()
+        if "," in number:
+            number = number.replace(",", "")
+        if unit is None and "." not in number:
+            append(int(number))
+        else:
+            append(round(float(number) * units[unit]))
+    return results
@@ -0,0 +1,162 @@
+import os
+import sqlite3
+import threading
+
+from utils.hot_item import OPTIONAL_FIELDS, item_identity
+
+# 表中除主键外保存的字段
+_COLUMNS = ("title", "url", "hot_value", "rank") + OPTIONAL_FIELDS
+
+def _record(platform, row):
+    """把一条字典行转换为按主键(平台, 条目标识, 快照时间)定位的记录"""
+    return (platform, item_identity(row), row.get("timestamp")) + tuple(row.get(key) for key in _COLUMNS)
+
+class SqliteStore:
+    """SQLite热点库：WAL模式，每次爬取的一批数据在一个事务中用executemany批量upsert
+
+    主键为(平台, 条目标识, 快照时间)，同一批次重复写入只会覆盖而不会产生重复行。
+    (平台, 时间)和标题上建有索引，按平台取某段时间的快照或查询标题首次出现时间都走索引。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        columns = ("platform", "item_key", "snapshot_time") + _COLUMNS
+        updates = ", ".join(f"{key}=excluded.{key}" for key in _COLUMNS)
+        self._upsert_sql = (
+            f"INSERT INTO hot_items ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(platform, item_key, snapshot_time) DO UPDATE SET {updates}"
+        )
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hot_items ("
+                "platform TEXT NOT NULL, "
+                "item_key TEXT NOT NULL, "
+                "snapshot_time TEXT NOT NULL, "
+                "title TEXT NOT NULL, "
+                "url TEXT, "
+                "hot_value, "
+                "rank INTEGER, "
+                + ", ".join(f"{key} TEXT" for key in OPTIONAL_FIELDS) + ", "
+                "PRIMARY KEY (platform, item_key, snapshot_time))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_hot_items_platform_time ON hot_items (platform, snapshot_time)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_hot_items_title ON hot_items (title, snapshot_time)")
+
+    def write_batch(self, platform, rows):
+        """在一个事务中upsert一个平台的一批数据，返回写入条数"""
+        records = [_record(platform, row) for row in rows]
+        if not records:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(self._upsert_sql, records)
+        return len(records)
+
+    def first_seen(self, title, platform=None):
+        """返回标题首次出现的快照时间，没有记录时返回None"""
+        sql = "SELECT MIN(snapshot_time) FROM hot_items WHERE title = ?"
+        params = [title]
+        if platform:
+            sql += " AND platform = ?"
+            params.append(platform)
+
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def snapshot_times(self, platform, start=None, end=None):
+        """返回平台在时间范围内的所有快照时间（ISO格式字符串，闭区间）"""
+        sql = "SELECT DISTINCT snapshot_time FROM hot_items WHERE platform = ?"
+        params = [platform]
+        if start:
+            sql += " AND snapshot_time >= ?"
+            params.append(start)
+        if end:
+            sql += " AND snapshot_time <= ?"
+            params.append(end)
+        sql += " ORDER BY snapshot_time"
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class MongoStore:
+    """MongoDB热点库，接口与SqliteStore相同
+
+    每批数据用一次bulk_write批量upsert，唯一索引与SQLite的主键一致。
+    可传入已有的collection（例如本地的mongomock替身）代替连接真实服务。
+    """
+
+    def __init__(self, uri=None, database="hotnews", collection=None):
+        self._client = None
+        if collection is None:
+            from pymongo import MongoClient
+
+            self._client = MongoClient(uri)
+            collection = self._client[database]["hot_items"]
+
+        self.collection = collection
+        self.collection.create_index([("platform", 1), ("item_key", 1), ("snapshot_time", 1)], unique=True)
+        self.collection.create_index([("platform", 1), ("snapshot_time", 1)])
+        self.collection.create_index([("title", 1), ("snapshot_time", 1)])
+
+    def write_batch(self, platform, rows):
+        """用一次bulk_write upsert一个平台的一批数据，返回写入条数"""
+        from pymongo import UpdateOne
+
+        operations = []
+        for row in rows:
+            key = {"platform": platform, "item_key": item_identity(row), "snapshot_time": row.get("timestamp")}
+            fields = {name: row.get(name) for name in _COLUMNS if row.get(name) is not None}
+            operations.append(UpdateOne(key, {"$set": fields}, upsert=True))
+
+        if not operations:
+            return 0
+        self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def first_seen(self, title, platform=None):
+        """返回标题首次出现的快照时间，没有记录时返回None"""
+        query = {"title": title}
+        if platform:
+            query["platform"] = platform
+        doc = self.collection.find_one(query, sort=[("snapshot_time", 1)], projection={"snapshot_time": 1})
+        return doc["snapshot_time"] if doc else None
+
+    def snapshot_times(self, platform, start=None, end=None):
+        """返回平台在时间范围内的所有快照时间（闭区间）"""
+        query = {"platform": platform}
+        time_range = {}
+        if start:
+            time_range["$gte"] = start
+        if end:
+            time_range["$lte"] = end
+        if time_range:
+            query["snapshot_time"] = time_range
+        return sorted(self.collection.distinct("snapshot_time", query))
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+
+def open_store(backend="sqlite", path=None, uri=None, database="hotnews"):
+    """按后端名称打开热点库"""
+    backend = (backend or "sqlite").lower()
+    if backend == "sqlite":
+        return SqliteStore(path)
+    if backend in ("mongo", "mongodb"):
+        return MongoStore(uri, database)
+    raise ValueError(f"未知的数据库后端: {backend}")
@@ -0,0 +1,72 @@
+import json
+import hashlib
+import threading
+
+from utils.hot_item import to_rows
+from utils.state_store import JsonStateStore
+
+class ContentUnchanged(Exception):
+    """本次抓取的内容与上次写入的相同，跳过后续的解析或写入
+
+    只在BaseCrawler内部抛出和捕获，不经过爬虫代码：响应体未变化时BaseCrawler.make_request
+    返回None并记下标记，爬虫返回后再据此抛出，爬虫中宽泛的except Exception不需要特殊处理。
+    """
+
+    def __init__(self, platform, stage):
+        super().__init__(f"{platform} 内容未变化（{stage}）")
+        self.platform = platform
+        self.stage = stage
+
+def body_fingerprint(body):
+    """原始响应体的指纹"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.blake2b(body or b"", digest_size=16).hexdigest()
+
+def ranking_fingerprint(items):
+    """规范化后榜单的指纹，包含除时间戳以外的所有字段
+
+    只有时间戳不同的两次抓取指纹相同；排名、标题不变而热度变化时指纹不同，照常写入。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row in to_rows(items):
+        fields = {key: value for key, value in row.items() if key != "timestamp"}
+        digest.update(json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+class FingerprintStore:
+    """记录各平台上次成功写入时的响应体和榜单指纹
+
+    响应体指纹只记录产出数据的那一个URL（爬虫从第一个可用的源返回，即最后请求的URL），
+    同一URL再次返回相同的响应体时可以直接跳过解析。
+    """
+
+    def __init__(self, state_path):
+        self._store = JsonStateStore(state_path)
+
+    def body_unchanged(self, platform, url, fingerprint):
+        entry = self._store.get(platform, {})
+        return entry.get("url") == url and entry.get("body") == fingerprint
+
+    def ranking_unchanged(self, platform, fingerprint):
+        return self._store.get(platform, {}).get("ranking") == fingerprint
+
+    def update(self, platform, url=None, body=None, ranking=None):
+        """记录一次成功运行的指纹并保存"""
+        entry = dict(self._store.get(platform, {}))
+        if url and body:
+            entry["url"], entry["body"] = url, body
+        if ranking:
+            entry["ranking"] = ranking
+        self._store.set(platform, entry)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_fingerprint_store(state_path):
+    """获取指定状态文件的共享指纹存储"""
+    with _stores_lock:
+        if state_path not in _stores:
+            _stores[state_path] = FingerprintStore(state_path)
+        return _stores[state_path]
@@ -1,11 +1,30 @@
-import random
+import re
 import time
+import json
+import random
+import asyncio
 import logging
+import functools
+import threading
+import contextlib
+import concurrent.futures
 import requests
 from fake_useragent import UserAgent
-from bs4 import BeautifulSoup
-import os
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 from datetime import datetime
+from utils.http_cache import HttpCache
+from utils.proxy_pool import get_proxy_pool
+from utils.rate_limiter import get_rate_limiter
+from utils.hot_item import normalize_batch
+from utils.charset import resolve_encoding
+
+try:
+    import aiohttp
+except ImportError:  # 未安装aiohttp时异步请求退化为线程池执行
+    aiohttp = None
+
+# 异步请求中需要重试的网络错误，没有aiohttp时线程池中的requests请求只会抛出后两种
+_ASYNC_RETRY_ERRORS = (asyncio.TimeoutError, requests.exceptions.RequestException) + ((aiohttp.ClientError,) if aiohttp else ())
 
 # 设置日志
 logging.basicConfig(
@@ -30,46 +49,81 @@ def get_random_user_agent():
         return "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 def get_random_proxy(proxy_list_path):
-    """从代理列表中随机选择一个代理"""
+    """从代理池中按健康分数选择一个代理"""
     try:
-        if not os.path.exists(proxy_list_path):
-            logger.warning(f"代理文件 {proxy_list_path} 不存在")
-            return None
-            
-        with open(proxy_list_path, 'r') as f:
-            proxies = [line.strip() for line in f if line.strip()]
-            
-        if not proxies:
-            logger.warning("代理列表为空")
-            return None
-            
-        return random.choice(proxies)
+        return get_proxy_pool(proxy_list_path).choose()
     except Exception as e:
         logger.error(f"获取代理时出错: {str(e)}")
         return None
 
+def backoff_delay(attempt, retry_delay, max_retry_delay):
+    """带抖动的指数退避：在[0, min(上限, 基础延迟*2^attempt)]之间随机取值"""
+    return random.uniform(0, min(max_retry_delay, retry_delay * (2 ** attempt)))
+
+def _report_proxy(proxy_list_path, proxy, success, start_time):
+    """把使用代理的请求结果反馈给代理池"""
+    if proxy:
+        get_proxy_pool(proxy_list_path).report(proxy, success, time.time() - start_time)
+
+def _cached_response(entry, url):
+    """把缓存条目还原为requests响应对象"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = HttpCache.load_body(entry)
+    response.headers = requests.structures.CaseInsensitiveDict(entry.get("headers", {}))
+    response.url = url
+    response.encoding = entry.get("encoding")
+    response.from_cache = True
+    return response
+
 def make_request(url, method="GET", params=None, headers=None, proxies=None, 
-                timeout=10, retry_times=3, retry_delay=2, use_proxy=False, proxy_list_path=None):
-    """发送HTTP请求，支持重试和代理"""
+                timeout=10, retry_times=3, retry_delay=2, use_proxy=False, proxy_list_path=None,
+                cache=None, cookies=None, rate_limit=None, breakers=None, max_retry_delay=30, cancel=None):
+    """发送HTTP请求，支持重试、代理、按主机限流、熔断和条件请求缓存
+    
+    传入cache时会带上缓存的ETag/Last-Modified，服务器返回304时返回缓存的响应体，
+    此时响应对象的from_cache为True，调用方可据此跳过解析。
+    rate_limit为{"rate": 每秒请求数, "burst": 突发数}，只在该主机的请求预算用完时才等待。
+    传入熔断器注册表breakers时，熔断中的端点直接返回None；重试间隔为带抖动的指数退避。
+    cancel为threading.Event，被设置后不再开始新的尝试（退避等待也会提前结束），返回None。
+    """
     if headers is None:
         headers = {'User-Agent': get_random_user_agent()}
     
+    cache_entry = cache.lookup(method, url, params, headers) if cache else None
+    request_headers = headers
+    if cache_entry:
+        request_headers = dict(headers)
+        request_headers.update(HttpCache.conditional_headers(cache_entry))
+    
+    limiter = get_rate_limiter(url, rate_limit)
+    pooled_proxy = None
     for attempt in range(retry_times):
+        if cancel is not None and cancel.is_set():
+            logger.info(f"请求已取消: {url}")
+            return None
+        if breakers and not breakers.allow_request(url):
+            logger.warning(f"端点熔断中，跳过请求: {url}")
+            return None
+        if limiter:
+            limiter.acquire()
+        start_time = time.time()
         try:
-            # 如果启用代理且没有传入代理
+            # 如果启用代理且没有传入代理，从代理池中选择
             if use_proxy and proxies is None and proxy_list_path:
-                proxy = get_random_proxy(proxy_list_path)
-                if proxy:
+                pooled_proxy = get_random_proxy(proxy_list_path)
+                if pooled_proxy:
                     proxies = {
-                        'http': f'http://{proxy}',
-                        'https': f'http://{proxy}'
+                        'http': f'http://{pooled_proxy}',
+                        'https': f'http://{pooled_proxy}'
                     }
             
             if method.upper() == "GET":
                 response = session.get(
                     url, 
                     params=params, 
-                    headers=headers, 
+                    headers=request_headers, 
+                    cookies=cookies, 
                     proxies=proxies, 
                     timeout=timeout
                 )
@@ -77,20 +131,42 @@ def make_request(url, method="GET", params=None, headers=None, proxies=None,
                 response = session.post(
                     url, 
                     json=params, 
-                    headers=headers, 
+                    headers=request_headers, 
+                    cookies=cookies, 
                     proxies=proxies, 
                     timeout=timeout
                 )
             
+            # 内容未变化，使用缓存的响应体
+            if cache_entry and response.status_code == 304:
+                logger.info(f"内容未变化，使用缓存: {url}")
+                _report_proxy(proxy_list_path, pooled_proxy, True, start_time)
+                if breakers:
+                    breakers.record_success(url)
+                return _cached_response(cache_entry, response.url)
+            
             # 检查是否成功
             response.raise_for_status()
+            _report_proxy(proxy_list_path, pooled_proxy, True, start_time)
+            if breakers:
+                breakers.record_success(url)
+            response.from_cache = False
+            if cache:
+                cache.store(method, url, params, headers, response.headers, response.content, response.encoding)
             return response
             
         except requests.exceptions.RequestException as e:
             logger.warning(f"请求失败 (尝试 {attempt+1}/{retry_times}): {str(e)}")
+            _report_proxy(proxy_list_path, pooled_proxy, False, start_time)
+            if breakers:
+                breakers.record_failure(url)
             
             if attempt < retry_times - 1:
-                time.sleep(retry_delay)
+                delay = backoff_delay(attempt, retry_delay, max_retry_delay)
+                if cancel is not None:
+                    cancel.wait(delay)
+                else:
+                    time.sleep(delay)
                 # 如果启用代理，尝试更换代理
                 if use_proxy and proxy_list_path:
                     proxies = None  # 重置代理，下次循环会重新获取
@@ -98,33 +174,295 @@ def make_request(url, method="GET", params=None, headers=None, proxies=None,
                 logger.error(f"请求最终失败: {url}")
                 return None
 
-def get_soup(url, **kwargs):
+class AsyncResponse:
+    """异步请求的响应对象，接口与requests.Response保持一致，便于爬虫复用解析代码"""
+    
+    def __init__(self, url, status_code, headers, content, encoding=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+    
+    @property
+    def ok(self):
+        return self.status_code < 400
+    
+    def __bool__(self):
+        return self.ok
+    
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+    
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+    
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+async def _async_fetch(session, url, method, params, headers, proxy, timeout, cookies=None):
+    """使用aiohttp发送一次请求并读取完整响应体"""
+    request_kwargs = {"headers": headers, "cookies": cookies, "proxy": proxy, "timeout": aiohttp.ClientTimeout(total=timeout)}
+    if method.upper() == "POST":
+        request_kwargs["json"] = params
+    else:
+        request_kwargs["params"] = params
+    
+    async with session.request(method.upper(), url, **request_kwargs) as resp:
+        content = await resp.read()
+        return AsyncResponse(str(resp.url), resp.status, resp.headers, content, resp.charset)
+
+def _sync_fetch(url, method, params, headers, proxy, timeout, cookies=None):
+    """没有aiohttp会话时在线程池中用requests发送一次请求，不重试也不限流，由调用方控制"""
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+    if method.upper() == "POST":
+        response = session.post(url, json=params, headers=headers, cookies=cookies, proxies=proxies, timeout=timeout)
+    else:
+        response = session.get(url, params=params, headers=headers, cookies=cookies, proxies=proxies, timeout=timeout)
+    return AsyncResponse(response.url, response.status_code, response.headers, response.content, response.encoding)
+
+async def async_make_request(url, method="GET", params=None, headers=None, proxies=None,
+                             timeout=10, retry_times=3, retry_delay=2, use_proxy=False, proxy_list_path=None,
+                             cache=None, cookies=None, rate_limit=None, breakers=None, max_retry_delay=30,
+                             session=None, semaphore=None):
+    """异步发送HTTP请求，支持重试、代理和条件请求缓存，失败时返回None
+    
+    缓存的读写是磁盘操作，在线程池中执行，不阻塞事件循环。
+    传入semaphore（全局并发上限）时，只在拿到主机的限流令牌之后、真正发出请求时才占用许可，
+    被限流的主机等待令牌和重试退避时不会占住其他平台的并发名额。
+    没有aiohttp会话时每次尝试改为在线程池中执行一次同步请求，限流、熔断和退避与aiohttp相同，
+    每次尝试都先获取限流令牌。
+    """
+    loop = asyncio.get_running_loop()
+    permit = semaphore if semaphore is not None else contextlib.nullcontext()
+    limiter = get_rate_limiter(url, rate_limit)
+    if aiohttp is None:
+        session = None
+    
+    if headers is None:
+        headers = {'User-Agent': get_random_user_agent()}
+    
+    cache_entry = await loop.run_in_executor(None, cache.lookup, method, url, params, headers) if cache else None
+    request_headers = headers
+    if cache_entry:
+        request_headers = dict(headers)
+        request_headers.update(HttpCache.conditional_headers(cache_entry))
+    
+    proxy = proxies.get("https") or proxies.get("http") if proxies else None
+    
+    pooled_proxy = None
+    for attempt in range(retry_times):
+        if breakers and not breakers.allow_request(url):
+            logger.warning(f"端点熔断中，跳过请求: {url}")
+            return None
+        if limiter:
+            await limiter.async_acquire()
+        start_time = time.time()
+        try:
+            # 如果启用代理且没有传入代理，从代理池中选择
+            if use_proxy and proxy is None and proxy_list_path:
+                pooled_proxy = get_random_proxy(proxy_list_path)
+                if pooled_proxy:
+                    proxy = f'http://{pooled_proxy}'
+            
+            async with permit:
+                if session is not None:
+                    response = await _async_fetch(session, url, method, params, request_headers, proxy, timeout, cookies)
+                else:
+                    response = await loop.run_in_executor(None, functools.partial(
+                        _sync_fetch, url, method, params, request_headers, proxy, timeout, cookies
+                    ))
+            
+            # 内容未变化，使用缓存的响应体
+            if cache_entry and response.status_code == 304:
+                logger.info(f"内容未变化，使用缓存: {url}")
+                _report_proxy(proxy_list_path, pooled_proxy, True, start_time)
+                if breakers:
+                    breakers.record_success(url)
+                body = await loop.run_in_executor(None, HttpCache.load_body, cache_entry)
+                return AsyncResponse(response.url, 200, cache_entry.get("headers", {}),
+                                     body, cache_entry.get("encoding"), from_cache=True)
+            
+            # 检查是否成功
+            response.raise_for_status()
+            _report_proxy(proxy_list_path, pooled_proxy, True, start_time)
+            if breakers:
+                breakers.record_success(url)
+            if cache:
+                await loop.run_in_executor(None, functools.partial(
+                    cache.store, method, url, params, headers, response.headers, response.content, response.encoding
+                ))
+            return response
+            
+        except _ASYNC_RETRY_ERRORS as e:
+            logger.warning(f"请求失败 (尝试 {attempt+1}/{retry_times}): {str(e)}")
+            _report_proxy(proxy_list_path, pooled_proxy, False, start_time)
+            if breakers:
+                breakers.record_failure(url)
+            
+            if attempt < retry_times - 1:
+                await asyncio.sleep(backoff_delay(attempt, retry_delay, max_retry_delay))
+                # 如果启用代理，尝试更换代理
+                if use_proxy and proxy_list_path:
+                    proxy = None  # 重置代理，下次循环会重新获取
+            else:
+                logger.error(f"请求最终失败: {url}")
+                return None
+
+def _is_valid_response(response, validate):
+    """判断对冲请求的响应是否可用，校验函数抛出异常视为不可用"""
+    if not response:
+        return False
+    if validate is None:
+        return True
+    try:
+        return bool(validate(response))
+    except Exception as e:
+        logger.warning(f"响应校验失败 ({response.url}): {str(e)}")
+        return False
+
+def make_hedged_request(urls, hedge_delay=1.0, validate=None, **kwargs):
+    """对候选URL发起对冲请求，返回(url, response)
+    
+    先请求第一个URL，超过hedge_delay秒仍未得到可用响应时启动下一个候选，
+    任一候选失败时立即启动下一个。取第一个通过校验的响应，其余请求被放弃。
+    hedge_delay为None时退化为逐个尝试。全部失败时返回(None, None)。
+    """
+    candidates = list(dict.fromkeys(url for url in urls if url))
+    if not candidates:
+        return None, None
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="hedge")
+    cancel = threading.Event()
+    pending = {}
+    next_index = 0
+    
+    def launch():
+        nonlocal next_index
+        url = candidates[next_index]
+        next_index += 1
+        logger.info(f"对冲请求: 启动 {url}")
+        pending[executor.submit(make_request, url, cancel=cancel, **kwargs)] = url
+    
+    try:
+        launch()
+        while pending:
+            timeout = hedge_delay if next_index < len(candidates) else None
+            done, _ = concurrent.futures.wait(pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    logger.warning(f"对冲请求失败 ({url}): {str(e)}")
+                    response = None
+                if _is_valid_response(response, validate):
+                    return url, response
+            
+            # 超时未返回或已有候选失败，启动下一个候选
+            if next_index < len(candidates):
+                launch()
+        
+        return None, None
+    finally:
+        # 线程中进行中的请求无法中断：取消尚未开始的任务，已开始的在当前这次尝试结束后停止，
+        # 不再重试、退避，也不再占用限流令牌和影响熔断状态
+        cancel.set()
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+async def async_hedged_request(urls, fetch, hedge_delay=1.0, validate=None):
+    """异步对冲请求，fetch(url)为返回响应的协程函数，落后的请求会被取消"""
+    candidates = list(dict.fromkeys(url for url in urls if url))
+    pending = {}
+    next_index = 0
+    
+    def launch():
+        nonlocal next_index
+        url = candidates[next_index]
+        next_index += 1
+        logger.info(f"对冲请求: 启动 {url}")
+        pending[asyncio.ensure_future(fetch(url))] = url
+    
+    if not candidates:
+        return None, None
+    
+    try:
+        launch()
+        while pending:
+            timeout = hedge_delay if next_index < len(candidates) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            
+            for task in done:
+                url = pending.pop(task)
+                try:
+                    response = task.result()
+                except Exception as e:
+                    logger.warning(f"对冲请求失败 ({url}): {str(e)}")
+                    response = None
+                if _is_valid_response(response, validate):
+                    return url, response
+            
+            # 超时未返回或已有候选失败，启动下一个候选
+            if next_index < len(candidates):
+                launch()
+        
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+
+_missing_parsers = set()
+
+def parse_html(html, parser="lxml", parse_only=None):
+    """把HTML解析为BeautifulSoup对象，首选后端（默认lxml）未安装时退回html.parser
+    
+    parse_only为SoupStrainer时只构建匹配元素的子树。
+    """
+    if parser not in _missing_parsers:
+        try:
+            return BeautifulSoup(html, parser, parse_only=parse_only)
+        except FeatureNotFound:
+            _missing_parsers.add(parser)
+            logger.warning(f"HTML解析后端 {parser} 不可用，改用html.parser")
+    return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+def build_scope_strainer(scope):
+    """根据平台的parse_scope声明构建SoupStrainer，只保留热榜容器所在的子树
+    
+    scope为{"classes": [类名, ...]}（以*结尾表示类名前缀）或{"tags": [标签名, ...]}。
+    """
+    if not scope:
+        return None
+    
+    classes = scope.get("classes")
+    if classes:
+        patterns = [re.escape(name[:-1]) + r"\S*" if name.endswith("*") else re.escape(name) for name in classes]
+        # class属性可能是以空格分隔的多个类名，按单词边界匹配其中任意一个
+        return SoupStrainer(class_=re.compile(rf"(?:^|\s)(?:{'|'.join(patterns)})(?:\s|$)"))
+    
+    tags = scope.get("tags")
+    if tags:
+        return SoupStrainer(name=list(tags))
+    return None
+
+def get_soup(url, parser="lxml", **kwargs):
     """获取页面并解析为BeautifulSoup对象"""
     response = make_request(url, **kwargs)
     if response is None:
         return None
     
-    return BeautifulSoup(response.text, 'lxml')
+    response.encoding = resolve_encoding(response.content, response.headers)
+    return parse_html(response.text, parser)
 
 def normalize_data(items, platform):
-    """将不同平台的数据规范化为统一格式"""
-    normalized = []
-    
-    for item in items:
-        normalized_item = {
-            "platform": platform,
-            "timestamp": datetime.now().isoformat(),
-            "title": item.get("title", ""),
-            "url": item.get("url", ""),
-            "hot_value": item.get("hot_value", 0),
-            "rank": item.get("rank", 0),
-        }
-        
-        # 添加可能存在的其他字段
-        for key in ["author", "excerpt", "category", "image_url"]:
-            if key in item:
-                normalized_item[key] = item[key]
-                
-        normalized.append(normalized_item)
-        
-    return normalized 
\ No newline at end of file
+    """将不同平台的数据规范化为统一格式的字典列表
+    
+    整批共享一个时间戳，需要紧凑表示时直接使用normalize_batch返回的HotBatch。
+    """
+    return normalize_batch(items, platform).to_dicts() 
\ No newline at end of file
@@ -0,0 +1,164 @@
+import sys
+import json
+from itertools import islice
+from datetime import datetime
+
+# 规范化时保留的可选字段
+OPTIONAL_FIELDS = ("author", "excerpt", "category", "image_url", "publish_time")
+
+_REQUIRED_FIELDS = ("platform", "timestamp", "title", "url", "hot_value", "rank")
+_FIELDS = frozenset(_REQUIRED_FIELDS + OPTIONAL_FIELDS)
+
+# 规范化数据的完整字段及其顺序，表格类输出以此为表头
+ROW_FIELDS = _REQUIRED_FIELDS + OPTIONAL_FIELDS
+
+class HotItem:
+    """一条规范化后的热点数据
+
+    用__slots__代替字典保存字段，platform和timestamp与所在批次共享同一个字符串对象。
+    可选字段不存在时为None，转换为字典时省略。支持item["title"]和item.get()读取，
+    兼容原来按字典访问的代码。
+    """
+
+    __slots__ = _REQUIRED_FIELDS + OPTIONAL_FIELDS
+
+    def __init__(self, platform, timestamp, title="", url="", hot_value=0, rank=0,
+                 author=None, excerpt=None, category=None, image_url=None, publish_time=None):
+        self.platform = platform
+        self.timestamp = timestamp
+        self.title = title
+        self.url = url
+        self.hot_value = hot_value
+        self.rank = rank
+        self.author = author
+        self.excerpt = excerpt
+        self.category = category
+        self.image_url = image_url
+        self.publish_time = publish_time
+
+    def to_dict(self):
+        """转换为与原normalize_data相同字段顺序的字典"""
+        row = {
+            "platform": self.platform,
+            "timestamp": self.timestamp,
+            "title": self.title,
+            "url": self.url,
+            "hot_value": self.hot_value,
+            "rank": self.rank,
+        }
+        for key in OPTIONAL_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                row[key] = value
+        return row
+
+    def to_json(self):
+        """转换为一行JSON文本"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def get(self, key, default=None):
+        if key not in _FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in _FIELDS or getattr(self, key) is None:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in _FIELDS and getattr(self, key) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, HotItem):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self):
+        return f"HotItem(platform={self.platform!r}, rank={self.rank!r}, title={self.title!r})"
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class HotBatch:
+    """同一平台一次爬取得到的一批热点数据
+
+    整批只生成一个时间戳，平台名和分类等重复出现的字符串经过intern，
+    在内存中保留大量历史快照时只占一份。支持len、迭代、下标和切片，切片返回新的批次。
+    """
+
+    __slots__ = ("platform", "timestamp", "items")
+
+    def __init__(self, platform, timestamp=None, items=None):
+        self.platform = sys.intern(platform)
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.items = list(items) if items is not None else []
+
+    @classmethod
+    def from_raw(cls, items, platform, timestamp=None):
+        """从爬虫返回的原始字典列表构建批次"""
+        batch = cls(platform, timestamp)
+        platform, timestamp = batch.platform, batch.timestamp
+        append = batch.items.append
+
+        for item in items:
+            get = item.get
+            append(HotItem(
+                platform,
+                timestamp,
+                get("title", ""),
+                get("url", ""),
+                get("hot_value", 0),
+                get("rank", 0),
+                get("author"),
+                get("excerpt"),
+                _intern(get("category")),
+                get("image_url"),
+                get("publish_time"),
+            ))
+        return batch
+
+    def to_dicts(self):
+        return [item.to_dict() for item in self.items]
+
+    def iter_json_rows(self):
+        """逐条生成JSON文本，用于按行写入或拼接"""
+        for item in self.items:
+            yield item.to_json()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HotBatch(self.platform, self.timestamp, self.items[index])
+        return self.items[index]
+
+    def __repr__(self):
+        return f"HotBatch(platform={self.platform!r}, timestamp={self.timestamp!r}, items={len(self.items)})"
+
+def normalize_batch(items, platform, timestamp=None, limit=None):
+    """将不同平台的原始数据规范化为HotBatch
+
+    items可以是列表或生成器，传入limit时只消费前limit条，其余条目不会被读取和规范化。
+    """
+    items = items or []
+    if limit is not None:
+        items = islice(items, limit)
+    return HotBatch.from_raw(items, platform, timestamp)
+
+def item_identity(item):
+    """条目在平台内的标识：优先使用链接，没有链接时使用标题"""
+    return item.get("url") or item.get("title") or ""
+
+def to_rows(items):
+    """把HotBatch、HotItem列表或字典列表统一转换为字典列表，用于保存和序列化"""
+    if not items:
+        return []
+    if isinstance(items, HotBatch):
+        return items.to_dicts()
+    return [item.to_dict() if isinstance(item, HotItem) else item for item in items]
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger("HotNews.HttpCache")
+
+# 缓存时保留的响应头，其余响应头在304时没有意义
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Vary")
+
+# 比较Vary时忽略的请求头：多数爬虫每次请求都随机选择User-Agent，比较它会使缓存永远无法复用；
+# 条件请求仍由服务器按ETag/Last-Modified判断缓存的版本是否有效
+_IGNORED_VARY = frozenset(["user-agent"])
+
+class HttpCache:
+    """基于ETag/Last-Modified的磁盘响应缓存
+
+    每个URL（含查询参数）保存一份元数据和响应体。再次请求时带上
+    If-None-Match/If-Modified-Since，服务器返回304时直接复用缓存的响应体。
+    元数据中记录了响应Vary头对应的请求头取值，请求头不一致时不使用缓存（User-Agent除外）。
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, method, url, params):
+        raw = json.dumps([method.upper(), url, params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    @staticmethod
+    def _header(headers, name):
+        """大小写不敏感地读取请求头"""
+        if not headers:
+            return ""
+        for key, value in headers.items():
+            if key.lower() == name.lower():
+                return str(value)
+        return ""
+
+    def lookup(self, method, url, params=None, headers=None):
+        """查找可用于条件请求的缓存条目，没有时返回None"""
+        if method.upper() != "GET":
+            return None
+
+        meta_path, body_path = self._paths(self._key(method, url, params))
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(body_path):
+            return None
+
+        # 请求头与缓存时的Vary取值不一致，不能复用
+        for name, value in entry.get("vary", {}).items():
+            if name.lower() not in _IGNORED_VARY and self._header(headers, name) != value:
+                return None
+
+        entry["body_path"] = body_path
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry):
+        """生成条件请求头"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def load_body(entry):
+        """读取缓存的响应体"""
+        with open(entry["body_path"], "rb") as f:
+            return f.read()
+
+    def store(self, method, url, params, request_headers, response_headers, content, encoding=None):
+        """保存带校验器的响应，没有ETag/Last-Modified的响应不缓存"""
+        if method.upper() != "GET":
+            return
+
+        etag = self._header(response_headers, "ETag")
+        last_modified = self._header(response_headers, "Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        vary_header = self._header(response_headers, "Vary")
+        if vary_header.strip() == "*":
+            return
+        vary = {}
+        for name in vary_header.split(","):
+            name = name.strip()
+            if name and name.lower() not in _IGNORED_VARY:
+                vary[name] = self._header(request_headers, name)
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "vary": vary,
+            "headers": {name: self._header(response_headers, name) for name in _KEPT_HEADERS if self._header(response_headers, name)},
+            "encoding": encoding,
+            "stored_at": time.time(),
+        }
+
+        meta_path, body_path = self._paths(self._key(method, url, params))
+        try:
+            # 先写响应体再写元数据，任何时刻元数据指向的响应体都是完整的
+            self._atomic_write(body_path, content)
+            self._atomic_write(meta_path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"写入响应缓存失败: {str(e)}")
+
+    @staticmethod
+    def _atomic_write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_http_cache(cache_dir):
+    """获取指定目录的共享缓存实例"""
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = HttpCache(cache_dir)
+        return _caches[cache_dir]
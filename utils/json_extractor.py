@@ -0,0 +1,60 @@
+import json
+import logging
+from urllib.parse import unquote
+
+logger = logging.getLogger("HotNews.JsonExtractor")
+
+_DECODER = json.JSONDecoder()
+
+# 标记与JSON值之间允许出现的字符，如 window.__INITIAL_STATE__ = {...} 或 "hotgov": {...}
+_SEPARATORS = " \t\r\n=:"
+
+def _value_start(text, pos):
+    """跳过标记后的空白和赋值符号，返回JSON值的起始位置，后面不是JSON值时返回-1"""
+    length = len(text)
+    while pos < length and text[pos] in _SEPARATORS:
+        pos += 1
+    if pos < length and (text[pos] in "{[" or text.startswith("%7B", pos) or text.startswith("%5B", pos)):
+        return pos
+    return -1
+
+def _decode_at(text, pos):
+    """从pos处解码恰好一个JSON值，后面多余的内容（如 ;</script>）不影响解析"""
+    if text[pos] == "%":
+        # URL编码的JSON（如抖音RENDER_DATA）只到脚本内容结束，只解码这一段而不是整个页面
+        end = text.find("<", pos)
+        blob = unquote(text[pos:end if end >= 0 else len(text)])
+        value, _ = _DECODER.raw_decode(blob)
+        return value
+
+    value, _ = _DECODER.raw_decode(text, pos)
+    return value
+
+def extract_json(text, marker, start=0):
+    """在页面中查找marker，解码其后的第一个JSON值
+
+    用普通子串查找定位标记，再从该偏移处用增量解码器解析出一个完整的JSON值，
+    不依赖 ({.*?}); 之类的惰性正则，也不会在字符串中出现的 }; 处截断。
+    同一标记出现多次时依次尝试，直到解码成功。没有找到时返回None。
+    """
+    if not text:
+        return None
+
+    pos = text.find(marker, start)
+    while pos >= 0:
+        value_pos = _value_start(text, pos + len(marker))
+        if value_pos >= 0:
+            try:
+                return _decode_at(text, value_pos)
+            except ValueError as e:
+                logger.debug(f"标记 {marker} 后的JSON解析失败: {str(e)}")
+        pos = text.find(marker, pos + len(marker))
+    return None
+
+def extract_first_json(text, markers):
+    """按顺序尝试多个标记，返回(标记, JSON值)，都没有找到时返回(None, None)"""
+    for marker in markers:
+        value = extract_json(text, marker)
+        if value is not None:
+            return marker, value
+    return None, None
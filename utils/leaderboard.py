@@ -0,0 +1,114 @@
+import heapq
+import threading
+from itertools import islice
+
+from utils.count_parser import parse_counts
+from utils.state_store import JsonStateStore
+
+class HotScorer:
+    """把各平台含义不同的热度换算为可比较的0~1分数
+
+    每个平台分别计算两部分：
+    - 排名分：1 - (rank-1)/n，与热度含义无关，所有平台都有；
+    - 热度分：log1p(热度)相对该平台最近window批数据的稳健z分数（中位数和MAD），再映射到0~1。
+    没有可用热度的条目（如RSS全部为0）热度分取中性的0.5，不会因为排名第一就压过其他平台。
+    计算用NumPy对整批向量化完成。
+    """
+
+    def __init__(self, state_path=None, window=24, rank_weight=0.5):
+        self.window = window
+        self.rank_weight = rank_weight
+        self._store = JsonStateStore(state_path) if state_path else None
+        self._lock = threading.Lock()
+        self._history = {}
+
+    def _window_values(self, platform, log_values, update=True):
+        """把本批的对数热度加入平台的滚动窗口，返回窗口内的全部值
+
+        update为False时只读取窗口，不加入本批；窗口为空时用本批的值。
+        """
+        import numpy as np
+
+        with self._lock:
+            history = self._history.get(platform)
+            if history is None:
+                history = self._store.get(platform, []) if self._store is not None else []
+            if update:
+                history = (history + [log_values.tolist()])[-self.window:]
+                if self._store is not None:
+                    self._store.set(platform, history, save=False)
+            self._history[platform] = history
+        if not history:
+            return log_values
+        return np.fromiter((value for batch in history for value in batch), dtype=float)
+
+    def score(self, platform, items, update=True):
+        """计算一批数据的分数，返回与items顺序一致的NumPy数组
+
+        update为False时（如重放的未变化批次）只按已有窗口打分，不更新窗口。
+        """
+        import numpy as np
+
+        count = len(items)
+        if not count:
+            return np.zeros(0)
+
+        ranks = np.array([item.get("rank") or index + 1 for index, item in enumerate(items)], dtype=float)
+        rank_score = 1.0 - (np.clip(ranks, 1, count) - 1) / count
+
+        # 无法识别的热度为None，转换后为NaN
+        values = np.array(parse_counts([item.get("hot_value") for item in items], default=None), dtype=float)
+        valid = np.isfinite(values) & (values > 0)
+        hot_score = np.full(count, 0.5)
+
+        if valid.any():
+            log_values = np.log1p(values[valid])
+            window = self._window_values(platform, log_values, update)
+            median = np.median(window)
+            mad = np.median(np.abs(window - median)) * 1.4826
+            if mad > 0:
+                hot_score[valid] = 1.0 / (1.0 + np.exp(-(log_values - median) / mad))
+        return self.rank_weight * rank_score + (1 - self.rank_weight) * hot_score
+
+    def save(self):
+        if self._store is not None:
+            self._store.save()
+
+def leaderboard(batches, scorer, limit=50, replayed=()):
+    """合并各平台数据为一个按分数排序的榜单
+
+    batches为{平台: 条目列表}。每个平台按分数排序后，用heapq.merge做k路归并，
+    只取前limit条，不需要把所有条目放在一起重新排序。replayed中的平台不更新热度窗口。
+    """
+    import numpy as np
+
+    ranked = []
+    for platform, items in batches.items():
+        if not items:
+            continue
+        scores = scorer.score(platform, items, update=platform not in replayed)
+        order = np.argsort(-scores, kind="stable")
+        ranked.append([(-float(scores[index]), platform, int(index)) for index in order])
+
+    board = []
+    for neg_score, platform, index in islice(heapq.merge(*ranked), limit):
+        item = batches[platform][index]
+        board.append({
+            "score": round(-neg_score, 4),
+            "platform": platform,
+            "title": item.get("title"),
+            "url": item.get("url"),
+            "rank": item.get("rank"),
+            "hot_value": item.get("hot_value"),
+        })
+    return board
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+def get_hot_scorer(state_path, window=24, rank_weight=0.5):
+    """获取指定状态文件的共享热度评分器"""
+    with _scorers_lock:
+        if state_path not in _scorers:
+            _scorers[state_path] = HotScorer(state_path, window, rank_weight)
+        return _scorers[state_path]
@@ -0,0 +1,147 @@
+import os
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger("HotNews.ProxyPool")
+
+class _ProxyStats:
+    """单个代理的健康统计"""
+
+    __slots__ = ("proxy", "success_rate", "latency", "requests", "failures",
+                 "consecutive_failures", "quarantined_until")
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.success_rate = 1.0  # 新代理先按健康处理，由实际请求结果修正
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+
+    def score(self, default_latency):
+        latency = self.latency if self.latency is not None else default_latency
+        return self.success_rate / (1.0 + latency)
+
+class ProxyPool:
+    """常驻内存的代理池
+
+    代理列表只在启动和文件修改后读取一次，按指数衰减的成功率和延迟为每个代理打分，
+    按分数加权选择代理，连续失败的代理会被隔离一段时间。
+    """
+
+    def __init__(self, path, reload_interval=30, decay=0.8, max_failures=3, quarantine_seconds=300):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.decay = decay
+        self.max_failures = max_failures
+        self.quarantine_seconds = quarantine_seconds
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._mtime = None
+        self._last_check = 0.0
+        with self._lock:
+            self._reload_if_changed(force=True)
+
+    def _reload_if_changed(self, force=False):
+        """检查代理文件是否有修改，有修改时重新加载（需持有锁）"""
+        now = time.time()
+        if not force and now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is not None or force:
+                logger.warning(f"代理文件 {self.path} 不存在")
+            self._mtime = None
+            self._stats = {}
+            return
+
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                proxies = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            logger.error(f"读取代理文件出错: {str(e)}")
+            return
+
+        # 保留仍在列表中的代理的历史统计
+        self._stats = {proxy: self._stats.get(proxy) or _ProxyStats(proxy) for proxy in proxies}
+        self._mtime = mtime
+        logger.info(f"已加载 {len(self._stats)} 个代理")
+        if not self._stats:
+            logger.warning("代理列表为空")
+
+    def _default_latency(self):
+        latencies = [s.latency for s in self._stats.values() if s.latency is not None]
+        return sum(latencies) / len(latencies) if latencies else 1.0
+
+    def choose(self):
+        """按健康分数加权选择一个代理，没有可用代理时返回None"""
+        with self._lock:
+            self._reload_if_changed()
+            if not self._stats:
+                return None
+
+            now = time.time()
+            candidates = [s for s in self._stats.values() if s.quarantined_until <= now]
+            if not candidates:
+                # 全部被隔离时选择最早解除隔离的代理，避免完全停止请求
+                return min(self._stats.values(), key=lambda s: s.quarantined_until).proxy
+
+            default_latency = self._default_latency()
+            weights = [max(s.score(default_latency), 1e-6) for s in candidates]
+            return random.choices(candidates, weights=weights)[0].proxy
+
+    def report(self, proxy, success, latency=None):
+        """记录一次使用代理的请求结果"""
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+
+            stats.requests += 1
+            stats.success_rate = self.decay * stats.success_rate + (1 - self.decay) * (1.0 if success else 0.0)
+            if success:
+                stats.consecutive_failures = 0
+                if latency is not None:
+                    stats.latency = latency if stats.latency is None else self.decay * stats.latency + (1 - self.decay) * latency
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= self.max_failures:
+                    stats.quarantined_until = time.time() + self.quarantine_seconds
+                    stats.consecutive_failures = 0
+                    logger.warning(f"代理 {proxy} 连续失败，隔离 {self.quarantine_seconds} 秒")
+
+    def stats(self):
+        """返回各代理的统计信息，按健康分数从低到高排列，便于找出拖慢爬取的代理"""
+        with self._lock:
+            now = time.time()
+            default_latency = self._default_latency()
+            result = [{
+                "proxy": s.proxy,
+                "score": round(s.score(default_latency), 4),
+                "success_rate": round(s.success_rate, 4),
+                "latency": round(s.latency, 3) if s.latency is not None else None,
+                "requests": s.requests,
+                "failures": s.failures,
+                "quarantined": s.quarantined_until > now,
+            } for s in self._stats.values()]
+        return sorted(result, key=lambda item: item["score"])
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_proxy_pool(path):
+    """获取指定代理文件的共享代理池"""
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ProxyPool(path)
+        return _pools[path]
@@ -0,0 +1,66 @@
+import time
+import asyncio
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger("HotNews.RateLimiter")
+
+class TokenBucket:
+    """令牌桶限流器
+
+    令牌以rate个/秒的速度补充，最多积累burst个。预订令牌不足时返回需要等待的时间，
+    调用方自行选择阻塞等待（线程模式）或异步等待（asyncio模式）。
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """预订一个令牌，返回需要等待的秒数，预算充足时为0"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 令牌可以透支，后到的请求按顺序排队等待
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """阻塞直到获得令牌"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def async_acquire(self):
+        """异步等待直到获得令牌，不阻塞事件循环"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_rate_limiter(url, rate_limit):
+    """按请求的主机名获取共享令牌桶，rate_limit为{"rate": 每秒请求数, "burst": 突发数}
+
+    同一主机的限流参数以第一次创建时为准。没有配置限流时返回None。
+    """
+    if not rate_limit or not rate_limit.get("rate"):
+        return None
+
+    host = urlparse(url).hostname or ""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate_limit["rate"], rate_limit.get("burst", 1))
+            _buckets[host] = bucket
+        return bucket
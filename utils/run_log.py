@@ -0,0 +1,54 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("HotNews.RunLog")
+
+class RunLog:
+    """每个平台每次运行的结果记录：{base_dir}/{YYYYMMDD}.ndjson
+
+    status为changed（已写入新数据）或unchanged（内容与上次相同，未写入），
+    下游可以据此跳过没有变化的运行，而不必比对快照。
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def record(self, platform, status, items=0, **extra):
+        entry = {
+            "platform": platform,
+            "timestamp": datetime.now().isoformat(),
+            "status": status,
+            "items": items,
+        }
+        entry.update(extra)
+        path = os.path.join(self.base_dir, f"{datetime.now().strftime('%Y%m%d')}.ndjson")
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(self.base_dir, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                logger.warning(f"写入运行记录 {path} 失败: {str(e)}")
+        return entry
+
+def iter_runs(base_dir, platform=None):
+    """按时间顺序读取运行记录，可只读取某个平台"""
+    try:
+        names = sorted(name for name in os.listdir(base_dir) if name.endswith(".ndjson"))
+    except FileNotFoundError:
+        return
+
+    for name in names:
+        with open(os.path.join(base_dir, name), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if platform is None or entry.get("platform") == platform:
+                    yield entry
@@ -0,0 +1,387 @@
+import os
+import csv
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from utils.hot_item import ROW_FIELDS, to_rows
+from utils.snapshot_log import SnapshotWriter
+from utils.db_store import open_store
+from utils.archive import ArchiveWriter
+from utils.snapshot_diff import get_snapshot_differ
+from utils.story_index import get_story_index
+from utils.timeseries import TimeSeriesStore
+from utils.leaderboard import get_hot_scorer, leaderboard
+
+logger = logging.getLogger("HotNews.Sinks")
+
+class EncodedBatch:
+    """一批待写入的数据及其序列化结果
+
+    字典行和每条记录的JSON文本都只在第一次被某个sink用到时生成一次，
+    之后所有sink共享，避免每个输出格式各自重新序列化。
+    replayed为True表示平台内容未变化、重放的是上次写入的数据，不是本次新抓到的。
+    """
+
+    def __init__(self, platform, items, replayed=False):
+        self.platform = platform
+        self.items = items
+        self.replayed = replayed
+        self._rows = None
+        self._json_rows = None
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = to_rows(self.items)
+        return self._rows
+
+    @property
+    def json_rows(self):
+        if self._json_rows is None:
+            self._json_rows = [json.dumps(row, ensure_ascii=False) for row in self.rows]
+        return self._json_rows
+
+    def __len__(self):
+        return len(self.items)
+
+def _json_array(json_rows, indent=""):
+    """把已序列化的记录拼接为JSON数组文本，每条记录一行"""
+    if not json_rows:
+        return "[]"
+    return "[\n" + ",\n".join(f"{indent}  {row}" for row in json_rows) + f"\n{indent}]"
+
+class Sink(ABC):
+    """输出目标的基类：write接收每个平台的一批数据，close在一次运行结束时调用
+
+    子类必须实现write，没有实现时在创建sink时就会失败，而不是运行到一半才报错。
+    run_level为True的sink在close时输出整次运行的结果（汇总、榜单等），平台内容未变化时
+    仍会收到该平台上次写入的数据，输出中不会缺少这个平台。
+    """
+
+    name = None
+    run_level = False
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def output_path(self, prefix, ext):
+        date_str = datetime.now().strftime("%Y%m%d")
+        return os.path.join(self.output_dir, f"{prefix}_{date_str}.{ext}")
+
+    @abstractmethod
+    def write(self, batch):
+        """写入一个平台的一批数据，返回写出的文件名（没有单独文件时返回None）"""
+
+    def close(self):
+        pass
+
+class JsonFileSink(Sink):
+    """每个平台一个JSON文件"""
+
+    name = "json"
+
+    def write(self, batch):
+        filename = self.output_path(batch.platform, "json")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(_json_array(batch.json_rows))
+        return filename
+
+def _table_fields(rows):
+    """表格输出的表头：规范化数据的全部字段，再加上行中出现的其他字段"""
+    fields = list(ROW_FIELDS)
+    known = set(fields)
+    for row in rows:
+        for key in row:
+            if key not in known:
+                known.add(key)
+                fields.append(key)
+    return fields
+
+class CsvFileSink(Sink):
+    """每个平台一个CSV文件，用csv模块逐行写出，不依赖pandas"""
+
+    name = "csv"
+    ext = "csv"
+    delimiter = ","
+
+    def write(self, batch):
+        rows = batch.rows
+        filename = self.output_path(batch.platform, self.ext)
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_table_fields(rows), delimiter=self.delimiter, restval="")
+            writer.writeheader()
+            writer.writerows(rows)
+        return filename
+
+class TsvFileSink(CsvFileSink):
+    """每个平台一个TSV文件"""
+
+    name = "tsv"
+    ext = "tsv"
+    delimiter = "\t"
+
+class ExcelFileSink(Sink):
+    """每个平台一个Excel文件，使用openpyxl的只写模式逐行写出"""
+
+    name = "excel"
+
+    def write(self, batch):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            logger.error("保存Excel格式需要安装openpyxl库")
+            return None
+
+        rows = batch.rows
+        fields = _table_fields(rows)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(fields)
+        for row in rows:
+            sheet.append([row.get(field) for field in fields])
+
+        filename = self.output_path(batch.platform, "xlsx")
+        os.makedirs(self.output_dir, exist_ok=True)
+        workbook.save(filename)
+        return filename
+
+class SnapshotLogSink(Sink):
+    """只追加的NDJSON快照日志：snapshots/{platform}/{YYYYMMDD}.ndjson
+
+    每次运行追加一批记录而不是覆盖文件，保留当天所有快照，可用utils.snapshot_log惰性读取。
+    """
+
+    name = "ndjson"
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self.writer = SnapshotWriter(os.path.join(output_dir, "snapshots"))
+
+    def write(self, batch):
+        return self.writer.append(batch.platform, batch.json_rows)
+
+    def close(self):
+        self.writer.close()
+
+class SnapshotDiffSink(Sink):
+    """与每个平台的上一次快照比较，只把变化记录追加到deltas/{platform}/{YYYYMMDD}.ndjson
+
+    写入量只和榜单变化的条目数有关，与榜单长度无关。
+    """
+
+    name = "diff"
+
+    def __init__(self, output_dir, state_path=None, hot_threshold=0.2):
+        super().__init__(output_dir)
+        self.differ = get_snapshot_differ(state_path or os.path.join(output_dir, "state", "snapshot_diff.json"), hot_threshold)
+        self.writer = SnapshotWriter(os.path.join(output_dir, "deltas"))
+
+    def write(self, batch):
+        deltas = self.differ.diff(batch.platform, batch.rows)
+        logger.info(f"{batch.platform}: {len(deltas)} 条变化")
+        return self.writer.append(batch.platform, [json.dumps(delta, ensure_ascii=False) for delta in deltas])
+
+    def close(self):
+        self.writer.close()
+
+class StorySink(Sink):
+    """把各平台的热点加入跨平台故事索引，运行结束时输出本次在榜的跨平台故事到stories_{date}.json"""
+
+    name = "stories"
+    run_level = True
+
+    def __init__(self, output_dir, state_path=None, retention_days=14):
+        super().__init__(output_dir)
+        self.index = get_story_index(state_path or os.path.join(output_dir, "state", "stories.json"))
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._since = None
+
+    def write(self, batch):
+        rows = batch.rows
+        self.index.add_items(batch.platform, rows)
+        timestamp = rows[0].get("timestamp") if rows else None
+        with self._lock:
+            if timestamp and (self._since is None or timestamp < self._since):
+                self._since = timestamp
+        return None
+
+    def close(self):
+        with self._lock:
+            since, self._since = self._since, None
+        if since is None:
+            return None
+
+        self.index.prune((datetime.now() - timedelta(days=self.retention_days)).isoformat())
+        self.index.save()
+
+        stories = self.index.stories(min_platforms=2, since=since)
+        filename = self.output_path("stories", "json")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(stories, f, ensure_ascii=False, indent=2)
+        logger.info(f"{len(stories)} 个跨平台热点已保存到 {filename}")
+        return filename
+
+class TimeSeriesSink(Sink):
+    """把每个条目的(时间戳, 排名, 热度)追加到timeseries/下的定宽序列文件"""
+
+    name = "timeseries"
+
+    def __init__(self, output_dir, raw_hours=48):
+        super().__init__(output_dir)
+        self.store = TimeSeriesStore(os.path.join(output_dir, "timeseries"), raw_hours=raw_hours)
+
+    def write(self, batch):
+        self.store.append(batch.platform, batch.rows)
+        return None
+
+class ParquetArchiveSink(Sink):
+    """列式归档：archive/platform={platform}/date={YYYYMMDD}/run-*.parquet，需要pyarrow"""
+
+    name = "parquet"
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self.writer = ArchiveWriter(os.path.join(output_dir, "archive"))
+
+    def write(self, batch):
+        return self.writer.write(batch.platform, batch.rows)
+
+class DatabaseSink(Sink):
+    """写入热点库（默认SQLite，可选MongoDB），每个平台的一批数据一个事务"""
+
+    name = "db"
+
+    def __init__(self, output_dir, backend="sqlite", path=None, uri=None, database="hotnews"):
+        super().__init__(output_dir)
+        self.store = open_store(backend, path or os.path.join(output_dir, "hotnews.db"), uri, database)
+
+    def write(self, batch):
+        count = self.store.write_batch(batch.platform, batch.rows)
+        logger.debug(f"{batch.platform}: {count} 条记录已写入数据库")
+        return None
+
+    def close(self):
+        self.store.close()
+
+class SummarySink(Sink):
+    """一次运行结束时把所有平台的数据汇总到summary文件
+
+    直接拼接各批次已序列化的记录，不再重新编码。只有一个平台时不生成汇总。
+    """
+
+    name = "summary"
+    run_level = True
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self._lock = threading.Lock()
+        self._batches = {}
+
+    def write(self, batch):
+        with self._lock:
+            self._batches[batch.platform] = batch.json_rows
+        return None
+
+    def close(self):
+        with self._lock:
+            batches, self._batches = self._batches, {}
+
+        if len(batches) <= 1:
+            return None
+
+        filename = self.output_path("summary", "json")
+        os.makedirs(self.output_dir, exist_ok=True)
+        parts = [f"  {json.dumps(platform, ensure_ascii=False)}: {_json_array(rows, '  ')}" for platform, rows in batches.items()]
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write("{\n" + ",\n".join(parts) + "\n}")
+
+        logger.info(f"汇总数据已保存到 {filename}")
+        for platform, rows in batches.items():
+            logger.info(f"{platform}: {len(rows)} 条热点")
+        return filename
+
+class LeaderboardSink(Sink):
+    """运行结束时把各平台数据按统一的热度分数合并为一个榜单，写入leaderboard_{date}.json，需要numpy
+
+    重放的批次只按已有的滚动窗口打分，不加入窗口，内容长时间不变的平台不会用同一批数据填满窗口。
+    """
+
+    name = "leaderboard"
+    run_level = True
+
+    def __init__(self, output_dir, state_path=None, window=24, limit=50):
+        super().__init__(output_dir)
+        self.scorer = get_hot_scorer(state_path or os.path.join(output_dir, "state", "hot_scores.json"), window)
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._batches = {}
+        self._replayed = set()
+
+    def write(self, batch):
+        with self._lock:
+            self._batches[batch.platform] = batch.rows
+            if batch.replayed:
+                self._replayed.add(batch.platform)
+            else:
+                self._replayed.discard(batch.platform)
+        return None
+
+    def close(self):
+        with self._lock:
+            batches, self._batches = self._batches, {}
+            replayed, self._replayed = self._replayed, set()
+        if not batches:
+            return None
+
+        try:
+            board = leaderboard(batches, self.scorer, self.limit, replayed=replayed)
+        except ImportError:
+            logger.error("生成统一热度榜需要安装numpy库")
+            return None
+        self.scorer.save()
+
+        filename = self.output_path("leaderboard", "json")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(board, f, ensure_ascii=False, indent=2)
+        logger.info(f"统一热度榜已保存到 {filename}")
+        return filename
+
+SINK_TYPES = {
+    "json": JsonFileSink,
+    "csv": CsvFileSink,
+    "tsv": TsvFileSink,
+    "excel": ExcelFileSink,
+    "xlsx": ExcelFileSink,
+    "ndjson": SnapshotLogSink,
+    "diff": SnapshotDiffSink,
+    "stories": StorySink,
+    "timeseries": TimeSeriesSink,
+    "summary": SummarySink,
+    "leaderboard": LeaderboardSink,
+    "parquet": ParquetArchiveSink,
+    "db": DatabaseSink,
+}
+
+def build_sinks(names, output_dir, options=None):
+    """按名称列表创建sink，忽略未知名称；options为{名称: 构造参数}，用于需要额外配置的sink"""
+    options = options or {}
+    sinks = []
+    for name in names:
+        name = name.strip().lower()
+        sink_type = SINK_TYPES.get(name)
+        if sink_type is None:
+            logger.warning(f"未知的输出类型: {name}")
+            continue
+        try:
+            sinks.append(sink_type(output_dir, **options.get(name, {})))
+        except Exception as e:
+            logger.error(f"创建 {name} 输出失败: {str(e)}")
+    return sinks
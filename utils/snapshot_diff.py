@@ -0,0 +1,100 @@
+import threading
+
+from utils.count_parser import parse_count
+from utils.hot_item import item_identity
+from utils.state_store import JsonStateStore
+
+def _hot_changed(previous, current, threshold):
+    """热度变化是否超过阈值（相对变化），无法转换为数值时按是否相等判断"""
+    if previous == current:
+        return False
+    prev_number, number = parse_count(previous, default=None), parse_count(current, default=None)
+    if prev_number is None or number is None:
+        return True
+    if not prev_number:
+        return bool(number)
+    return abs(number - prev_number) / abs(prev_number) >= threshold
+
+def diff_snapshots(previous, current, hot_threshold=0.2):
+    """比较两次快照，返回变化记录列表
+
+    previous和current都是{条目标识: (排名, 热度, 标题)}。每条变化记录对应一个条目，
+    change为new（新上榜）、dropped（下榜）或updated（排名变化或热度变化超过阈值），
+    只包含与该变化相关的字段；未变化的条目不产生记录。
+    """
+    deltas = []
+    for key, (rank, hot_value, title) in current.items():
+        old = previous.get(key)
+        if old is None:
+            deltas.append({"change": "new", "key": key, "title": title, "rank": rank, "hot_value": hot_value})
+            continue
+
+        prev_rank, prev_hot_value, _ = old
+        delta = None
+        if rank != prev_rank:
+            delta = {"change": "updated", "key": key, "title": title, "rank": rank, "prev_rank": prev_rank}
+        if _hot_changed(prev_hot_value, hot_value, hot_threshold):
+            delta = delta or {"change": "updated", "key": key, "title": title, "rank": rank}
+            delta["hot_value"] = hot_value
+            delta["prev_hot_value"] = prev_hot_value
+        if delta:
+            deltas.append(delta)
+
+    for key, (prev_rank, prev_hot_value, title) in previous.items():
+        if key not in current:
+            deltas.append({"change": "dropped", "key": key, "title": title, "prev_rank": prev_rank, "prev_hot_value": prev_hot_value})
+    return deltas
+
+def snapshot_index(rows):
+    """把一批字典行转换为{条目标识: (排名, 热度, 标题)}，同一标识只保留排名最靠前的一条"""
+    index = {}
+    for row in rows:
+        key = item_identity(row)
+        if key and key not in index:
+            index[key] = (row.get("rank"), row.get("hot_value"), row.get("title"))
+    return index
+
+class SnapshotDiffer:
+    """保存每个平台的上一次快照，与新快照比较得到变化记录
+
+    上一次快照常驻内存，同时写入状态文件，重启后仍能和重启前的最后一次快照比较。
+    """
+
+    def __init__(self, state_path, hot_threshold=0.2):
+        self.hot_threshold = hot_threshold
+        self._store = JsonStateStore(state_path)
+        self._lock = threading.Lock()
+        self._previous = {}
+
+    def _load(self, platform):
+        if platform not in self._previous:
+            entry = self._store.get(platform) or {}
+            items = {key: tuple(value) for key, value in entry.get("items", {}).items()}
+            self._previous[platform] = (entry.get("timestamp"), items)
+        return self._previous[platform]
+
+    def diff(self, platform, rows):
+        """与上一次快照比较，返回变化记录列表，并把本次快照记为上一次快照"""
+        current = snapshot_index(rows)
+        timestamp = rows[0].get("timestamp") if rows else None
+
+        with self._lock:
+            prev_timestamp, previous = self._load(platform)
+            deltas = diff_snapshots(previous, current, self.hot_threshold)
+            self._previous[platform] = (timestamp, current)
+            self._store.set(platform, {"timestamp": timestamp, "items": {key: list(value) for key, value in current.items()}})
+
+        header = {"platform": platform, "timestamp": timestamp}
+        if prev_timestamp:
+            header["prev_timestamp"] = prev_timestamp
+        return [{**header, **delta} for delta in deltas]
+
+_differs = {}
+_differs_lock = threading.Lock()
+
+def get_snapshot_differ(state_path, hot_threshold=0.2):
+    """获取指定状态文件的共享快照比较器"""
+    with _differs_lock:
+        if state_path not in _differs:
+            _differs[state_path] = SnapshotDiffer(state_path, hot_threshold)
+        return _differs[state_path]
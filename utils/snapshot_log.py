@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("HotNews.SnapshotLog")
+
+def segment_path(base_dir, platform, date=None):
+    """返回平台某天的快照段文件路径：{base_dir}/{platform}/{YYYYMMDD}.ndjson"""
+    date_str = (date or datetime.now()).strftime("%Y%m%d")
+    return os.path.join(base_dir, platform, f"{date_str}.ndjson")
+
+class SnapshotWriter:
+    """按天分段的只追加NDJSON快照日志
+
+    每条记录一行紧凑JSON，每次运行的一批记录用一次write追加到当天的段文件末尾，
+    写入量只和新数据有关。fsync按间隔进行，关闭时总会fsync一次。
+    """
+
+    def __init__(self, base_dir, fsync_interval=5.0):
+        self.base_dir = base_dir
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._files = {}
+        self._last_sync = {}
+
+    def _open(self, path):
+        f = self._files.get(path)
+        if f is not None:
+            return f
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, "a+b")
+        # 上次写入中断留下半行时先补换行，避免和新记录粘在一起
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        self._files[path] = f
+        self._last_sync[path] = time.monotonic()
+        return f
+
+    def append(self, platform, json_rows):
+        """追加一批已序列化的记录，返回段文件路径"""
+        if not json_rows:
+            return None
+
+        path = segment_path(self.base_dir, platform)
+        data = ("\n".join(json_rows) + "\n").encode("utf-8")
+        with self._lock:
+            f = self._open(path)
+            f.write(data)
+            f.flush()
+            now = time.monotonic()
+            if now - self._last_sync[path] >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._last_sync[path] = now
+        return path
+
+    def close(self):
+        with self._lock:
+            for path, f in self._files.items():
+                try:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                except OSError as e:
+                    logger.warning(f"关闭快照文件 {path} 失败: {str(e)}")
+            self._files = {}
+            self._last_sync = {}
+
+def _date_in_range(date_str, start_date, end_date):
+    if start_date and date_str < start_date.strftime("%Y%m%d"):
+        return False
+    if end_date and date_str > end_date.strftime("%Y%m%d"):
+        return False
+    return True
+
+def iter_records(base_dir, platform, start_date=None, end_date=None):
+    """按时间顺序逐条读取平台的快照记录（字典），跳过损坏的行"""
+    platform_dir = os.path.join(base_dir, platform)
+    try:
+        names = sorted(name for name in os.listdir(platform_dir) if name.endswith(".ndjson"))
+    except FileNotFoundError:
+        return
+
+    for name in names:
+        if not _date_in_range(name[:-len(".ndjson")], start_date, end_date):
+            continue
+        with open(os.path.join(platform_dir, name), "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"跳过损坏的快照记录 {name}:{line_no}")
+
+def iter_snapshots(base_dir, platform, start_date=None, end_date=None):
+    """按时间顺序惰性读取平台的快照，每次产出(时间戳, 记录列表)
+
+    同一次运行的记录共享同一个时间戳，连续且时间戳相同的记录组成一个快照。
+    """
+    timestamp, records = None, []
+    for record in iter_records(base_dir, platform, start_date, end_date):
+        if records and record.get("timestamp") != timestamp:
+            yield timestamp, records
+            records = []
+        timestamp = record.get("timestamp")
+        records.append(record)
+    if records:
+        yield timestamp, records
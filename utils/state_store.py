@@ -0,0 +1,54 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger("HotNews.StateStore")
+
+class JsonStateStore:
+    """以单个JSON文件持久化的键值状态，用于在多次调度运行之间保留少量运行状态
+
+    读写都在内存中进行，save时原子地整体写回文件。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取状态文件 {self.path} 失败，将重新创建: {str(e)}")
+            return {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value, save=True):
+        with self._lock:
+            self._data[key] = value
+            if save:
+                self.save()
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def save(self):
+        """原子地把全部状态写回文件"""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"写入状态文件 {self.path} 失败: {str(e)}")
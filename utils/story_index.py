@@ -0,0 +1,203 @@
+import re
+import random
+import hashlib
+import threading
+
+from utils.state_store import JsonStateStore
+
+# MinHash排列使用的梅森素数，签名取值范围在[0, 2^61-1)
+_PRIME = (1 << 61) - 1
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize_title(title):
+    """标题规范化：转小写并去掉空白和标点，只保留汉字、字母和数字"""
+    return _NON_WORD.sub("", (title or "").lower())
+
+def shingles(title, n=2):
+    """标题的字符n-gram集合，中文标题没有分词边界，按字符切分效果最好"""
+    text = normalize_title(title)
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def _shingle_hash(shingle):
+    # 不使用内置hash，保证签名在不同进程之间一致，可以持久化
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+class MinHasher:
+    """用num_perm个随机线性排列计算MinHash签名，两个签名相同位置相等的比例估计Jaccard相似度"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return None
+        hashes = [_shingle_hash(shingle) for shingle in shingle_set]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms]
+
+def similarity(sig_a, sig_b):
+    """两个MinHash签名估计的Jaccard相似度"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+class StoryIndex:
+    """跨平台近似重复标题的增量索引，把同一事件在不同平台的条目归为一个"故事"
+
+    每个标题计算MinHash签名，签名按bands段切分后放入LSH桶，插入时只和同桶的故事比较，
+    每次插入的开销与历史规模基本无关。bands=16、每段4行时，相似度约0.5以上的标题
+    大概率落入同一个桶，再用签名估计的相似度和threshold确认。
+    """
+
+    def __init__(self, state_path=None, num_perm=64, bands=16, threshold=0.5):
+        if num_perm % bands:
+            raise ValueError("num_perm必须能被bands整除")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self._store = JsonStateStore(state_path) if state_path else None
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stories = {}
+        self._members = {}
+        self._next_id = 1
+        if self._store is not None:
+            self._load()
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [f"{band}:{hash(tuple(signature[band * rows:(band + 1) * rows]))}" for band in range(self.bands)]
+
+    def _index_story(self, story_id, signature):
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(story_id)
+
+    def _find_story(self, signature):
+        """在签名所在的LSH桶中查找最相似的故事"""
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best_id, best_score = None, self.threshold
+        for story_id in candidates:
+            score = similarity(signature, self._stories[story_id]["signature"])
+            if score >= best_score:
+                best_id, best_score = story_id, score
+        return best_id
+
+    def add(self, platform, title, url=None, timestamp=None):
+        """加入一条热点并返回所属故事的编号，标题为空时返回None
+
+        同一平台的同一条目再次出现时只更新时间，不重复计入。
+        """
+        member = (platform, url or title)
+        with self._lock:
+            story_id = self._members.get(member)
+            if story_id is None:
+                signature = self.hasher.signature(shingles(title))
+                if signature is None:
+                    return None
+                story_id = self._find_story(signature)
+                if story_id is None:
+                    story_id = self._next_id
+                    self._next_id += 1
+                    self._stories[story_id] = {
+                        "title": title,
+                        "signature": signature,
+                        "first_seen": timestamp,
+                        "last_seen": timestamp,
+                        "items": [],
+                    }
+                self._stories[story_id]["items"].append({"platform": platform, "title": title, "url": url or ""})
+                self._members[member] = story_id
+                # 每个标题的签名都进入索引，措辞逐渐变化的标题仍能归到同一个故事
+                self._index_story(story_id, signature)
+
+            story = self._stories[story_id]
+            if timestamp and (not story["last_seen"] or timestamp > story["last_seen"]):
+                story["last_seen"] = timestamp
+            return story_id
+
+    def add_items(self, platform, items):
+        """加入一个平台的一批热点，返回各条目所属的故事编号"""
+        return [self.add(platform, item.get("title"), item.get("url"), item.get("timestamp")) for item in items]
+
+    def story(self, story_id):
+        with self._lock:
+            story = self._stories.get(story_id)
+            return self._public(story_id, story) if story else None
+
+    @staticmethod
+    def _public(story_id, story):
+        platforms = sorted({item["platform"] for item in story["items"]})
+        return {
+            "id": story_id,
+            "title": story["title"],
+            "platforms": platforms,
+            "first_seen": story["first_seen"],
+            "last_seen": story["last_seen"],
+            "items": list(story["items"]),
+        }
+
+    def stories(self, min_platforms=2, since=None):
+        """返回至少出现在min_platforms个平台的故事，按平台数从多到少排列
+
+        since为ISO时间字符串时只返回此后仍在榜的故事。
+        """
+        with self._lock:
+            result = []
+            for story_id, story in self._stories.items():
+                if since and (story["last_seen"] or "") < since:
+                    continue
+                if len({item["platform"] for item in story["items"]}) >= min_platforms:
+                    result.append(self._public(story_id, story))
+        result.sort(key=lambda story: (-len(story["platforms"]), story["first_seen"] or ""))
+        return result
+
+    def prune(self, before):
+        """删除最后出现时间早于before（ISO时间字符串）的故事，返回删除数量"""
+        with self._lock:
+            expired = {story_id for story_id, story in self._stories.items() if (story["last_seen"] or "") < before}
+            if not expired:
+                return 0
+            for story_id in expired:
+                del self._stories[story_id]
+            self._members = {member: story_id for member, story_id in self._members.items() if story_id not in expired}
+            for key in list(self._buckets):
+                bucket = self._buckets[key] - expired
+                if bucket:
+                    self._buckets[key] = bucket
+                else:
+                    del self._buckets[key]
+            return len(expired)
+
+    def _load(self):
+        self._next_id = self._store.get("next_id", 1)
+        for story_id, story in (self._store.get("stories") or {}).items():
+            story_id = int(story_id)
+            self._stories[story_id] = story
+            for item in story["items"]:
+                self._members[(item["platform"], item["url"] or item["title"])] = story_id
+                signature = self.hasher.signature(shingles(item["title"]))
+                if signature:
+                    self._index_story(story_id, signature)
+
+    def save(self):
+        """把故事写入状态文件，LSH桶在加载时由标题重新计算"""
+        if self._store is None:
+            return
+        with self._lock:
+            self._store.set("next_id", self._next_id, save=False)
+            self._store.set("stories", {str(story_id): story for story_id, story in self._stories.items()})
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_story_index(state_path):
+    """获取指定状态文件的共享故事索引"""
+    with _indexes_lock:
+        if state_path not in _indexes:
+            _indexes[state_path] = StoryIndex(state_path)
+        return _indexes[state_path]
@@ -0,0 +1,67 @@
+import logging
+import threading
+
+from utils.state_store import JsonStateStore
+
+logger = logging.getLogger("HotNews.StrategyRegistry")
+
+# 从未尝试过的策略的初始得分，介于一直成功(1)和一直失败(0)之间
+_UNTRIED_SCORE = 0.5
+
+class StrategyRegistry:
+    """记录各平台抓取策略（端点、JSON模式、选择器等）的成败和耗时
+
+    按指数衰减的成功率从高到低、耗时从短到长重排候选策略，
+    最近一直成功的策略下次最先尝试，常见情况下只需尝试一次。
+    """
+
+    def __init__(self, state_path, decay=0.7):
+        self.decay = decay
+        self._store = JsonStateStore(state_path)
+        self._lock = threading.Lock()
+
+    def order(self, platform, cascade, keys):
+        """返回按历史表现重排后的策略列表，得分相同的保持原有顺序"""
+        stats = self._store.get(f"{platform}:{cascade}", {})
+
+        def sort_key(indexed):
+            index, key = indexed
+            entry = stats.get(str(key))
+            if entry is None:
+                return (-_UNTRIED_SCORE, float("inf"), index)
+            return (-round(entry["score"], 3), entry["latency"], index)
+
+        return [key for _, key in sorted(enumerate(keys), key=sort_key)]
+
+    def record(self, platform, cascade, key, success, latency):
+        """记录一次策略尝试的结果（只更新内存，由save统一写盘）"""
+        with self._lock:
+            name = f"{platform}:{cascade}"
+            stats = dict(self._store.get(name, {}))
+            entry = stats.get(str(key))
+            result = 1.0 if success else 0.0
+            if entry is None:
+                entry = {"score": result, "latency": latency, "wins": 0, "attempts": 0}
+            else:
+                entry = dict(entry)
+                entry["score"] = self.decay * entry["score"] + (1 - self.decay) * result
+                if success:
+                    entry["latency"] = self.decay * entry["latency"] + (1 - self.decay) * latency
+            entry["attempts"] += 1
+            if success:
+                entry["wins"] += 1
+            stats[str(key)] = entry
+            self._store.set(name, stats, save=False)
+
+    def save(self):
+        self._store.save()
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_strategy_registry(state_path):
+    """获取指定状态文件的共享策略注册表"""
+    with _registries_lock:
+        if state_path not in _registries:
+            _registries[state_path] = StrategyRegistry(state_path)
+        return _registries[state_path]
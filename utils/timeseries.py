@@ -0,0 +1,195 @@
+import os
+import mmap
+import math
+import struct
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+from utils.count_parser import parse_count
+
+logger = logging.getLogger("HotNews.TimeSeries")
+
+# 每个点固定20字节：时间戳(秒, int64)、排名(int32)、热度(float64)，小端
+RECORD = struct.Struct("<qid")
+
+def canonical_url(url):
+    """去掉片段、首尾空白和路径末尾的斜杠，同一条目的链接写法不同时得到相同结果"""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+def series_key(item):
+    """条目的稳定标识：规范化链接的哈希，没有链接时使用标题的哈希"""
+    identity = canonical_url(item.get("url")) or (item.get("title") or "").strip()
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=10).hexdigest()
+
+def _to_float(value):
+    number = parse_count(value, default=None)
+    return math.nan if number is None else float(number)
+
+def _epoch(timestamp):
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+class _Points:
+    """以内存映射方式读取一个序列文件，按下标取点，末尾不完整的记录被忽略"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = size // RECORD.size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def timestamp(self, index):
+        return RECORD.unpack_from(self._map, index * RECORD.size)[0]
+
+    def point(self, index):
+        return RECORD.unpack_from(self._map, index * RECORD.size)
+
+    def raw(self, start, end):
+        """下标[start, end)之间的点的原始字节"""
+        return self._map[start * RECORD.size:end * RECORD.size]
+
+    def bisect(self, timestamp):
+        """第一个时间戳不小于timestamp的点的下标"""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamp(mid) < timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class TimeSeriesStore:
+    """每个条目一条(时间戳, 排名, 热度)序列，保存为定宽记录的追加文件
+
+    文件路径为{base_dir}/{platform}/{key前两位}/{key}.bin，点按时间顺序追加。
+    查询用mmap读取，二分查找起点后只读取范围内的点，不需要加载整个历史。
+    downsample把超过raw_hours的旧点按小时合并，文件大小随时间近似按小时数增长。
+    """
+
+    def __init__(self, base_dir, raw_hours=48, bucket_seconds=3600):
+        self.base_dir = base_dir
+        self.raw_hours = raw_hours
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+
+    def series_path(self, platform, key):
+        return os.path.join(self.base_dir, platform, key[:2], f"{key}.bin")
+
+    def append(self, platform, rows):
+        """追加一批字典行，每个条目一个点，返回写入的点数"""
+        count = 0
+        with self._lock:
+            for row in rows:
+                if not row.get("timestamp"):
+                    continue
+                path = self.series_path(platform, series_key(row))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                record = RECORD.pack(_epoch(row["timestamp"]), int(row.get("rank") or 0), _to_float(row.get("hot_value")))
+                with open(path, "ab") as f:
+                    # 上次写入中断留下的不完整记录先截掉，保证后续记录仍然对齐
+                    remainder = f.tell() % RECORD.size
+                    if remainder:
+                        f.truncate(f.tell() - remainder)
+                    f.write(record)
+                count += 1
+        return count
+
+    def query(self, platform, item, start=None, end=None):
+        """返回条目在[start, end]内的点列表[(datetime, 排名, 热度)]
+
+        item为热点字典/HotItem或series_key得到的标识；start、end为datetime或ISO字符串。
+        """
+        key = item if isinstance(item, str) else series_key(item)
+        path = self.series_path(platform, key)
+        if not os.path.exists(path):
+            return []
+
+        with _Points(path) as points:
+            if not points.count:
+                return []
+            index = points.bisect(_epoch(start)) if start else 0
+            end_ts = _epoch(end) if end else None
+            result = []
+            while index < points.count:
+                timestamp, rank, hot_value = points.point(index)
+                if end_ts is not None and timestamp > end_ts:
+                    break
+                result.append((datetime.fromtimestamp(timestamp), rank, None if math.isnan(hot_value) else hot_value))
+                index += 1
+            return result
+
+    def _downsample_file(self, path, cutoff):
+        """把cutoff之前的点按时间桶合并（桶内取最好排名和最高热度），返回是否改写了文件"""
+        with _Points(path) as points:
+            boundary = points.bisect(cutoff) if points.count else 0
+            if not boundary:
+                return False
+
+            buckets = {}
+            already_downsampled = True
+            for index in range(boundary):
+                timestamp, rank, hot_value = points.point(index)
+                bucket = timestamp - timestamp % self.bucket_seconds
+                if timestamp != bucket or bucket in buckets:
+                    already_downsampled = False
+                best = buckets.get(bucket)
+                if best is None:
+                    buckets[bucket] = [rank, hot_value]
+                else:
+                    if rank and (not best[0] or rank < best[0]):
+                        best[0] = rank
+                    if not math.isnan(hot_value) and (math.isnan(best[1]) or hot_value > best[1]):
+                        best[1] = hot_value
+            if already_downsampled:
+                return False
+
+            data = b"".join(RECORD.pack(bucket, rank, hot_value) for bucket, (rank, hot_value) in sorted(buckets.items()))
+            data += points.raw(boundary, points.count)
+
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return True
+
+    def downsample(self, now=None):
+        """把所有序列中早于raw_hours小时的点按时间桶合并，返回改写的文件数"""
+        cutoff = int((now or datetime.now()).timestamp()) - self.raw_hours * 3600
+        rewritten = 0
+        with self._lock:
+            for root, _, names in os.walk(self.base_dir):
+                for name in names:
+                    if not name.endswith(".bin"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        if self._downsample_file(path, cutoff):
+                            rewritten += 1
+                    except OSError as e:
+                        logger.warning(f"降采样 {path} 失败: {str(e)}")
+        if rewritten:
+            logger.info(f"时间序列降采样完成，改写 {rewritten} 个文件")
+        return rewritten